@@ -1,6 +1,7 @@
 import os
+import threading
+from functools import lru_cache
 from dotenv import load_dotenv
-import boto3
 
 # Load .env file
 load_dotenv()
@@ -15,16 +16,147 @@ DICOM_IMPORT_QUEUE_URL = os.getenv("SQS_DICOM_IMPORT_QUEUE_URL")
 OCR_UPLOAD_QUEUE_URL = os.getenv("SQS_OCR_UPLOAD_QUEUE_URL")
 DATASTORE_ID = os.getenv("DATASTORE_ID")
 DYNAMODB_TABLE_NAME = os.getenv("DYNAMODB_TABLE_NAME")
+# Set to e.g. http://localhost:8000 to run against DynamoDB Local
+DYNAMODB_ENDPOINT_URL = os.getenv("DYNAMODB_ENDPOINT_URL") or None
+DYNAMODB_MAX_POOL_CONNECTIONS = int(os.getenv("DYNAMODB_MAX_POOL_CONNECTIONS", "32"))
+DYNAMODB_MAX_ATTEMPTS = int(os.getenv("DYNAMODB_MAX_ATTEMPTS", "5"))
+# Threads the patient-record repository uses to keep blocking boto3 calls off the event loop
+DYNAMODB_MAX_WORKERS = int(os.getenv("DYNAMODB_MAX_WORKERS", "16"))
 DATASTORE_ID = os.getenv("DATASTORE_ID")
 BUCKET_NAME = os.getenv("BUCKET_NAME")
 S3_BUCKET_PATIENT_RECORDS = os.getenv("S3_BUCKET_PATIENT_RECORDS")
 
-# AWS session
-session = boto3.Session(profile_name=AWS_PROFILE, region_name=AWS_REGION)
+# Redis
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
+
+# Intake session store: "memory" (single worker) or "redis" (shared across workers)
+SESSION_STORE_BACKEND = os.getenv("SESSION_STORE_BACKEND", "memory").lower()
+SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_SECONDS", "3600"))
+SESSION_MAX_IN_MEMORY = int(os.getenv("SESSION_MAX_IN_MEMORY", "10000"))
+# HNSW parameters of the patient-record vector index
+PATIENT_INDEX_HNSW_M = int(os.getenv("PATIENT_INDEX_HNSW_M", "16"))
+PATIENT_INDEX_HNSW_EF_CONSTRUCTION = int(os.getenv("PATIENT_INDEX_HNSW_EF_CONSTRUCTION", "200"))
+PATIENT_INDEX_HNSW_EF_RUNTIME = int(os.getenv("PATIENT_INDEX_HNSW_EF_RUNTIME", "64"))
+# Background jobs (end-of-intake extraction + persistence): memory | redis (Redis stream)
+JOB_QUEUE_BACKEND = os.getenv("JOB_QUEUE_BACKEND", "memory").lower()
+JOB_WORKER_CONCURRENCY = int(os.getenv("JOB_WORKER_CONCURRENCY", "4"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "5"))
+JOB_RETRY_BASE_SECONDS = float(os.getenv("JOB_RETRY_BASE_SECONDS", "2"))
+JOB_IDEMPOTENCY_TTL_SECONDS = int(os.getenv("JOB_IDEMPOTENCY_TTL_SECONDS", str(24 * 3600)))
+# Cached H&P summaries + per-patient record watermarks (memory | redis)
+HP_SUMMARY_STORE_BACKEND = os.getenv("HP_SUMMARY_STORE_BACKEND", "memory").lower()
+HP_SUMMARY_TTL_SECONDS = int(os.getenv("HP_SUMMARY_TTL_SECONDS", str(7 * 24 * 3600)))
+HP_SUMMARY_MAX_IN_MEMORY = int(os.getenv("HP_SUMMARY_MAX_IN_MEMORY", "10000"))
+
+# Embedding cache: "local" (.npz file), "redis" or "none"
+EMBEDDING_CACHE_BACKEND = os.getenv("EMBEDDING_CACHE_BACKEND", "local").lower()
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", ".cache/embeddings.npz")
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+# Query embeddings (patient replies, retrieval hints): in-process LRU + TTL, optionally shared via Redis
+EMBEDDING_QUERY_CACHE_SIZE = int(os.getenv("EMBEDDING_QUERY_CACHE_SIZE", "4096"))
+EMBEDDING_QUERY_CACHE_TTL_SECONDS = int(os.getenv("EMBEDDING_QUERY_CACHE_TTL_SECONDS", "86400"))
+EMBEDDING_QUERY_CACHE_PERSIST = os.getenv("EMBEDDING_QUERY_CACHE_PERSIST", "false").lower() in {"1", "true", "yes"}
+
+# LLM clients
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+
+# X-ray inference: micro-batch size / fill window and torch intra-op threads (0 = torch default)
+XRAY_BATCH_SIZE = int(os.getenv("XRAY_BATCH_SIZE", "16"))
+XRAY_BATCH_WAIT_MS = float(os.getenv("XRAY_BATCH_WAIT_MS", "10"))
+XRAY_INTRA_OP_THREADS = int(os.getenv("XRAY_INTRA_OP_THREADS", "0"))
+# fp32 | compiled | torchscript | int8_dynamic | int8_static (see app/models/xray_variants.py)
+XRAY_MODEL_VARIANT = os.getenv("XRAY_MODEL_VARIANT", "fp32").lower()
+XRAY_MODEL_ARTIFACT_DIR = os.getenv("XRAY_MODEL_ARTIFACT_DIR", "artifacts/xray")
+# Background DICOM import consumer (replaces polling /process-job)
+XRAY_SQS_WORKER_ENABLED = os.getenv("XRAY_SQS_WORKER_ENABLED", "false").lower() in {"1", "true", "yes"}
+XRAY_WORKER_CONCURRENCY = int(os.getenv("XRAY_WORKER_CONCURRENCY", "8"))
+XRAY_SQS_VISIBILITY_TIMEOUT = int(os.getenv("XRAY_SQS_VISIBILITY_TIMEOUT", "120"))
+
+# Handwritten-note OCR consumer: engine (vision | tesseract | fake) and images per annotate call
+OCR_SQS_WORKER_ENABLED = os.getenv("OCR_SQS_WORKER_ENABLED", "false").lower() in {"1", "true", "yes"}
+OCR_ENGINE = os.getenv("OCR_ENGINE", "vision").lower()
+OCR_BATCH_SIZE = int(os.getenv("OCR_BATCH_SIZE", "16"))
+
+# Extracted lab-report text, content-addressed by bucket/key/ETag (none | local | redis). The text is
+# PHI and the local tier writes it unencrypted, so caching is opt-in; point LAB_TEXT_CACHE_DIR at an
+# encrypted volume readable only by the service user when choosing "local"
+LAB_TEXT_CACHE_BACKEND = os.getenv("LAB_TEXT_CACHE_BACKEND", "none").lower()
+LAB_TEXT_CACHE_DIR = os.getenv("LAB_TEXT_CACHE_DIR", ".cache/lab-text")
+LAB_TEXT_CACHE_MAX_BYTES = int(os.getenv("LAB_TEXT_CACHE_MAX_BYTES", str(256 * 1024**2)))
+LAB_TEXT_CACHE_TTL_SECONDS = int(os.getenv("LAB_TEXT_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+# Page-wise PDF parsing in a process pool; smaller documents are parsed inline
+LAB_PDF_PARSE_WORKERS = int(os.getenv("LAB_PDF_PARSE_WORKERS", "2"))
+# Threads for the lab branch of /analyzing; also caps work still running after a branch timeout
+LAB_FETCH_WORKERS = int(os.getenv("LAB_FETCH_WORKERS", "4"))
+LAB_PDF_PARALLEL_MIN_PAGES = int(os.getenv("LAB_PDF_PARALLEL_MIN_PAGES", "4"))
+
+# Lab rows sent to the review summarizer: "abnormal" (flagged rows + names of the rest) or "all"
+LAB_PROMPT_VALUES = os.getenv("LAB_PROMPT_VALUES", "abnormal").lower()
+
+# ImageSet cache shared by classification and imaging: parsed metadata in memory, decoded frames on disk
+IMAGESET_METADATA_CACHE_SIZE = int(os.getenv("IMAGESET_METADATA_CACHE_SIZE", "1024"))
+# Decoded frames are PHI and are written unencrypted, so the disk tier is opt-in; point the
+# directory at an encrypted volume readable only by the service user when enabling it
+IMAGESET_FRAME_CACHE_ENABLED = os.getenv("IMAGESET_FRAME_CACHE_ENABLED", "false").lower() in {"1", "true", "yes"}
+IMAGESET_FRAME_CACHE_DIR = os.getenv("IMAGESET_FRAME_CACHE_DIR", ".cache/frames")
+IMAGESET_FRAME_CACHE_MAX_BYTES = int(os.getenv("IMAGESET_FRAME_CACHE_MAX_BYTES", str(2 * 1024**3)))
+
+# /image-url: presigned URL lifetime and how long before expiry a cached URL is re-signed
+IMAGE_URL_EXPIRES_SECONDS = int(os.getenv("IMAGE_URL_EXPIRES_SECONDS", "3600"))
+IMAGE_URL_REFRESH_MARGIN_SECONDS = int(os.getenv("IMAGE_URL_REFRESH_MARGIN_SECONDS", "300"))
+IMAGE_URL_CACHE_SIZE = int(os.getenv("IMAGE_URL_CACHE_SIZE", "4096"))
+
+# X-ray derivatives rendered per ImageSet: name:max_edge_px (0 keeps native resolution)
+XRAY_DERIVATIVE_SIZES = os.getenv("XRAY_DERIVATIVE_SIZES", "thumbnail:256,preview:1024,full:0")
+XRAY_RENDER_WORKERS = int(os.getenv("XRAY_RENDER_WORKERS", "4"))
+
+# Serve symptom-question retrieval from an in-process NumPy index (Redis stays the fallback)
+LOCAL_QUESTION_INDEX_ENABLED = os.getenv("LOCAL_QUESTION_INDEX_ENABLED", "true").lower() in {"1", "true", "yes"}
+
+# Startup: which routers this pod serves (comma list, "all" for every router) and X-ray model warm-up
+LLM_SERVER_ROUTERS = os.getenv("LLM_SERVER_ROUTERS", "all").lower()
+XRAY_WARMUP = os.getenv("XRAY_WARMUP", "lazy").lower()  # lazy | background
+
+# AWS session (created on first use; boto3 itself is imported lazily too)
+@lru_cache(maxsize=None)
+def get_session():
+    import boto3
+    return boto3.Session(profile_name=AWS_PROFILE, region_name=AWS_REGION)
+
+
+class LazyResource:
+    """Proxy that builds the wrapped client/resource on first attribute access."""
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._obj = None
+        self._lock = threading.Lock()
+
+    def _get(self):
+        if self._obj is None:
+            with self._lock:
+                if self._obj is None:
+                    self._obj = self._factory()
+        return self._obj
+
+    def __getattr__(self, name):
+        return getattr(self._get(), name)
+
 
 # Clients and resources
-sqs = session.client('sqs')
-healthimaging = session.client('medical-imaging')
-dynamodb = session.resource('dynamodb')
-table = dynamodb.Table(DYNAMODB_TABLE_NAME)
-s3 = session.client("s3")
\ No newline at end of file
+sqs = LazyResource(lambda: get_session().client('sqs'))
+healthimaging = LazyResource(lambda: get_session().client('medical-imaging'))
+def _dynamodb_resource():
+    from botocore.config import Config
+    # One connection pool sized to the repository's worker threads, adaptive client-side retries
+    config = Config(
+        max_pool_connections=max(DYNAMODB_MAX_POOL_CONNECTIONS, DYNAMODB_MAX_WORKERS),
+        retries={"mode": "adaptive", "max_attempts": DYNAMODB_MAX_ATTEMPTS},
+    )
+    return get_session().resource("dynamodb", endpoint_url=DYNAMODB_ENDPOINT_URL, config=config)
+
+dynamodb = LazyResource(_dynamodb_resource)
+table = LazyResource(lambda: dynamodb.Table(DYNAMODB_TABLE_NAME))
+s3 = LazyResource(lambda: get_session().client("s3"))
@@ -0,0 +1,34 @@
+import asyncio
+from functools import lru_cache
+from typing import Any, Optional
+from .config import (
+    OPENAI_API_KEY,
+    LLM_TIMEOUT_SECONDS,
+    LLM_MAX_RETRIES,
+    LLM_MAX_CONCURRENCY,
+)
+
+@lru_cache(maxsize=None)
+def get_chat_model(model: str, temperature: Optional[float] = None, streaming: bool = False):
+    """One shared ChatOpenAI client (and HTTP connection pool) per model configuration, built on first use."""
+    from langchain_openai import ChatOpenAI
+
+    kwargs: dict[str, Any] = {}
+    if temperature is not None:
+        kwargs["temperature"] = temperature
+    return ChatOpenAI(
+        model=model,
+        streaming=streaming,
+        openai_api_key=OPENAI_API_KEY,
+        timeout=LLM_TIMEOUT_SECONDS,
+        max_retries=LLM_MAX_RETRIES,
+        **kwargs,
+    )
+
+# Caps in-flight LLM calls per worker so a burst of encounters queues instead of tripping rate limits
+llm_semaphore = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+
+async def ainvoke_llm(runnable, payload: Any) -> Any:
+    """Await `runnable.ainvoke(payload)` under the worker-wide concurrency limit."""
+    async with llm_semaphore:
+        return await runnable.ainvoke(payload)
@@ -1,27 +1,60 @@
+import importlib
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
-from .redis_config import r, ensure_symptom_index_exists
-from app.services.chat_services import symptom_questions, build_symptom_index, set_symptom_index
-from app.routes import (
-    chat_routes, 
-    classify_xray_routes,
-    imaging_routes,
-    process_ocr_routes,
-    physical_exam_results_routes,
-    analyze_qa_pexam_route,
-    analyze_lab_reports
-)
-from app.services.rag_setup import upsert_symptom_questions_to_vectorstore
-from app.vectorstore_config import vectorstore
+from app.startup_timing import startup_timer
+from app.config import LOCAL_QUESTION_INDEX_ENABLED, LLM_SERVER_ROUTERS, XRAY_WARMUP, XRAY_SQS_WORKER_ENABLED, OCR_SQS_WORKER_ENABLED
 
+# name -> module under app.routes; LLM_SERVER_ROUTERS picks a subset (e.g. "chat,metrics" for chat-only pods)
+ROUTERS = {
+    # --- Endpoint 1: Opneai Question and generate asnwer ---
+    "chat": "chat_routes",
+    # --- Endpoint 2: Fetch DICOM xray data from sqs queue and identify penumunia and store in dynamodb ---
+    "xray": "classify_xray_routes",
+    # --- Endpoint 3: Extract Image from aws health Imaging, store in s3 and return signed url---
+    "imaging": "imaging_routes",
+    # --- Endpoint 4: Fetch handwritten note using sqs queue and convert to text---
+    "ocr": "process_ocr_routes",
+    # --- Endpoint 5: Fetch physical exam results in text file and save to patient records---
+    "pexam": "physical_exam_results_routes",
+    # --- Endpoint 6: Analyze QA and physical exam results and send summary ---
+    "qa_pexam": "analyze_qa_pexam_route",
+    # --- Endpoint 7: Analyze lab results and send summary ---
+    "lab_reports": "analyze_lab_reports",
+    # --- Endpoint 8: Internal cache/queue metrics ---
+    "metrics": "metrics_routes",
+}
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    ensure_symptom_index_exists()
+def enabled_routers() -> list[str]:
+    if LLM_SERVER_ROUTERS in ("", "all"):
+        return list(ROUTERS)
+    wanted = {name.strip() for name in LLM_SERVER_ROUTERS.split(",")}
+    unknown = wanted - set(ROUTERS)
+    if unknown:
+        raise ValueError(f"Unknown LLM_SERVER_ROUTERS entries: {sorted(unknown)}")
+    return [name for name in ROUTERS if name in wanted]
+
+ENABLED_ROUTERS = enabled_routers()
+
+
+def _sync_symptom_questions() -> None:
+    from .redis_config import ensure_symptom_index_exists
+    from app.services.chat_services import symptom_questions, build_symptom_index, set_symptom_index
+    from app.services.rag_setup import build_question_docs, upsert_symptom_questions_to_vectorstore
+    from app.services.local_question_index import build_local_question_index, set_local_question_index
+    from app.vectorstore_config import vectorstore, embedding_model
+
+    with startup_timer.phase("lifespan:ensure_symptom_index"):
+        ensure_symptom_index_exists()
+
+    with startup_timer.phase("lifespan:upsert_symptom_questions"):
+        upsert_symptom_questions_to_vectorstore(vectorstore, symptom_questions)
+        idx = build_symptom_index(symptom_questions)
+        set_symptom_index(idx)
 
-    upsert_symptom_questions_to_vectorstore(vectorstore, symptom_questions)
-    idx = build_symptom_index(symptom_questions)
-    set_symptom_index(idx)
+    if LOCAL_QUESTION_INDEX_ENABLED:
+        with startup_timer.phase("lifespan:local_question_index"):
+            docs, _ = build_question_docs(symptom_questions)
+            set_local_question_index(build_local_question_index(docs, embedding_model))
 
     #Test if Questions are embedded
     # from redisvl.query.filter import Tag
@@ -29,30 +62,48 @@ async def lifespan(app: FastAPI):
     # flt = Tag("symptom") == "cough"
     # docs2 = vectorstore.similarity_search("start", k=50, filter=flt)
     # print("with-filter:", [(d.page_content, d.metadata) for d in docs2])
-   
-    yield
 
 
-app = FastAPI(lifespan=lifespan)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    job_queue = None
+    if "chat" in ENABLED_ROUTERS:
+        _sync_symptom_questions()
+        from app.services.job_queue import get_job_queue
+        job_queue = get_job_queue()  # handlers register when chat_routes imports app.workers.intake_jobs
+        job_queue.start()
 
+    if "xray" in ENABLED_ROUTERS and XRAY_WARMUP == "background":
+        from app.models.xray_model import warm_up_in_background
+        warm_up_in_background()
 
-# --- Endpoint 1: Opneai Question and generate asnwer ---
-app.include_router(chat_routes.router)
+    xray_worker = None
+    if "xray" in ENABLED_ROUTERS and XRAY_SQS_WORKER_ENABLED:
+        from app.workers.xray_sqs_worker import get_xray_worker
+        xray_worker = get_xray_worker()
+        xray_worker.start()
 
-# --- Endpoint 2: Fetch DICOM xray data from sqs queue and identify penumunia and store in dynamodb ---
-app.include_router(classify_xray_routes.router)
+    ocr_worker = None
+    if "ocr" in ENABLED_ROUTERS and OCR_SQS_WORKER_ENABLED:
+        from app.workers.ocr_worker import get_ocr_worker
+        ocr_worker = get_ocr_worker()
+        ocr_worker.start()
 
-# --- Endpoint 3: Extract Image from aws health Imaging, store in s3 and return signed url---
-app.include_router(imaging_routes.router)
+    startup_timer.print_report()
+    yield
 
-# --- Endpoint 4: Fetch handwritten note using sqs queue and convert to text---
-app.include_router(process_ocr_routes.router)
+    if xray_worker is not None:
+        await xray_worker.stop()
+    if ocr_worker is not None:
+        await ocr_worker.stop()
+    if job_queue is not None:
+        await job_queue.stop()
 
-# --- Endpoint 5: Fetch physical exam results in text file and save to patient records---
-app.include_router(physical_exam_results_routes.router)
 
-# --- Endpoint 6: Analyze QA and physical exam results and send summary ---
-app.include_router(analyze_qa_pexam_route.router)
+app = FastAPI(lifespan=lifespan)
 
-# --- Endpoint 7: Analyze lab results and send summary ---
-app.include_router(analyze_lab_reports.router)
+for name in ENABLED_ROUTERS:
+    module = ROUTERS[name]
+    with startup_timer.phase(f"import:{module}"):
+        routes = importlib.import_module(f"app.routes.{module}")
+    app.include_router(routes.router)
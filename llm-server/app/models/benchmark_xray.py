@@ -0,0 +1,116 @@
+# app/models/benchmark_xray.py
+"""
+Latency / throughput / FP32-agreement benchmark for the X-ray model variants.
+
+    python -m app.models.benchmark_xray --export            # write artifacts from the FP32 model (required once)
+    python -m app.models.benchmark_xray --runs 20 --batch-size 8
+"""
+import argparse
+import glob
+import os
+import statistics
+import time
+from typing import Dict, List
+
+import torch
+from PIL import Image
+
+from ..config import XRAY_MODEL_ARTIFACT_DIR
+from .xray_variants import VARIANTS, _artifact_path, build_fp32_model, export_artifacts, load_model
+
+IMAGES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "images")
+
+
+def _load_sample_batch() -> torch.Tensor:
+    from .xray_model import preprocess
+    paths = sorted(glob.glob(os.path.join(IMAGES_DIR, "*.jpg")))
+    if not paths:
+        raise FileNotFoundError(f"No sample images in {IMAGES_DIR}")
+    return torch.stack([preprocess(Image.open(p)) for p in paths])
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def benchmark_variant(variant: str, samples: torch.Tensor, reference: List[tuple], artifact_dir: str, runs: int, batch_size: int) -> Dict[str, float]:
+    from .xray_model import predict_tensors
+
+    batch = samples.repeat((batch_size + len(samples) - 1) // len(samples), 1, 1, 1)[:batch_size]
+
+    t0 = time.perf_counter()
+    net = load_model(variant, artifact_dir)
+    # Warm-up pays lazy init / per-shape compilation; count it as load cost
+    preds = predict_tensors(samples, net)
+    predict_tensors(samples[:1], net)
+    predict_tensors(batch, net)
+    load_s = time.perf_counter() - t0
+
+    single_ms = []
+    for i in range(runs):
+        x = samples[i % len(samples)].unsqueeze(0)
+        t = time.perf_counter()
+        predict_tensors(x, net)
+        single_ms.append((time.perf_counter() - t) * 1000)
+
+    t = time.perf_counter()
+    for _ in range(max(1, runs // 4)):
+        predict_tensors(batch, net)
+    throughput = batch_size * max(1, runs // 4) / (time.perf_counter() - t)
+
+    agree = sum(p[0] == r[0] for p, r in zip(preds, reference)) / len(reference)
+    max_conf_delta = max(abs(p[1] - r[1]) for p, r in zip(preds, reference))
+
+    return {
+        "load_s": load_s,
+        "p50_ms": statistics.median(single_ms),
+        "p95_ms": _percentile(single_ms, 95),
+        "imgs_per_s": throughput,
+        "label_agreement": agree,
+        "max_conf_delta": max_conf_delta,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--artifact-dir", default=XRAY_MODEL_ARTIFACT_DIR)
+    parser.add_argument("--variants", nargs="+", default=list(VARIANTS), choices=VARIANTS)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--export", action="store_true", help="(re)write all artifacts before benchmarking")
+    args = parser.parse_args()
+
+    # Without exported FP32 weights every build_fp32_model() call draws its own random classifier
+    # head, so the reference and the variants would not share weights and agreement means nothing
+    if not args.export and not os.path.exists(_artifact_path(args.artifact_dir, "fp32")):
+        parser.error(
+            f"no FP32 weights in {args.artifact_dir}; run with --export first so every variant "
+            "is loaded from the same state_dict"
+        )
+
+    samples = _load_sample_batch()
+
+    if args.export:
+        written = export_artifacts(build_fp32_model(args.artifact_dir), args.artifact_dir, samples)
+        for variant, path in written.items():
+            print(f"✅ exported {variant}: {path} ({os.path.getsize(path) / 1e6:.1f} MB)")
+
+    from .xray_model import predict_tensors
+    reference = predict_tensors(samples, load_model("fp32", args.artifact_dir))
+
+    print(f"{'variant':<14}{'load_s':>8}{'p50_ms':>9}{'p95_ms':>9}{'imgs/s':>9}{'agree':>8}{'max_dconf':>11}")
+    for variant in args.variants:
+        try:
+            r = benchmark_variant(variant, samples, reference, args.artifact_dir, args.runs, args.batch_size)
+        except Exception as e:
+            print(f"{variant:<14}  skipped: {e}")
+            continue
+        print(
+            f"{variant:<14}{r['load_s']:>8.2f}{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}"
+            f"{r['imgs_per_s']:>9.1f}{r['label_agreement']:>8.0%}{r['max_conf_delta']:>11.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
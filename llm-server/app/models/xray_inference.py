@@ -0,0 +1,121 @@
+# app/models/xray_inference.py
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Optional, Tuple
+
+import torch
+from PIL import Image
+
+from ..config import XRAY_BATCH_SIZE, XRAY_BATCH_WAIT_MS
+
+Prediction = Tuple[str, float]
+
+
+class XRayInferenceEngine:
+    """
+    Micro-batching front end for the X-ray classifier.
+    Callers preprocess on their own thread and enqueue a tensor; a single inference thread
+    drains the queue into batches of up to `max_batch_size`, waiting at most `max_wait_ms`
+    for a batch to fill, and resolves each caller's Future with its (label, confidence).
+    """
+
+    def __init__(
+        self,
+        predict_fn: Optional[Callable[[torch.Tensor], List[Prediction]]] = None,
+        preprocess_fn: Optional[Callable[[Image.Image], torch.Tensor]] = None,
+        max_batch_size: int = XRAY_BATCH_SIZE,
+        max_wait_ms: float = XRAY_BATCH_WAIT_MS,
+    ):
+        if predict_fn is None or preprocess_fn is None:
+            from .xray_model import predict_tensors, preprocess
+            predict_fn = predict_fn or predict_tensors
+            preprocess_fn = preprocess_fn or preprocess
+        self.predict_fn = predict_fn
+        self.preprocess_fn = preprocess_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_s = max_wait_ms / 1000.0
+        self._queue: "queue.Queue[Optional[Tuple[torch.Tensor, Future]]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.batches_run = 0
+        self.images_run = 0
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="xray-inference", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout)
+
+    def submit(self, image: Image.Image) -> Future:
+        self.start()
+        fut: Future = Future()
+        try:
+            self._queue.put((self.preprocess_fn(image), fut))
+        except Exception as e:
+            fut.set_exception(e)
+        return fut
+
+    def predict(self, image: Image.Image, timeout: Optional[float] = None) -> Prediction:
+        return self.submit(image).result(timeout=timeout)
+
+    async def apredict(self, image: Image.Image) -> Prediction:
+        # Preprocessing is CPU work; keep it off the event loop
+        fut = await asyncio.to_thread(self.submit, image)
+        return await asyncio.wrap_future(fut)
+
+    def _collect_batch(self, first: Tuple[torch.Tensor, Future]) -> Tuple[List[Tuple[torch.Tensor, Future]], bool]:
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait_s
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch, stopping = self._collect_batch(first)
+            futures = [f for _, f in batch]
+            try:
+                results = self.predict_fn(torch.stack([t for t, _ in batch]))
+                for fut, res in zip(futures, results):
+                    fut.set_result(res)
+                self.batches_run += 1
+                self.images_run += len(batch)
+            except Exception as e:
+                for fut in futures:
+                    if not fut.done():
+                        fut.set_exception(e)
+            if stopping:
+                return
+
+
+_engine: Optional[XRayInferenceEngine] = None
+_engine_lock = threading.Lock()
+
+def get_inference_engine() -> XRayInferenceEngine:
+    """Process-wide engine, started on first use."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = XRayInferenceEngine()
+    _engine.start()
+    return _engine
@@ -1,13 +1,39 @@
+import threading
 import torch
-from torchvision import models, transforms
-from torchvision.models import DenseNet121_Weights
+from torchvision import transforms
 from PIL import Image
+from ..config import XRAY_INTRA_OP_THREADS, XRAY_MODEL_VARIANT, XRAY_MODEL_ARTIFACT_DIR
+from .xray_variants import load_model
 
-# Load pretrained DenseNet121 model
-weights = DenseNet121_Weights.DEFAULT
-model = models.densenet121(weights=weights)
-model.classifier = torch.nn.Linear(1024, 2)
-model.eval()
+LABELS = ["Normal", "Pneumonia"]
+
+if XRAY_INTRA_OP_THREADS > 0:
+    torch.set_num_threads(XRAY_INTRA_OP_THREADS)
+
+# DenseNet121 in the configured variant (fp32 | compiled | torchscript | int8_dynamic | int8_static),
+# loaded on first use so importing this module stays cheap
+_model: torch.nn.Module | None = None
+_model_lock = threading.Lock()
+
+def get_model() -> torch.nn.Module:
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                _model = load_model(XRAY_MODEL_VARIANT, XRAY_MODEL_ARTIFACT_DIR)
+    return _model
+
+def warm_up_in_background() -> threading.Thread:
+    """Load the model and run one dummy batch off the request path."""
+    def _warm():
+        try:
+            predict_tensors(torch.zeros(1, 3, 224, 224))
+            print(f"✅ X-ray model warmed up ({XRAY_MODEL_VARIANT})")
+        except Exception as e:
+            print(f"⚠️ X-ray model warm-up failed: {e}")
+    thread = threading.Thread(target=_warm, name="xray-warmup", daemon=True)
+    thread.start()
+    return thread
 
 # Define image transform
 transform = transforms.Compose([
@@ -18,13 +44,26 @@ transform = transforms.Compose([
                          [0.229, 0.224, 0.225])
 ])
 
-def predict(image: Image.Image) -> tuple[str, float]:
-    image_tensor = transform(image).unsqueeze(0)
-    with torch.no_grad():
-        output = model(image_tensor)
+def preprocess(image: Image.Image) -> torch.Tensor:
+    """PIL image -> normalized 3x224x224 tensor (safe to run on caller threads)."""
+    return transform(image)
+
+def predict_tensors(batch: torch.Tensor, net: torch.nn.Module | None = None) -> list[tuple[str, float]]:
+    """Run one forward pass over an Nx3x224x224 batch (on `net`, default: the configured model)."""
+    net = net if net is not None else get_model()
+    with torch.inference_mode():
+        # NHWC is the faster conv layout on CPU (oneDNN)
+        output = net(batch.contiguous(memory_format=torch.channels_last))
         probs = torch.nn.functional.softmax(output, dim=1)
-        _, pred = torch.max(probs, 1)
+        confs, preds = torch.max(probs, 1)
+
+    return [
+        (LABELS[p], round(float(c), 3))
+        for p, c in zip(preds.tolist(), confs.tolist())
+    ]
 
-    label = ["Normal", "Pneumonia"][pred.item()]
-    confidence = float(probs[0][pred])
-    return label, round(confidence, 3)
\ No newline at end of file
+def predict_batch(images: list[Image.Image]) -> list[tuple[str, float]]:
+    return predict_tensors(torch.stack([preprocess(img) for img in images]))
+
+def predict(image: Image.Image) -> tuple[str, float]:
+    return predict_batch([image])[0]
@@ -0,0 +1,99 @@
+# app/models/xray_variants.py
+import copy
+import os
+from typing import Dict
+
+import torch
+from torchvision import models
+from torchvision.models import DenseNet121_Weights
+
+VARIANTS = ("fp32", "compiled", "torchscript", "int8_dynamic", "int8_static")
+
+ARTIFACT_FILES = {
+    "fp32": "densenet121_fp32.pt",              # state_dict (pins the classifier head)
+    "torchscript": "densenet121_ts.pt",         # traced + frozen FP32
+    "int8_dynamic": "densenet121_int8_dynamic.pt",  # dynamic INT8 Linear layers, traced
+    "int8_static": "densenet121_int8_static.pt",    # FX static INT8 (conv + linear), traced
+}
+
+
+def _artifact_path(artifact_dir: str, variant: str) -> str:
+    return os.path.join(artifact_dir, ARTIFACT_FILES[variant])
+
+
+def build_fp32_model(artifact_dir: str) -> torch.nn.Module:
+    """DenseNet121 with the 2-class head; uses exported FP32 weights when present so every worker agrees."""
+    model = models.densenet121(weights=DenseNet121_Weights.DEFAULT)
+    model.classifier = torch.nn.Linear(1024, 2)
+    path = _artifact_path(artifact_dir, "fp32")
+    if os.path.exists(path):
+        model.load_state_dict(torch.load(path, map_location="cpu", weights_only=True))
+    return model.eval()
+
+
+def _quantized_engine() -> str:
+    engines = torch.backends.quantized.supported_engines
+    return "x86" if "x86" in engines else ("fbgemm" if "fbgemm" in engines else engines[0])
+
+
+def export_artifacts(model: torch.nn.Module, artifact_dir: str, calibration_batch: torch.Tensor) -> Dict[str, str]:
+    """
+    Write every optimized variant derived from `model` (the FP32 reference).
+    `calibration_batch` (Nx3x224x224) doubles as the trace example and static-quantization calibration data.
+    """
+    os.makedirs(artifact_dir, exist_ok=True)
+    model = model.eval()
+    example = calibration_batch[:1]
+    written: Dict[str, str] = {}
+
+    path = _artifact_path(artifact_dir, "fp32")
+    torch.save(model.state_dict(), path)
+    written["fp32"] = path
+
+    with torch.inference_mode():
+        traced = torch.jit.freeze(torch.jit.trace(model, example))
+    path = _artifact_path(artifact_dir, "torchscript")
+    torch.jit.save(traced, path)
+    written["torchscript"] = path
+
+    dynamic = torch.ao.quantization.quantize_dynamic(copy.deepcopy(model), {torch.nn.Linear}, dtype=torch.qint8)
+    with torch.inference_mode():
+        traced = torch.jit.trace(dynamic, example)
+    path = _artifact_path(artifact_dir, "int8_dynamic")
+    torch.jit.save(traced, path)
+    written["int8_dynamic"] = path
+
+    from torch.ao.quantization import get_default_qconfig_mapping
+    from torch.ao.quantization.quantize_fx import prepare_fx, convert_fx
+
+    engine = _quantized_engine()
+    torch.backends.quantized.engine = engine
+    prepared = prepare_fx(copy.deepcopy(model), get_default_qconfig_mapping(engine), (example,))
+    with torch.inference_mode():
+        prepared(calibration_batch)
+        static = convert_fx(prepared)
+        traced = torch.jit.trace(static, example)
+    path = _artifact_path(artifact_dir, "int8_static")
+    torch.jit.save(traced, path)
+    written["int8_static"] = path
+
+    return written
+
+
+def load_model(variant: str, artifact_dir: str) -> torch.nn.Module:
+    """Load the requested variant; TorchScript/INT8 variants must have been exported first."""
+    if variant not in VARIANTS:
+        raise ValueError(f"Unknown XRAY_MODEL_VARIANT '{variant}', expected one of {VARIANTS}")
+
+    if variant in ("fp32", "compiled"):
+        model = build_fp32_model(artifact_dir).to(memory_format=torch.channels_last)
+        return torch.compile(model) if variant == "compiled" else model
+
+    path = _artifact_path(artifact_dir, variant)
+    if not os.path.exists(path):
+        raise FileNotFoundError(
+            f"X-ray model artifact not found: {path}. Run `python -m app.models.benchmark_xray --export` first."
+        )
+    if variant.startswith("int8"):
+        torch.backends.quantized.engine = _quantized_engine()
+    return torch.jit.load(path, map_location="cpu").eval()
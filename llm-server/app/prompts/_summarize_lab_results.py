@@ -1,21 +1,23 @@
-from langchain_openai import ChatOpenAI
 from langchain.schema import SystemMessage, HumanMessage
+from ..llm_config import get_chat_model, ainvoke_llm
 
-def _summarize_doctor_style(patient_id: str, encounter_id: str, hp_summary: str, xray_text: str, lab_text: str) -> str:
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.5)
+def _llm():
+    return get_chat_model("gpt-4o-mini", temperature=0.5)
 
+def _build_messages(patient_id: str, encounter_id: str, hp_summary: str, xray_text: str, lab_text: str) -> list:
     system = SystemMessage(content=(
         "You are a careful clinician. Synthesize X-ray AI findings and a lab-report into a concise, "
         "clinically useful summary. Include: (1) salient positives/negatives with numbers if present, "
         "(2) differential considerations as appropriate, (3) recommended next steps in neutral, "
-        "non-prescriptive language, and (4) short bracketed citations like [XRay] or [Lab]. Avoid guessing."
+        "non-prescriptive language, and (4) short bracketed citations like [XRay] or [Lab]. Avoid guessing. "
+        "Lab values may be given as a table (analyte | value | unit | ref | flag, H/L = above/below range)."
     ))
 
     context = (
         f"Patient: {patient_id}\nEncounter: {encounter_id}\n\n"
         f"== H&P Summary == [H&P]\n{hp_summary}\n\n"
         f"== XRay ==\n{xray_text}\n\n"
-        f"== Lab Report (PDF Text) ==\n{lab_text if lab_text.strip() else 'No lab text extracted.'}\n"
+        f"== Lab Report ==\n{lab_text if lab_text.strip() else 'No lab text extracted.'}\n"
     )
 
     user = HumanMessage(content=(
@@ -24,5 +26,12 @@ def _summarize_doctor_style(patient_id: str, encounter_id: str, hp_summary: str,
         "\n\nContext:\n" + context
     ))
 
-    resp = llm.invoke([system, user])
+    return [system, user]
+
+def _summarize_doctor_style(patient_id: str, encounter_id: str, hp_summary: str, xray_text: str, lab_text: str) -> str:
+    resp = _llm().invoke(_build_messages(patient_id, encounter_id, hp_summary, xray_text, lab_text))
+    return resp.content
+
+async def _asummarize_doctor_style(patient_id: str, encounter_id: str, hp_summary: str, xray_text: str, lab_text: str) -> str:
+    resp = await ainvoke_llm(_llm(), _build_messages(patient_id, encounter_id, hp_summary, xray_text, lab_text))
     return resp.content
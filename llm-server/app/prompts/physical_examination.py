@@ -1,15 +1,8 @@
 import json, re
-from langchain_openai import ChatOpenAI
 from langchain.schema import HumanMessage
-from ..config import OPENAI_API_KEY
+from ..llm_config import get_chat_model, ainvoke_llm
 
 
-llm = ChatOpenAI(
-    model="gpt-4o",
-    temperature=0,
-    openai_api_key=OPENAI_API_KEY
-)
-
 def clean_json_block(text: str) -> str:
     # Extract JSON inside code block: ```json ... ```
     match = re.search(r"```json\n(.*?)```", text, re.DOTALL)
@@ -18,8 +11,8 @@ def clean_json_block(text: str) -> str:
     return text.strip()
 
 
-def ask_gpt_to_extract_vitals(text: str):
-    prompt = f"""
+def _vitals_prompt(text: str) -> str:
+    return f"""
       You are a medical assistant. Extract the following values from the given text:
 
       - Temperature
@@ -41,8 +34,8 @@ def ask_gpt_to_extract_vitals(text: str):
       {text}
     """
 
-    response = llm([HumanMessage(content=prompt)])
-    content = response.content
+
+def _parse_vitals(content: str):
     cleaned = clean_json_block(content)
 
     try:
@@ -51,4 +44,13 @@ def ask_gpt_to_extract_vitals(text: str):
         raise ValueError("OpenAI did not return valid JSON:\n" + content)
 
     return result
-    
\ No newline at end of file
+
+
+def ask_gpt_to_extract_vitals(text: str):
+    response = get_chat_model("gpt-4o", temperature=0).invoke([HumanMessage(content=_vitals_prompt(text))])
+    return _parse_vitals(response.content)
+
+
+async def aask_gpt_to_extract_vitals(text: str):
+    response = await ainvoke_llm(get_chat_model("gpt-4o", temperature=0), [HumanMessage(content=_vitals_prompt(text))])
+    return _parse_vitals(response.content)
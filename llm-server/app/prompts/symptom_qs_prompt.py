@@ -1,13 +1,11 @@
 import json
 import re
 from typing import Dict, List, Any
-from langchain_openai import ChatOpenAI
 from langchain.schema import HumanMessage, SystemMessage
+from ..llm_config import get_chat_model, ainvoke_llm
 
 SECTION_ORDER = ["chiefComplaint", "HPI", "PMH", "Medications", "SH", "FH"]
 
-llm = ChatOpenAI(model="gpt-4o", temperature=0)
-
 def _coerce_text(value: Any) -> str:
     if value is None:
         return ""
@@ -81,7 +79,7 @@ Sectioned Q&A:
 {body}
 """.strip())
 
-    resp = await llm.ainvoke([system, user])
+    resp = await ainvoke_llm(get_chat_model("gpt-4o", temperature=0), [system, user])
     raw = (resp.content or "").strip()
 
     # Try strict JSON parsing (with code-fence/mixed-output tolerance)
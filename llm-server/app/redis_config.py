@@ -4,17 +4,15 @@ from redis.commands.search.index_definition import IndexDefinition, IndexType
 from redis.commands.search.query import Query as RedisQuery
 from redis.exceptions import ResponseError
 
+from app.config import REDIS_URL
+
 
 INDEX_NAME = "symptom_index"
 VECTOR_DIM = 1536
 VECTOR_FIELD_NAME = "embedding"
 DISTANCE_METRIC = "COSINE"
 
-r = redis.Redis(
-    host='localhost',
-    port=6379,
-    decode_responses=False,
-)
+r = redis.Redis.from_url(REDIS_URL, decode_responses=False)
 
 def ensure_symptom_index_exists():
     try:
@@ -1,48 +1,125 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, Tuple
 from fastapi import APIRouter, HTTPException
-from boto3.dynamodb.conditions import Key
-from ..config import table, s3, S3_BUCKET_PATIENT_RECORDS
-from app.services.fetch_bloodtest_text import _fetch_bloodtest_text
+from ..config import S3_BUCKET_PATIENT_RECORDS, LAB_FETCH_WORKERS
+from app.services.patient_record_repository import get_patient_repository
+from app.services.patient_timeline import aget_patient_timeline, patient_timeline_scope
+from app.services.fetch_bloodtest_text import _fetch_bloodtest_text, _bloodtest_key
 from app.services._format_xray_items import _format_xray_items
-from app.prompts._summarize_lab_results import _summarize_doctor_style
-from app.services.hp_summary_service import build_hp_summary_for_patient
+from app.services.xray_classification_service import XRAY_PREFIX, xray_history
+from app.services.lab_values import load_or_extract_lab_values, load_lab_values, format_lab_table, to_rows, is_abnormal
+from app.prompts._summarize_lab_results import _asummarize_doctor_style
+from app.services.hp_summary_service import abuild_hp_summary_for_patient
 
 
 router = APIRouter()
 
+# Per-branch deadlines (seconds); a branch that misses its deadline is reported and left out
+BRANCH_TIMEOUTS = {
+    "xray": 10.0,
+    "lab": 30.0,
+    "hp_summary": 60.0,
+}
+
+# asyncio.wait_for cancels the awaiting coroutine, not a thread it handed work to: a timed-out
+# S3 download or PDF parse keeps running to completion. The lab branch therefore runs on its own
+# small pool, so abandoned work can occupy at most LAB_FETCH_WORKERS threads instead of
+# starving the default executor shared with the rest of the app.
+lab_executor = ThreadPoolExecutor(max_workers=LAB_FETCH_WORKERS, thread_name_prefix="lab-fetch")
+
+async def _in_lab_thread(fn: Callable[..., Any], *args: Any) -> Any:
+    return await asyncio.get_running_loop().run_in_executor(lab_executor, partial(fn, *args))
+
+async def _query_xray_items(patient_id: str) -> list:
+    return xray_history((await aget_patient_timeline(patient_id)).records(XRAY_PREFIX))
+
+async def _fetch_lab_report(patient_id: str, encounter_id: str) -> Tuple[str, str, list]:
+    """(S3 key, extracted text, structured rows); rows are re-parsed only when the text changed."""
+    key, text = await _in_lab_thread(_fetch_bloodtest_text, patient_id, encounter_id)
+    if not text.strip():
+        return key, text, []
+    timeline = await aget_patient_timeline(patient_id)
+    rows = await _in_lab_thread(
+        load_or_extract_lab_values, get_patient_repository(), patient_id, encounter_id, key, text, timeline
+    )
+    return key, text, rows
+
+async def _run_branch(name: str, awaitable: Awaitable[Any]) -> Tuple[Any, str | None]:
+    """
+    Await one fan-out branch under its deadline; returns (result, None) or (None, error).
+    On timeout the coroutine is cancelled, but thread work it started is only abandoned (see lab_executor).
+    """
+    try:
+        return await asyncio.wait_for(awaitable, timeout=BRANCH_TIMEOUTS[name]), None
+    except asyncio.TimeoutError:
+        return None, f"timed out after {BRANCH_TIMEOUTS[name]:.0f}s"
+    except HTTPException as e:
+        return None, str(e.detail)
+    except Exception as e:
+        return None, str(e)
+
 @router.get("/analyzing/lab-reports/{patient_id}")
-def analyze_lab_reports(patient_id: str):
+async def analyze_lab_reports(patient_id: str):
     encounter_id: str = "encounter-20250819-7f3a4c92"
     try:
-       # Fetching xray results from dynamodb - json
-       xray_result_resp = table.query(
-           KeyConditionExpression=Key("patientId").eq(patient_id) & Key("SK").begins_with("XRay#"),
-           ScanIndexForward=False
-       )
-       xray_items = xray_result_resp.get("Items", [])
-       
-       # Fetching blood test report from s3 - pdf
-       lab_key, lab_text = _fetch_bloodtest_text(patient_id, encounter_id)
+       # Fan out: X-ray results (DynamoDB), blood test report (S3 pdf) and H&P summary run concurrently.
+       # All three read the same patient timeline, so the review costs one DynamoDB query.
+       with patient_timeline_scope():
+           (xray_items, xray_err), (lab, lab_err), (hp_summary, hp_err) = await asyncio.gather(
+               _run_branch("xray", _query_xray_items(patient_id)),
+               _run_branch("lab", _fetch_lab_report(patient_id, encounter_id)),
+               _run_branch("hp_summary", abuild_hp_summary_for_patient(patient_id)),
+           )
+       errors: Dict[str, str] = {
+           name: err
+           for name, err in (("xray", xray_err), ("lab", lab_err), ("hp_summary", hp_err))
+           if err
+       }
+       if len(errors) == len(BRANCH_TIMEOUTS):
+           raise HTTPException(status_code=502, detail=f"All record sources failed: {errors}")
 
-       xray_text = _format_xray_items(xray_items)
+       # Fan in: summarize whatever arrived, marking missing parts explicitly
+       xray_items = xray_items or []
+       xray_text = _format_xray_items(xray_items) if not xray_err else "X-ray results unavailable."
+       lab_key, lab_text, lab_rows = lab if lab else (_bloodtest_key(patient_id, encounter_id), "", [])
+       # The summarizer gets the compact table; free text only when no rows could be parsed
+       lab_context = format_lab_table(lab_rows) if lab_rows else lab_text
+       hp_summary = hp_summary if not hp_err else "H&P summary unavailable."
 
-       hp_summary = build_hp_summary_for_patient(patient_id)
-
-       summary = _summarize_doctor_style(patient_id, encounter_id, hp_summary, xray_text, lab_text)
+       summary = await _asummarize_doctor_style(patient_id, encounter_id, hp_summary, xray_text, lab_context)
 
        return {
             "patient_id": patient_id,
             "encounter_id": encounter_id,
             "lab_report_s3_key": f"s3://{S3_BUCKET_PATIENT_RECORDS}/{lab_key}",
-            "hp_summary_included": bool(hp_summary and hp_summary.strip() and hp_summary != "No H&P data found."),
+            "hp_summary_included": not hp_err and bool(hp_summary and hp_summary.strip() and hp_summary != "No H&P data found."),
             "xray_items_count": len(xray_items),
             "review_summary_lab_reports": summary,
             "partials": {
                 "hp_summary": hp_summary,
                 "xray_text": xray_text,
-                "lab_excerpt": lab_text[:500] + ("..." if lab_text and len(lab_text) > 500 else "")
-            }
+                "lab_excerpt": lab_text[:500] + ("..." if lab_text and len(lab_text) > 500 else ""),
+                "lab_abnormal": [r for r in lab_rows if is_abnormal(r)],
+            },
+            "lab_values_count": len(lab_rows),
+            "partial_errors": errors
         }
     except HTTPException:
         raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error fetching records: {e}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error fetching records: {e}")
+
+@router.get("/lab-values/{patient_id}/{encounter_id}")
+def get_lab_values(patient_id: str, encounter_id: str, abnormal_only: bool = False):
+    item = load_lab_values(get_patient_repository(), patient_id, encounter_id)
+    if not item:
+        raise HTTPException(status_code=404, detail="No lab values stored for this encounter")
+    rows = to_rows(item)
+    return {
+        "patient_id": patient_id,
+        "encounter_id": encounter_id,
+        "source_key": item.get("sourceKey"),
+        "values": [r for r in rows if is_abnormal(r)] if abnormal_only else rows,
+    }
@@ -1,16 +1,17 @@
 # routes/chat_routes.py
 
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import AsyncIterator, Dict, List, Optional, Tuple
+from typing import AsyncIterator, List, Optional
 
-from app.services.rag_next import get_next_question, mark_question_asked
+from app.services.rag_next import get_next_question_in_sections, mark_question_asked
 from app.services.chat_services import extract_symptom, retrieve_symptom_questions
-from app.services.dynamodb_services import save_chat_history_to_dynamodb
 from app.services.validators import validate_user_input
-from app.prompts.symptom_qs_prompt import run_langchain_extraction
-from langchain_openai import ChatOpenAI
+from app.services.session_store import IntakeSession, SessionConflictError, get_session_store
+from app.services.job_queue import get_job_queue
+from app.workers.intake_jobs import FINALIZE_INTAKE
+from app.llm_config import llm_semaphore
 
 router = APIRouter()
 
@@ -19,6 +20,8 @@ class Query(BaseModel):
     patient_id: str
     message: str
 
+COMPLETION_MESSAGE = "Thanks! I’ve collected everything I need."
+
 SECTION_ORDER = ["chiefComplaint", "HPI", "PMH", "Medications", "SH", "FH"]
 
 # Coverage targets
@@ -39,74 +42,77 @@ SECTION_MAX = {
     "FH": 1,
 }
 
-# ---- Session state (in-memory) ----
-session_symptom_map: Dict[str, str] = {}
-# e.g. {"id": "...", "symptom": "...", "section": "HPI", "question_text": "..."}
-session_last_doc_meta: Dict[str, Dict[str, str]] = {}
-# {sec: [ {"q": "...", "a": "..."} ]}
-session_qas_map: Dict[str, Dict[str, List[Dict[str, str]]]] = {}
-# Track current section in the conversation flow
-session_current_section: Dict[str, str] = {}
-
-llm = ChatOpenAI(model="gpt-4o", temperature=0)
-
 # ---------- Coverage helpers ----------
-def section_count(session_id: str, section: str) -> int:
-    return len(session_qas_map.get(session_id, {}).get(section, []))
+def section_count(session: IntakeSession, section: str) -> int:
+    return len(session.qas.get(section, []))
 
-def has_met_min_coverage(session_id: str) -> bool:
+def has_met_min_coverage(session: IntakeSession) -> bool:
     for sec in SECTION_ORDER:
-        if section_count(session_id, sec) < SECTION_MIN[sec]:
+        if section_count(session, sec) < SECTION_MIN[sec]:
             return False
     return True
 
-def is_at_max_for_section(session_id: str, section: str) -> bool:
-    return section_count(session_id, section) >= SECTION_MAX[section]
+def is_at_max_for_section(session: IntakeSession, section: str) -> bool:
+    return section_count(session, section) >= SECTION_MAX[section]
 
-def advance_to_next_section(session_id: str, current_section: str) -> Optional[str]:
+def advance_to_next_section(session: IntakeSession, current_section: str) -> Optional[str]:
     try:
         idx = SECTION_ORDER.index(current_section)
     except ValueError:
         idx = -1
     for j in range(idx + 1, len(SECTION_ORDER)):
         sec = SECTION_ORDER[j]
-        if not is_at_max_for_section(session_id, sec):
-            session_current_section[session_id] = sec
+        if not is_at_max_for_section(session, sec):
+            session.current_section = sec
+            return sec
+    return None
+
+def first_section_below_min(session: IntakeSession) -> Optional[str]:
+    for sec in SECTION_ORDER:
+        if section_count(session, sec) < SECTION_MIN[sec]:
             return sec
     return None
 
+def format_history(session: IntakeSession) -> str:
+    lines = []
+    for sec in SECTION_ORDER:
+        for qa in session.qas.get(sec, []):
+            lines.append(f"[{sec}] Q: {qa['q']}\nA: {qa['a']}")
+    return "\n".join(lines) or "(nothing yet)"
+
+def remaining_sections(session: IntakeSession, start_section: str) -> List[str]:
+    """start_section followed by every later section that is still below its MAX, in SECTION_ORDER."""
+    sections = [start_section]
+    try:
+        idx = SECTION_ORDER.index(start_section)
+    except ValueError:
+        idx = -1
+    for sec in SECTION_ORDER[idx + 1:]:
+        if not is_at_max_for_section(session, sec):
+            sections.append(sec)
+    return sections
+
 async def try_get_next_in_or_after_section(
-    session_id: str,
+    session: IntakeSession,
     symptom: str,
     user_hint: str,
     start_section: str,
 ):
-    """Try current section; if none, advance until a question is found or sections are exhausted."""
-    # Try current section
-    nxt = await get_next_question(
-        session_id,
+    """Pick from the current section, else the first later section with an unasked question (one retrieval)."""
+    found = await get_next_question_in_sections(
+        session,
         symptom,
+        remaining_sections(session, start_section),
         user_hint=user_hint,
-        section_filter=start_section,
     )
-    if nxt:
-        return start_section, nxt
-
-    # Otherwise advance through remaining sections
-    sec = advance_to_next_section(session_id, start_section)
-    while sec:
-        nxt = await get_next_question(
-            session_id,
-            symptom,
-            user_hint=user_hint,
-            section_filter=sec,
-        )
-        if nxt:
-            return sec, nxt
-        sec = advance_to_next_section(session_id, sec)
+    if not found:
+        # Nothing found anywhere
+        return None, None
 
-    # Nothing found anywhere
-    return None, None
+    sec, nxt = found
+    if sec != start_section:
+        session.current_section = sec
+    return sec, nxt
 
 # ---------- Route ----------
 @router.post("/generate-answer")
@@ -115,8 +121,11 @@ async def generate_answer(query: Query):
     patient_id = query.patient_id
     user_message = (query.message or "").strip()
 
+    store = get_session_store()
+    session = await store.load(session_id)
+
     # ---- First turn: detect symptom, init state, ask CC first ----
-    if session_id not in session_symptom_map:
+    if session is None:
         symptom = extract_symptom(user_message)
         if not symptom:
             return stream_response(
@@ -124,10 +133,12 @@ async def generate_answer(query: Query):
             )
 
         # Initialize session
-        session_symptom_map[session_id] = symptom
-        session_last_doc_meta[session_id] = {}
-        session_qas_map[session_id] = {sec: [] for sec in SECTION_ORDER}
-        session_current_section[session_id] = "chiefComplaint"
+        session = IntakeSession(
+            session_id=session_id,
+            symptom=symptom,
+            current_section="chiefComplaint",
+            qas={sec: [] for sec in SECTION_ORDER},
+        )
 
         # Ask chiefComplaint[0] from JSON if available; otherwise generic CC
         qs = retrieve_symptom_questions(symptom) or {}
@@ -142,20 +153,21 @@ async def generate_answer(query: Query):
             )
 
         # Mark CC as asked so RAG won’t repeat it later
-        mark_question_asked(session_id, next_question)
+        mark_question_asked(session, next_question)
 
         # Stash meta so we can store the answer next turn
-        session_last_doc_meta[session_id] = {
+        session.last_doc_meta = {
             "id": "",
             "symptom": symptom,
             "section": "chiefComplaint",
             "question_text": next_question,
         }
+        await _save_session(session)
         return stream_response(next_question)
 
     # ---- Subsequent turns ----
-    symptom = session_symptom_map[session_id]
-    last_q = (session_last_doc_meta.get(session_id, {}).get("question_text") or "").strip()
+    symptom = session.symptom
+    last_q = (session.last_doc_meta.get("question_text") or "").strip()
 
     # Validate input; do NOT advance on invalid input
     ok, why = await validate_user_input(symptom, user_message, last_question=last_q)
@@ -164,60 +176,122 @@ async def generate_answer(query: Query):
         return stream_response(msg)
 
     # Save Q&A pair for the section we last asked from
-    last_meta = session_last_doc_meta.get(session_id, {})
-    last_section = last_meta.get("section", "HPI")
+    last_section = session.last_doc_meta.get("section", "HPI")
     if last_q:
-        session_qas_map[session_id][last_section].append({"q": last_q, "a": user_message})
+        session.qas.setdefault(last_section, []).append({"q": last_q, "a": user_message})
 
     # Determine current section (may advance if section hit MAX)
-    current_section = session_current_section.get(session_id, "chiefComplaint")
-    if is_at_max_for_section(session_id, current_section):
-        next_sec = advance_to_next_section(session_id, current_section)
+    current_section = session.current_section or "chiefComplaint"
+    if is_at_max_for_section(session, current_section):
+        next_sec = advance_to_next_section(session, current_section)
         if next_sec:
             current_section = next_sec
 
     # If ALL mins are already met, finish right away (even if RAG has more)
-    if has_met_min_coverage(session_id):
-        extracted = await run_langchain_extraction(session_qas_map[session_id])
-        save_chat_history_to_dynamodb(patient_id, session_id, extracted)
-        _cleanup_session(session_id)
-        return stream_response("Thanks! I’ve collected everything I need.")
+    if has_met_min_coverage(session):
+        return await _finish(session, patient_id)
 
     # Try to get a question in current section; if none, advance until we find one
     target_section, nxt = await try_get_next_in_or_after_section(
-        session_id,
+        session,
         symptom,
         user_hint=user_message if user_message else symptom,
         start_section=current_section,
     )
 
     if not nxt:
-        # No more questions anywhere → if mins met, finish; otherwise finish best‑effort
-        extracted = await run_langchain_extraction(session_qas_map[session_id])
-        save_chat_history_to_dynamodb(patient_id, session_id, extracted)
-        _cleanup_session(session_id)
-        return stream_response("Thanks! I’ve collected everything I need.")
+        # No stored question left but coverage isn't met: stream an LLM follow-up for the first short section
+        fallback_section = first_section_below_min(session)
+        if fallback_section:
+            return await stream_generated_question(session, fallback_section)
+        return await _finish(session, patient_id)
 
     # Ask the found question
     next_question, meta = nxt
     meta["question_text"] = next_question
     # Update current section in case we advanced
     if target_section:
-        session_current_section[session_id] = target_section
+        session.current_section = target_section
         meta["section"] = target_section
-    session_last_doc_meta[session_id] = meta
+    session.last_doc_meta = meta
 
+    await _save_session(session)
     return stream_response(next_question)
 
-# ---- SSE helper ----
+# ---- Session persistence ----
+async def _save_session(session: IntakeSession) -> None:
+    """Write the turn's state back; a concurrent turn for the same session wins and this one is rejected."""
+    try:
+        await get_session_store().save(session)
+    except SessionConflictError:
+        raise HTTPException(
+            status_code=409,
+            detail="This conversation was updated by another request. Please resend your answer.",
+        )
+
+# ---- Finalization (runs on the job queue, off the request path) ----
+async def _finish(session: IntakeSession, patient_id: str) -> StreamingResponse:
+    """Queue extraction + the DynamoDB write and send the closing message right away."""
+    # Keyed on the intake, not the session id, which clients may reuse across conversations
+    try:
+        queued = await get_job_queue().enqueue(
+            FINALIZE_INTAKE,
+            {"patient_id": patient_id, "session_id": session.session_id, "qas": session.qas},
+            idempotency_key=f"{FINALIZE_INTAKE}:{session.intake_id}",
+        )
+    except Exception as e:
+        # The session is kept, so resending the last answer finishes the intake again
+        print(f"❌ Could not queue intake {session.intake_id}: {e}")
+        raise HTTPException(status_code=503, detail="Could not save your answers. Please resend your last message.")
+    if not queued:
+        print(f"⚠️ Intake {session.intake_id} was already queued; treating this turn as a retry")
+
+    # Deleted only once the job is queued, so a follow-up message starts a new intake
+    await get_session_store().delete(session.session_id)
+    return stream_response(COMPLETION_MESSAGE)
+
+# ---- SSE helpers ----
+def _sse_event(text: str) -> str:
+    # Multi-line payloads become several data: lines of one event
+    return "".join(f"data: {line}\n" for line in text.split("\n")) + "\n"
+
 def stream_response(message: str) -> StreamingResponse:
     async def streaming_generator() -> AsyncIterator[str]:
-        yield f"data: {message}\n\n"
+        yield _sse_event(message)
     return StreamingResponse(streaming_generator(), media_type="text/event-stream")
 
-# ---- cleanup ----
-def _cleanup_session(session_id: str) -> None:
-    session_symptom_map.pop(session_id, None)
-    session_last_doc_meta.pop(session_id, None)
-    session_qas_map.pop(session_id, None)
-    session_current_section.pop(session_id, None)
+async def stream_generated_question(session: IntakeSession, section: str) -> StreamingResponse:
+    """Stream a follow-up from rag_chain token by token, then record it as the question just asked."""
+    from app.services.rag_chain import rag_chain
+
+    # The user's answer is saved (or the turn rejected with 409) before anything is streamed.
+    # No question is pending until the generated one is recorded, so a reply that arrives
+    # before then is never filed under the previous question.
+    session.current_section = section
+    session.last_doc_meta = {"id": "", "symptom": session.symptom, "section": section, "question_text": ""}
+    await _save_session(session)
+
+    async def streaming_generator() -> AsyncIterator[str]:
+        parts: List[str] = []
+        try:
+            async with llm_semaphore:
+                async for chunk in rag_chain.astream({"symptom": session.symptom, "history": format_history(session)}):
+                    token = getattr(chunk, "content", chunk)
+                    if token:
+                        parts.append(token)
+                        yield _sse_event(token)
+        except Exception as e:
+            print(f"⚠️ Streaming follow-up question failed: {e}")
+            if not parts:
+                parts = [f"Could you tell me a bit more about your {session.symptom}?"]
+                yield _sse_event(parts[0])
+
+        question = "".join(parts).strip()
+        mark_question_asked(session, question)
+        session.last_doc_meta = {"id": "", "symptom": session.symptom, "section": section, "question_text": question}
+        try:
+            await get_session_store().save(session)
+        except SessionConflictError:
+            print(f"⚠️ Session {session.session_id} changed while streaming; generated question not recorded")
+
+    return StreamingResponse(streaming_generator(), media_type="text/event-stream")
@@ -1,18 +1,10 @@
 from fastapi import APIRouter
-from PIL import Image
-from io import BytesIO
-from decimal import Decimal
-from datetime import datetime
-import json, gzip
+import json
 from ..config import (
     sqs,
-    healthimaging,
-    table,
     DICOM_IMPORT_QUEUE_URL,
-    DATASTORE_ID,
 )
-from ..models.xray_model import predict
-from datetime import datetime
+from app.services.xray_classification_service import fetch_first_frame_image, save_xray_result
 
 router = APIRouter()
 
@@ -39,55 +31,18 @@ def process_one_job():
         )
         return {"error": "Message missing imageSetId"}
 
-    # Fetch and decompress image set metadata
-    metadata_blob = healthimaging.get_image_set_metadata(
-        datastoreId=DATASTORE_ID,
-        imageSetId=image_set_id
-    )["imageSetMetadataBlob"]
-
-    metadata_json = json.loads(gzip.decompress(metadata_blob.read()))
-
-    # Extract patient ID and frame ID
-    patient_id = metadata_json.get("Patient", {}).get("DICOM", {}).get("PatientID")
-
-    # Extract first available image frame ID
-    frame_id = next(
-        (
-            frame.get("ID")
-            for series in metadata_json.get("Study", {}).get("Series", {}).values()
-            for instance in series.get("Instances", {}).values()
-            for frame in instance.get("ImageFrames", [])
-            if "ID" in frame
-        ),
-        None
-    )
-
-    if not frame_id:
+    # Fetch image set metadata and first frame
+    patient_id, image = fetch_first_frame_image(image_set_id)
+    if image is None:
         return {"error": "No frame ID found in metadata"}
 
-    # Fetch image and run prediction
-    image_bytes = healthimaging.get_image_frame(
-        datastoreId=DATASTORE_ID,
-        imageSetId=image_set_id,
-        imageFrameInformation={"imageFrameId": frame_id}
-    )["imageFrameBlob"].read()
+    # Imported here so torch only loads in pods that actually classify
+    from ..models.xray_inference import get_inference_engine
 
-    image = Image.open(BytesIO(image_bytes)).convert("RGB")
-    label, confidence = predict(image)
+    label, confidence = get_inference_engine().predict(image)
 
-    timestamp = datetime.utcnow().isoformat()
     # Save to DynamoDB
-    table.put_item(
-        Item={
-            "patientId": patient_id,
-            "SK": f"XRay#{timestamp}",
-            "recordType": "XRay",
-            "timestamp": timestamp,
-            "imageSetId": image_set_id,
-            "prediction": label,
-            "confidence": Decimal(str(confidence))
-        }
-    )
+    save_xray_result(patient_id, image_set_id, label, confidence)
 
     # Clean up processed message
     sqs.delete_message(
@@ -0,0 +1,51 @@
+from fastapi import APIRouter
+from app.startup_timing import startup_timer
+
+router = APIRouter()
+
+@router.get("/metrics/embedding-cache")
+def embedding_cache_metrics():
+    from app.vectorstore_config import embedding_model
+    return embedding_model.stats()
+
+@router.get("/metrics/startup")
+def startup_metrics():
+    return startup_timer.report()
+
+@router.get("/metrics/xray-worker")
+def xray_worker_metrics():
+    from app.workers.xray_sqs_worker import get_xray_worker
+    return get_xray_worker().stats()
+
+@router.get("/metrics/ocr-worker")
+def ocr_worker_metrics():
+    from app.workers.ocr_worker import get_ocr_worker
+    return get_ocr_worker().stats()
+
+@router.get("/metrics/jobs")
+async def job_queue_metrics():
+    from app.services.job_queue import get_job_queue
+    return await get_job_queue().stats()
+
+@router.get("/metrics/imageset-cache")
+def imageset_cache_metrics():
+    from app.services.imageset_services import cache_stats
+    return cache_stats()
+
+@router.get("/metrics/image-url")
+def image_url_metrics():
+    from app.services.image_url_service import url_cache
+    return url_cache.stats()
+
+@router.get("/metrics/hp-index")
+def hp_index_metrics():
+    # Aggregate counts from FT.INFO: no keyspace SCAN and no patient IDs. The per-patient
+    # breakdown (hp_index_maintenance.index_size_by_patient) is for operators, not this router.
+    from app.redis_config import r
+    from app.vectorstore_config import PATIENT_INDEX_NAME
+    info = r.ft(PATIENT_INDEX_NAME).info()
+    return {
+        "index": PATIENT_INDEX_NAME,
+        "total_chunks": int(info.get("num_docs", 0)),
+        "indexing_failures": int(info.get("hash_indexing_failures", 0)),
+    }
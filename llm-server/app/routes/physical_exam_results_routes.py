@@ -1,7 +1,7 @@
 from fastapi import APIRouter
 from pydantic import BaseModel
-from app.prompts.physical_examination import ask_gpt_to_extract_vitals
-from app.services.exam_services import load_examination_results_data, save_physical_exam_result_to_dynamodb
+from app.prompts.physical_examination import aask_gpt_to_extract_vitals
+from app.services.exam_services import load_examination_results_data, asave_physical_exam_result_to_dynamodb
 
 router = APIRouter()
 
@@ -17,9 +17,9 @@ async def upload_physical_exam(query: Query):
 
     exam_results = load_examination_results_data()
 
-    extracted_vitals = ask_gpt_to_extract_vitals(exam_results)
+    extracted_vitals = await aask_gpt_to_extract_vitals(exam_results)
 
-    save_physical_exam_result_to_dynamodb(
+    await asave_physical_exam_result_to_dynamodb(
         patient_id=patient_id,
         session_id=session_id,
         extracted_vitals=extracted_vitals
@@ -1,9 +1,10 @@
 from fastapi import APIRouter
-from app.services.ocr_services import poll_sqs_and_process
+from app.workers.ocr_worker import get_ocr_worker
 
 router = APIRouter()
 
 @router.get("/trigger-ocr")
-def trigger_ocr():
-    poll_sqs_and_process()
-    return {"message": "OCR processed"}
\ No newline at end of file
+async def trigger_ocr():
+    # Manual one-off poll; the background worker (OCR_SQS_WORKER_ENABLED) normally drains the queue
+    saved = await get_ocr_worker().poll_once(wait_time_seconds=3)
+    return {"message": "OCR processed", "notes_saved": saved}
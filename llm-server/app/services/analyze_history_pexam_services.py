@@ -1,4 +1,5 @@
 from typing import List, Dict, Any
+from datetime import datetime
 import json
 
 from langchain_core.documents import Document
@@ -24,29 +25,39 @@ def _fmt_pexam_item(it: Dict[str, Any]) -> str:
         fields.append(json.dumps(clone, ensure_ascii=False))
     return f"[Physical Exam | {ts}]\n" + "\n".join(fields)
 
+def _epoch_seconds(it: Dict[str, Any]) -> float:
+    """Record time for the numeric `timestamp` field; falls back to the ISO suffix of the SK."""
+    for value in (it.get("createdAt"), it.get("timestamp"), str(it.get("SK", "")).partition("#")[2]):
+        if not value:
+            continue
+        try:
+            return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            continue
+    return 0.0
+
+def _record_metadata(patient_id: str, section: str, it: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "patientId": patient_id,
+        "section": section,
+        "sk": it.get("SK"),
+        "timestamp": _epoch_seconds(it),
+    }
+
 def _to_documents(patient_id: str, chat_items: List[Dict[str, Any]], pexam_items: List[Dict[str, Any]]) -> List[Document]:
     docs: List[Document] = []
     for it in chat_items:
         docs.append(
             Document(
                 page_content=_fmt_chat_item(it),
-                metadata={
-                    # Workaround: store patientId under 'symptom' to make it filterable with your current schema
-                    "symptom": patient_id,
-                    "section": "chat",
-                    "sk": it.get("SK")
-                }
+                metadata=_record_metadata(patient_id, "chat", it)
             )
         )
     for it in pexam_items:
         docs.append(
             Document(
                 page_content=_fmt_pexam_item(it),
-                metadata={
-                    "symptom": patient_id,  # see note above
-                    "section": "pexam",
-                    "sk": it.get("SK")
-                }
+                metadata=_record_metadata(patient_id, "pexam", it)
             )
         )
     return docs
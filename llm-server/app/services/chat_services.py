@@ -1,15 +1,7 @@
 import os, json
 from typing import Dict, List
-import openai
 from ..redis_config import r
-from ..config import (
-    OPENAI_API_KEY
-)
 
-
-openai.api_key = OPENAI_API_KEY
-
-    
 def extract_symptom(user_input: str) -> str:
     symptom_keywords = ["cough", "fever", "sore throat", "headache", "fatigue", "shortness of breath"]
     for keyword in symptom_keywords:
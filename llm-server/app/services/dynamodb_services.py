@@ -1,13 +1,9 @@
 from datetime import datetime
-from ..config import (
-    table,
-)
+from typing import Any, Dict
+from .patient_record_repository import get_patient_repository
 
-def save_chat_history_to_dynamodb(
-        patient_id: str, 
-        session_id: str, 
-        extracted: str):
-    item = {
+def chat_history_item(patient_id: str, session_id: str, extracted: str) -> Dict[str, Any]:
+    return {
         "patientId": patient_id,
         "SK": f"ChatHistory#{session_id}",
         "recordType": "ChatHistory",
@@ -16,4 +12,11 @@ def save_chat_history_to_dynamodb(
         "extracted": extracted
     }
 
-    table.put_item(Item=item)
\ No newline at end of file
+def save_chat_history_to_dynamodb(
+        patient_id: str, 
+        session_id: str, 
+        extracted: str):
+    get_patient_repository().put(chat_history_item(patient_id, session_id, extracted))
+
+async def asave_chat_history_to_dynamodb(patient_id: str, session_id: str, extracted: str):
+    await get_patient_repository().aput(chat_history_item(patient_id, session_id, extracted))
@@ -0,0 +1,280 @@
+# app/services/embedding_cache.py
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from ..config import (
+    EMBEDDING_CACHE_BACKEND,
+    EMBEDDING_CACHE_PATH,
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_QUERY_CACHE_SIZE,
+    EMBEDDING_QUERY_CACHE_TTL_SECONDS,
+    EMBEDDING_QUERY_CACHE_PERSIST,
+)
+
+
+def content_hash(text: str) -> str:
+    """Same md5 digest build_question_docs uses for question doc IDs."""
+    return hashlib.md5(text.encode("utf-8")).hexdigest()
+
+
+def normalize_query(text: str) -> str:
+    """Collapse whitespace and case so "No", " no " and "NO" share one cache entry."""
+    return " ".join((text or "").split()).lower()
+
+
+class EmbeddingStore(ABC):
+    """Persistent map of content hash -> vector."""
+
+    @abstractmethod
+    def get_many(self, keys: Sequence[str]) -> Dict[str, List[float]]:
+        ...
+
+    @abstractmethod
+    def set_many(self, vectors: Dict[str, List[float]]) -> None:
+        ...
+
+
+class LocalEmbeddingStore(EmbeddingStore):
+    """Single .npz file on local disk: `keys` (str) + `vectors` (float32 matrix)."""
+
+    def __init__(self, path: str = EMBEDDING_CACHE_PATH):
+        self.path = path
+        self._vectors: Optional[Dict[str, np.ndarray]] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, np.ndarray]:
+        if self._vectors is None:
+            self._vectors = {}
+            if os.path.exists(self.path):
+                with np.load(self.path, allow_pickle=False) as data:
+                    for key, vec in zip(data["keys"], data["vectors"]):
+                        self._vectors[str(key)] = vec
+        return self._vectors
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, List[float]]:
+        with self._lock:
+            vectors = self._load()
+            return {k: vectors[k].tolist() for k in keys if k in vectors}
+
+    def set_many(self, vectors: Dict[str, List[float]]) -> None:
+        if not vectors:
+            return
+        with self._lock:
+            current = self._load()
+            for k, v in vectors.items():
+                current[k] = np.asarray(v, dtype=np.float32)
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            # Unique temp file, so workers syncing at startup never share or publish a partial write
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".npz")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    np.savez(
+                        f,
+                        keys=np.array(list(current.keys())),
+                        vectors=np.stack(list(current.values())),
+                    )
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+
+class RedisEmbeddingStore(EmbeddingStore):
+    """One Redis hash per embedding model: field = content hash, value = float32 bytes."""
+
+    def __init__(self, client, namespace: str):
+        self.client = client
+        self.key = f"emb:{namespace}"
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, List[float]]:
+        if not keys:
+            return {}
+        raw = self.client.hmget(self.key, list(keys))
+        return {
+            k: np.frombuffer(v, dtype=np.float32).tolist()
+            for k, v in zip(keys, raw)
+            if v is not None
+        }
+
+    def set_many(self, vectors: Dict[str, List[float]]) -> None:
+        if not vectors:
+            return
+        self.client.hset(
+            self.key,
+            mapping={k: np.asarray(v, dtype=np.float32).tobytes() for k, v in vectors.items()},
+        )
+
+
+class RedisExpiringEmbeddingStore(EmbeddingStore):
+    """One Redis string per vector (`emb:<namespace>:<hash>`) so each entry carries its own TTL."""
+
+    def __init__(self, client, namespace: str, ttl_seconds: int):
+        self.client = client
+        self.prefix = f"emb:{namespace}"
+        self.ttl_seconds = ttl_seconds
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, List[float]]:
+        if not keys:
+            return {}
+        raw = self.client.mget([f"{self.prefix}:{k}" for k in keys])
+        return {
+            k: np.frombuffer(v, dtype=np.float32).tolist()
+            for k, v in zip(keys, raw)
+            if v is not None
+        }
+
+    def set_many(self, vectors: Dict[str, List[float]]) -> None:
+        if not vectors:
+            return
+        pipe = self.client.pipeline(transaction=False)
+        for k, v in vectors.items():
+            pipe.set(f"{self.prefix}:{k}", np.asarray(v, dtype=np.float32).tobytes(), ex=self.ttl_seconds)
+        pipe.execute()
+
+
+class QueryEmbeddingCache:
+    """Bounded LRU of query vectors with a per-entry TTL and hit/miss counters."""
+
+    def __init__(self, max_size: int = EMBEDDING_QUERY_CACHE_SIZE, ttl_seconds: int = EMBEDDING_QUERY_CACHE_TTL_SECONDS):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._items: "OrderedDict[str, tuple[float, List[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._items.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                self._items.pop(key, None)
+            self.misses += 1
+            return None
+
+    def put(self, key: str, vector: List[float]) -> None:
+        with self._lock:
+            self._items[key] = (time.monotonic() + self.ttl_seconds, vector)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Wraps an Embeddings model so document embeddings are looked up by content hash first;
+    only misses are sent to the underlying model, in batches of at most `batch_size`.
+    Query embeddings go through an in-process LRU/TTL cache keyed by normalized text,
+    optionally backed by a shared `query_store` so workers warm each other's caches.
+    """
+
+    def __init__(
+        self,
+        underlying: Embeddings,
+        store: Optional[EmbeddingStore],
+        batch_size: int = EMBEDDING_BATCH_SIZE,
+        query_cache: Optional[QueryEmbeddingCache] = None,
+        query_store: Optional[EmbeddingStore] = None,
+    ):
+        self.underlying = underlying
+        self.store = store
+        self.batch_size = max(1, batch_size)
+        self.query_cache = query_cache if query_cache is not None else QueryEmbeddingCache()
+        self.query_store = query_store
+        self.remote_query_hits = 0
+        self.query_calls = 0
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [content_hash(t) for t in texts]
+        found = self.store.get_many(keys) if self.store else {}
+
+        missing: Dict[str, str] = {}
+        for k, t in zip(keys, texts):
+            if k not in found:
+                missing.setdefault(k, t)
+
+        miss_keys = list(missing.keys())
+        for i in range(0, len(miss_keys), self.batch_size):
+            batch_keys = miss_keys[i:i + self.batch_size]
+            vectors = self.underlying.embed_documents([missing[k] for k in batch_keys])
+            fresh = dict(zip(batch_keys, vectors))
+            if self.store:
+                self.store.set_many(fresh)
+            found.update(fresh)
+
+        return [found[k] for k in keys]
+
+    def _cached_query(self, key: str) -> Optional[List[float]]:
+        vector = self.query_cache.get(key)
+        if vector is None and self.query_store is not None:
+            vector = self.query_store.get_many([content_hash(key)]).get(content_hash(key))
+            if vector is not None:
+                self.remote_query_hits += 1
+                self.query_cache.put(key, vector)
+        return vector
+
+    def _remember_query(self, key: str, vector: List[float]) -> None:
+        self.query_calls += 1
+        self.query_cache.put(key, vector)
+        if self.query_store is not None:
+            self.query_store.set_many({content_hash(key): vector})
+
+    def embed_query(self, text: str) -> List[float]:
+        key = normalize_query(text)
+        vector = self._cached_query(key)
+        if vector is None:
+            vector = self.underlying.embed_query(key)
+            self._remember_query(key, vector)
+        return vector
+
+    async def aembed_query(self, text: str) -> List[float]:
+        key = normalize_query(text)
+        vector = self._cached_query(key)
+        if vector is None:
+            vector = await self.underlying.aembed_query(key)
+            self._remember_query(key, vector)
+        return vector
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "query_cache_size": len(self.query_cache),
+            "query_hits": self.query_cache.hits,
+            "query_misses": self.query_cache.misses,
+            "query_remote_hits": self.remote_query_hits,
+            "query_embedding_calls": self.query_calls,
+        }
+
+
+def build_embedding_store(model_name: str) -> Optional[EmbeddingStore]:
+    """Pick the persistence tier from EMBEDDING_CACHE_BACKEND (local | redis | none)."""
+    if EMBEDDING_CACHE_BACKEND == "redis":
+        from ..redis_config import r
+        return RedisEmbeddingStore(r, namespace=model_name)
+    if EMBEDDING_CACHE_BACKEND == "local":
+        return LocalEmbeddingStore()
+    return None
+
+
+def build_query_embedding_store(model_name: str) -> Optional[EmbeddingStore]:
+    """Shared Redis tier for query vectors when EMBEDDING_QUERY_CACHE_PERSIST is on."""
+    if not EMBEDDING_QUERY_CACHE_PERSIST:
+        return None
+    from ..redis_config import r
+    return RedisExpiringEmbeddingStore(r, namespace=f"{model_name}:query", ttl_seconds=EMBEDDING_QUERY_CACHE_TTL_SECONDS)
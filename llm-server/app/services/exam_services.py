@@ -1,6 +1,7 @@
 import os
 from datetime import datetime
-from ..config import table
+from typing import Any, Dict
+from .patient_record_repository import get_patient_repository
 
 def load_examination_results_data():
     base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -8,11 +9,8 @@ def load_examination_results_data():
     with open(filepath, "r", encoding="utf-8") as f:
         return f.read()
     
-def save_physical_exam_result_to_dynamodb(
-        patient_id: str, 
-        session_id: str, 
-        extracted_vitals: str):
-    item = {
+def physical_exam_item(patient_id: str, session_id: str, extracted_vitals: str) -> Dict[str, Any]:
+    return {
         "patientId": patient_id,
         "SK": f"PExamResults#{session_id}",
         "recordType": "PhysicalExamResults",
@@ -21,5 +19,12 @@ def save_physical_exam_result_to_dynamodb(
         "extracted_vitals": extracted_vitals
     }
 
-    table.put_item(Item=item)
+def save_physical_exam_result_to_dynamodb(
+        patient_id: str, 
+        session_id: str, 
+        extracted_vitals: str):
+    get_patient_repository().put(physical_exam_item(patient_id, session_id, extracted_vitals))
+
+async def asave_physical_exam_result_to_dynamodb(patient_id: str, session_id: str, extracted_vitals: str):
+    await get_patient_repository().aput(physical_exam_item(patient_id, session_id, extracted_vitals))
     
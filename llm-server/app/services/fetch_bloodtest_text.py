@@ -1,18 +1,45 @@
+from typing import Optional
 from fastapi import HTTPException
 from botocore.exceptions import ClientError
-from pdfminer.high_level import extract_text as pdf_extract_text
-from io import BytesIO
-from ..config import table, s3, S3_BUCKET_PATIENT_RECORDS
+from ..config import s3, S3_BUCKET_PATIENT_RECORDS, LAB_PDF_PARSE_WORKERS, LAB_PDF_PARALLEL_MIN_PAGES
+from .lab_text_cache import LabTextStore, lab_text_store
+from .pdf_text import extract_pdf_text
+
+def _bloodtest_key(patient_id: str, encounter_id: str) -> str:
+    return f"{patient_id}/encounters/{encounter_id}/blood-tests/blood_test_report.pdf"
+
+def _cached_pdf_text(bucket: str, key: str, store: Optional[LabTextStore]) -> str:
+    """
+    Extracted text for s3://bucket/key. With a cached ETag the GET is conditional,
+    so an unchanged report costs one 304 and no parsing.
+    """
+    cached_etag = store.get_etag(bucket, key) if store else None
+    cached_text = store.get_text(bucket, key, cached_etag) if cached_etag else None
+
+    params = {"Bucket": bucket, "Key": key}
+    if cached_text is not None:
+        params["IfNoneMatch"] = cached_etag
+    try:
+        obj = s3.get_object(**params)
+    except ClientError as e:
+        if cached_text is not None and e.response["Error"]["Code"] in {"304", "NotModified"}:
+            return cached_text
+        raise
+
+    etag = obj.get("ETag", "")
+    text = store.get_text(bucket, key, etag) if store and etag else None
+    if text is None:
+        text = extract_pdf_text(obj["Body"].read(), LAB_PDF_PARSE_WORKERS, LAB_PDF_PARALLEL_MIN_PAGES)
+        if store and etag:
+            store.put(bucket, key, etag, text)
+    return text
 
 def _fetch_bloodtest_text(patient_id: str, encounter_id: str) -> tuple[str, str]:
-    key = f"{patient_id}/encounters/{encounter_id}/blood-tests/blood_test_report.pdf"
+    key = _bloodtest_key(patient_id, encounter_id)
     try:
-        obj = s3.get_object(Bucket=S3_BUCKET_PATIENT_RECORDS, Key=key)
-        pdf_bytes = obj["Body"].read()
-        text = pdf_extract_text(BytesIO(pdf_bytes)) or ""
-        return key, text
+        return key, _cached_pdf_text(S3_BUCKET_PATIENT_RECORDS, key, lab_text_store)
     except ClientError as e:
         # Let it be empty text but surface the S3 path in response
         if e.response["Error"]["Code"] in {"NoSuchKey", "404"}:
             return key, ""
-        raise HTTPException(status_code=500, detail=f"S3 error: {e.response['Error'].get('Message')}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"S3 error: {e.response['Error'].get('Message')}")
@@ -0,0 +1,128 @@
+# app/services/hp_index_maintenance.py
+import re
+from collections import Counter
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set
+
+from app.services.embedding_cache import content_hash
+from app.services.hp_summary_service import CHAT_PREFIX, PEXAM_PREFIX, patient_chunk_id
+from app.services.hp_summary_store import get_hp_summary_store
+
+# `<prefix>:<patientId>:<chat|pexam>:<SK>:<digest>`; legacy IDs carry abs(hash()) digits as the digest
+_CHUNK_KEY = re.compile(r"^(?P<patient>.+?):(?P<section>chat|pexam):(?P<sk>.+):(?P<digest>[^:]+)$")
+CONTENT_FIELD = "text"
+
+
+def _decode(value: Any) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+def scan_patient_chunks(client, key_prefix: str) -> Iterator[Dict[str, str]]:
+    """Every H&P chunk under `key_prefix`, parsed from its key (question docs use `::` and never match)."""
+    prefix = f"{key_prefix}:"
+    for pattern in (f"{prefix}*:chat:*", f"{prefix}*:pexam:*"):
+        for key in client.scan_iter(match=pattern, count=1000):
+            key = _decode(key)
+            m = _CHUNK_KEY.match(key[len(prefix):])
+            if m:
+                yield {"key": key, **m.groupdict()}
+
+
+def index_size_by_patient(client, key_prefix: str) -> Dict[str, int]:
+    return dict(Counter(c["patient"] for c in scan_patient_chunks(client, key_prefix)))
+
+
+def live_record_sks(repository, patient_id: str) -> Set[str]:
+    """SKs of the chat/pexam records that still exist, keys only."""
+    sks: Set[str] = set()
+    for prefix in (CHAT_PREFIX, PEXAM_PREFIX):
+        sks.update(it["SK"] for it in repository.query(patient_id, sk_prefix=prefix, projection=["SK"]))
+    return sks
+
+
+def reconcile_patient_chunks(
+    client,
+    key_prefix: str,
+    live_sks: Callable[[str], Set[str]],
+    dry_run: bool = False,
+) -> Dict[str, Any]:
+    """
+    - orphans: chunks whose source record no longer exists are deleted
+    - duplicates: chunks with the same patient/section/SK/content are collapsed to one,
+      preferring the content-digest ID; a lone legacy ID is renamed to it
+    Chunks deleted between the scan and the text fetch are skipped.
+    Patients that lost orphans get their cached H&P summary dropped.
+    """
+    chunks = list(scan_patient_chunks(client, key_prefix))
+    texts = _fetch_texts(client, [c["key"] for c in chunks])
+
+    live: Dict[str, Set[str]] = {}
+    groups: Dict[str, List[Dict[str, str]]] = {}
+    orphans: List[str] = []
+    vanished = 0
+    for chunk, text in zip(chunks, texts):
+        if text is None:
+            # Gone since the scan; hashing '' would invent a canonical ID to rename onto
+            vanished += 1
+            continue
+        patient = chunk["patient"]
+        if patient not in live:
+            live[patient] = live_sks(patient)
+        if chunk["sk"] not in live[patient]:
+            orphans.append(chunk["key"])
+            continue
+        canonical = f"{key_prefix}:{patient_chunk_id(patient, chunk['section'], chunk['sk'], text)}"
+        groups.setdefault(canonical, []).append(chunk)
+
+    duplicates: List[str] = []
+    renames: Dict[str, str] = {}
+    for canonical, members in groups.items():
+        keys = [m["key"] for m in members]
+        keep = canonical if canonical in keys else keys[0]
+        duplicates.extend(k for k in keys if k != keep)
+        if keep != canonical:
+            renames[keep] = canonical
+
+    orphan_patients = sorted({_CHUNK_KEY.match(k[len(key_prefix) + 1:])["patient"] for k in orphans})
+    if not dry_run:
+        pipe = client.pipeline(transaction=False)
+        for key in orphans + duplicates:
+            pipe.delete(key)
+        for old, new in renames.items():
+            pipe.rename(old, new)
+        pipe.execute()
+        store = get_hp_summary_store()
+        for patient in orphan_patients:
+            state = store.load(patient)
+            if state:
+                store.save(patient, {**state, "summary": None})
+
+    return {
+        "scanned": len(chunks),
+        "vanished": vanished,
+        "patients": len(live),
+        "orphans": len(orphans),
+        "duplicates": len(duplicates),
+        "renamed": len(renames),
+        "dry_run": dry_run,
+    }
+
+
+def purge_patient_chunks(client, key_prefix: str, dry_run: bool = False) -> int:
+    """Delete every H&P chunk under `key_prefix` (used to clear them out of the symptom-question index)."""
+    keys = [c["key"] for c in scan_patient_chunks(client, key_prefix)]
+    if keys and not dry_run:
+        pipe = client.pipeline(transaction=False)
+        for key in keys:
+            pipe.delete(key)
+        pipe.execute()
+    return len(keys)
+
+
+def _fetch_texts(client, keys: List[str], batch_size: int = 500) -> List[Optional[str]]:
+    texts: List[Optional[str]] = []
+    for i in range(0, len(keys), batch_size):
+        pipe = client.pipeline(transaction=False)
+        for key in keys[i:i + batch_size]:
+            pipe.hget(key, CONTENT_FIELD)
+        texts.extend(_decode(v) if v is not None else None for v in pipe.execute())
+    return texts
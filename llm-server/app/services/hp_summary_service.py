@@ -1,27 +1,22 @@
 # app/services/hp_summary_service.py
-from fastapi import HTTPException
-from boto3.dynamodb.conditions import Key
-from ..config import table
+import asyncio
+import json
+from typing import Any, Dict, List, NamedTuple, Optional
+from app.services.patient_timeline import PatientTimeline, aget_patient_timeline
 from app.services.analyze_history_pexam_services import _to_documents, _chunk_documents, _redis_tag_escape
-from app.prompts._summarize_history_pexam import _summarize
-from ..vectorstore_config import vectorstore
+from app.services.hp_summary_store import HpSummaryState, get_hp_summary_store
+from app.services.embedding_cache import content_hash
+from app.prompts._summarize_history_pexam import _asummarize
+from ..vectorstore_config import patient_vectorstore as vectorstore, PATIENT_INDEX_NAME
 
-def build_hp_summary_for_patient(patient_id: str) -> str:
-    chat_resp = table.query(
-        KeyConditionExpression=Key("patientId").eq(patient_id) & Key("SK").begins_with("ChatHistory#"),
-        ScanIndexForward=False
-    )
-    pexam_resp = table.query(
-        KeyConditionExpression=Key("patientId").eq(patient_id) & Key("SK").begins_with("PExamResults#"),
-        ScanIndexForward=False
-    )
-    chat_items = chat_resp.get("Items", [])
-    pexam_items = pexam_resp.get("Items", [])
+CHAT_PREFIX = "ChatHistory#"
+PEXAM_PREFIX = "PExamResults#"
 
-    if not chat_items and not pexam_items:
-        # Return a neutral string instead of raising; the caller can still summarize labs/X-rays.
-        return "No H&P data found."
+def patient_chunk_id(patient_id: str, section: str, sk: str, content: str) -> str:
+    """Content digest (not the per-process salted hash()) so every worker and restart maps a chunk to one ID."""
+    return f"{patient_id}:{section}:{sk}:{content_hash(content)}"
 
+def _chunks_with_ids(patient_id: str, chat_items, pexam_items):
     docs = _to_documents(patient_id, chat_items, pexam_items)
     chunks = _chunk_documents(docs)
 
@@ -29,20 +24,102 @@ def build_hp_summary_for_patient(patient_id: str) -> str:
     for d in chunks:
         sk = d.metadata.get("sk", "nosk")
         section = d.metadata.get("section", "nosec")
-        # deterministic ID so re-adding is idempotent
-        ids.append(f"{patient_id}:{section}:{sk}:{abs(hash(d.page_content))}")
-
-    # It's fine to call add_documents with stable IDs; most stores upsert.
-    vectorstore.add_documents(documents=chunks, ids=ids)
+        ids.append(patient_chunk_id(patient_id, section, sk, d.page_content))
+    return chunks, ids
 
+def _patient_filter(patient_id: str) -> str:
     tag = _redis_tag_escape(patient_id)
-    rs_filter = f"@symptom:{{{tag}}}"
+    return f"@patientId:{{{tag}}}"
+
+HP_SEARCH_QUERY = "Summarize this patient's chat and physical exam."
+
+def record_digest(item: Dict[str, Any]) -> str:
+    """SKs are `<type>#<session_id>`: neither ordered in time nor changed when a session is re-saved."""
+    return content_hash(json.dumps(item, sort_keys=True, default=str))
+
+class HpPlan(NamedTuple):
+    state: Optional[HpSummaryState]
+    chat_items: list       # new or changed ChatHistory records
+    pexam_items: list      # new or changed PExamResults records
+    stale_ids: List[str]   # chunks of records that changed or no longer exist
+    live: Dict[str, str]   # SK -> digest of every current chat/pexam record
+
+    @property
+    def unchanged(self) -> bool:
+        return not self.chat_items and not self.pexam_items and not self.stale_ids
+
+def _plan(patient_id: str, timeline: PatientTimeline) -> HpPlan:
+    """Cached state plus only the timeline records whose content differs from what was indexed."""
+    state = get_hp_summary_store().load(patient_id)
+    if state and state.get("index") != PATIENT_INDEX_NAME:
+        state = None  # state refers to another index (e.g. before the patient index existed)
+    indexed: Dict[str, Dict[str, Any]] = (state or {}).get("records") or {}
+
+    live = {
+        it["SK"]: record_digest(it)
+        for prefix in (CHAT_PREFIX, PEXAM_PREFIX)
+        for it in timeline.records(prefix)
+    }
+    changed = lambda prefix: [
+        it for it in timeline.records(prefix) if indexed.get(it["SK"], {}).get("digest") != live[it["SK"]]
+    ]
+    stale_ids = [
+        cid for sk, rec in indexed.items()
+        if live.get(sk) != rec.get("digest")
+        for cid in rec.get("chunks", [])
+    ]
+    return HpPlan(state, changed(CHAT_PREFIX), changed(PEXAM_PREFIX), stale_ids, live)
+
+def _advance(patient_id: str, plan: HpPlan, chunks, ids: List[str], summary: str) -> None:
+    """Remember the digest and chunk IDs of every indexed record, plus the summary."""
+    records = {
+        sk: rec for sk, rec in ((plan.state or {}).get("records") or {}).items()
+        if plan.live.get(sk) == rec.get("digest")
+    }
+    chunk_ids: Dict[str, List[str]] = {}
+    for d, cid in zip(chunks, ids):
+        chunk_ids.setdefault(d.metadata.get("sk"), []).append(cid)
+    for it in plan.chat_items + plan.pexam_items:
+        records[it["SK"]] = {"digest": plan.live[it["SK"]], "chunks": chunk_ids.get(it["SK"], [])}
+
+    get_hp_summary_store().save(patient_id, {
+        "records": records,
+        "summary": summary,
+        "index": PATIENT_INDEX_NAME,
+    })
+
+async def abuild_hp_summary_for_patient(patient_id: str) -> str:
+    """Blocking Redis/summary-store work runs in worker threads; the vector store and LLM calls are awaited."""
+    timeline = await aget_patient_timeline(patient_id)
+    plan = await asyncio.to_thread(_plan, patient_id, timeline)
+
+    if plan.state and plan.state.get("summary") and plan.unchanged:
+        # Nothing written or changed since the last summary: no embedding or LLM calls
+        return plan.state["summary"]
+
+    # Only new or changed records are chunked and embedded; earlier ones are already in the index
+    chunks, ids = _chunks_with_ids(patient_id, plan.chat_items, plan.pexam_items)
+    stale = [cid for cid in plan.stale_ids if cid not in set(ids)]
+    if stale:
+        await vectorstore.adelete(ids=stale)
+
+    if not plan.live:
+        # Every record is gone (or never existed); cache that so the next call is a hit.
+        # A neutral string instead of raising: the caller can still summarize labs/X-rays.
+        summary = "No H&P data found."
+        await asyncio.to_thread(_advance, patient_id, plan, chunks, ids, summary)
+        return summary
+
+    if chunks:
+        await vectorstore.aadd_documents(documents=chunks, ids=ids)
 
-    retrieved = vectorstore.similarity_search(
-        "Summarize this patient's chat and physical exam.",
+    retrieved = await vectorstore.asimilarity_search(
+        HP_SEARCH_QUERY,
         k=6,
-        filter=rs_filter
+        filter=_patient_filter(patient_id)
     )
     context_text = "\n\n---\n\n".join(d.page_content for d in retrieved) if retrieved else ""
 
-    return _summarize(context_text) if context_text else "No relevant clinical information available."
+    summary = await _asummarize(context_text) if context_text else "No relevant clinical information available."
+    await asyncio.to_thread(_advance, patient_id, plan, chunks, ids, summary)
+    return summary
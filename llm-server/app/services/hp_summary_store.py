@@ -0,0 +1,84 @@
+# app/services/hp_summary_store.py
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from ..config import HP_SUMMARY_STORE_BACKEND, HP_SUMMARY_TTL_SECONDS, HP_SUMMARY_MAX_IN_MEMORY
+
+# {"records": {SK: {"digest": record content digest, "chunks": [chunk IDs]}}, "summary": text, "index": name}
+HpSummaryState = Dict[str, Any]
+
+
+class HpSummaryStore(ABC):
+    """Per-patient digests of the indexed chat/exam records plus the summary built from them."""
+
+    @abstractmethod
+    def load(self, patient_id: str) -> Optional[HpSummaryState]:
+        ...
+
+    @abstractmethod
+    def save(self, patient_id: str, state: HpSummaryState) -> None:
+        ...
+
+
+class InMemoryHpSummaryStore(HpSummaryStore):
+    """Process-local LRU with TTL; after a restart the first review re-indexes (idempotently)."""
+
+    def __init__(self, ttl_seconds: int = HP_SUMMARY_TTL_SECONDS, max_entries: int = HP_SUMMARY_MAX_IN_MEMORY):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._items: "OrderedDict[str, Tuple[float, HpSummaryState]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(self, patient_id: str) -> Optional[HpSummaryState]:
+        with self._lock:
+            entry = self._items.get(patient_id)
+            if entry is None or entry[0] < time.monotonic():
+                self._items.pop(patient_id, None)
+                return None
+            self._items.move_to_end(patient_id)
+            return dict(entry[1])
+
+    def save(self, patient_id: str, state: HpSummaryState) -> None:
+        with self._lock:
+            self._items[patient_id] = (time.monotonic() + self.ttl_seconds, dict(state))
+            self._items.move_to_end(patient_id)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+
+class RedisHpSummaryStore(HpSummaryStore):
+    """`hp_summary:<patientId>` JSON strings with a TTL, shared by every worker."""
+
+    def __init__(self, client, ttl_seconds: int = HP_SUMMARY_TTL_SECONDS):
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+
+    def load(self, patient_id: str) -> Optional[HpSummaryState]:
+        raw = self.client.get(f"hp_summary:{patient_id}")
+        return json.loads(raw) if raw else None
+
+    def save(self, patient_id: str, state: HpSummaryState) -> None:
+        self.client.set(f"hp_summary:{patient_id}", json.dumps(state), ex=self.ttl_seconds)
+
+
+_store: Optional[HpSummaryStore] = None
+
+def get_hp_summary_store() -> HpSummaryStore:
+    """Return the process-wide store selected by HP_SUMMARY_STORE_BACKEND (memory | redis)."""
+    global _store
+    if _store is None:
+        if HP_SUMMARY_STORE_BACKEND == "redis":
+            from ..redis_config import r
+            _store = RedisHpSummaryStore(r)
+        else:
+            _store = InMemoryHpSummaryStore()
+    return _store
+
+def set_hp_summary_store(store: HpSummaryStore) -> None:
+    """Setter to swap the backend (e.g. in tests)."""
+    global _store
+    _store = store
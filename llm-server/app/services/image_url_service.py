@@ -0,0 +1,163 @@
+# app/services/image_url_service.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from botocore.exceptions import ClientError
+
+from ..config import (
+    s3,
+    BUCKET_NAME,
+    IMAGE_URL_EXPIRES_SECONDS,
+    IMAGE_URL_REFRESH_MARGIN_SECONDS,
+    IMAGE_URL_CACHE_SIZE,
+)
+from .imageset_services import get_first_frame, get_image_set_info
+from .xray_rendering import DERIVATIVE_SIZES, render_derivatives, render_executor
+
+
+class PresignedUrlCache:
+    """
+    S3 key -> (presigned URL, expiry) plus a set of keys known to exist in the bucket.
+    A URL is handed out again until `refresh_margin` seconds before it expires.
+    Both are LRUs bounded to `max_entries` keys.
+    """
+
+    def __init__(self, expires_in: int, refresh_margin: int, max_entries: int = IMAGE_URL_CACHE_SIZE):
+        self.expires_in = expires_in
+        self.refresh_margin = refresh_margin
+        self.max_entries = max_entries
+        self._urls: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._existing: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.url_hits = 0
+        self.renders = 0
+
+    def get_url(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._urls.get(key)
+            if entry and entry[1] - self.refresh_margin > time.time():
+                self._urls.move_to_end(key)
+                self.url_hits += 1
+                return entry[0]
+            self._urls.pop(key, None)
+            return None
+
+    def put_url(self, key: str, url: str) -> None:
+        with self._lock:
+            self._remember(self._urls, key, (url, time.time() + self.expires_in))
+            self._remember(self._existing, key, None)
+
+    def known_to_exist(self, key: str) -> bool:
+        with self._lock:
+            if key not in self._existing:
+                return False
+            self._existing.move_to_end(key)
+            return True
+
+    def mark_exists(self, key: str) -> None:
+        with self._lock:
+            self._remember(self._existing, key, None)
+
+    def count_render(self) -> None:
+        with self._lock:
+            self.renders += 1
+
+    def _remember(self, items: OrderedDict, key: str, value) -> None:
+        items[key] = value
+        items.move_to_end(key)
+        while len(items) > self.max_entries:
+            items.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "cached_urls": len(self._urls),
+            "known_objects": len(self._existing),
+            "url_hits": self.url_hits,
+            "renders": self.renders,
+        }
+
+
+url_cache = PresignedUrlCache(IMAGE_URL_EXPIRES_SECONDS, IMAGE_URL_REFRESH_MARGIN_SECONDS)
+
+def s3_object_exists(key: str) -> bool:
+    """HEAD the derivative; 404 means it still has to be rendered."""
+    try:
+        s3.head_object(Bucket=BUCKET_NAME, Key=key)
+        return True
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in {"404", "NoSuchKey", "NotFound"}:
+            return False
+        raise
+
+def derivative_key(patient_id: str, image_set_id: str, size: str) -> str:
+    """Full-size keeps the original key so JPEGs rendered before derivatives existed are reused."""
+    if size == "full":
+        return f"{patient_id}/xrays/{image_set_id}.jpeg"
+    return f"{patient_id}/xrays/{image_set_id}_{size}.jpeg"
+
+def _render_and_upload(patient_id: str, image_set_id: str, sizes: Optional[List[str]] = None) -> bool:
+    """
+    Decode the first frame (cached), render `sizes` (default: every configured size) and upload them.
+    Runs as one render-pool task with the uploads inline, so it never waits on the pool itself.
+    False if the ImageSet has no frames.
+    """
+    info = get_image_set_info(image_set_id)
+    _, frame = get_first_frame(image_set_id)
+    if frame is None:
+        return False
+
+    wanted = {name: DERIVATIVE_SIZES[name] for name in (sizes or DERIVATIVE_SIZES)}
+    rendered = render_derivatives(frame, wanted, info.get("window", (None, None)))
+    for size, body in rendered.items():
+        key = derivative_key(patient_id, image_set_id, size)
+        s3.put_object(Bucket=BUCKET_NAME, Key=key, Body=body, ContentType="image/jpeg")
+        url_cache.mark_exists(key)
+    url_cache.count_render()
+    return True
+
+def render_xray_derivatives(patient_id: str, image_set_id: str, sizes: Optional[List[str]] = None) -> bool:
+    """Render and upload on the render pool and wait for it; call from request threads, not pool tasks."""
+    return render_executor.submit(_render_and_upload, patient_id, image_set_id, sizes).result()
+
+def _render_remaining(patient_id: str, image_set_id: str, done: str) -> None:
+    """Background follow-up to a render miss: the sizes nobody has asked for yet."""
+    rest = [
+        size for size in DERIVATIVE_SIZES
+        if size != done and not url_cache.known_to_exist(derivative_key(patient_id, image_set_id, size))
+    ]
+    if not rest:
+        return
+    try:
+        # Already on the render pool: render inline rather than queueing behind ourselves
+        _render_and_upload(patient_id, image_set_id, rest)
+    except Exception as e:
+        print(f"⚠️ Could not render remaining derivatives for {image_set_id}: {e}")
+
+def get_xray_image_url(patient_id: str, image_set_id: str, size: str = "full") -> Optional[str]:
+    """
+    Cached URL -> known/HEAD-confirmed object -> render on a miss.
+    Returns None if there is nothing to render.
+    """
+    key = derivative_key(patient_id, image_set_id, size)
+
+    url = url_cache.get_url(key)
+    if url:
+        return url
+
+    if url_cache.known_to_exist(key) or s3_object_exists(key):
+        url_cache.mark_exists(key)
+    elif render_xray_derivatives(patient_id, image_set_id, [size]):
+        # Only the requested size is on the request path; the others follow in the background
+        render_executor.submit(_render_remaining, patient_id, image_set_id, size)
+    else:
+        return None
+
+    url = s3.generate_presigned_url(
+        "get_object",
+        Params={"Bucket": BUCKET_NAME, "Key": key},
+        ExpiresIn=url_cache.expires_in
+    )
+    url_cache.put_url(key, url)
+    return url
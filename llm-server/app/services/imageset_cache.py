@@ -0,0 +1,121 @@
+# app/services/imageset_cache.py
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from PIL import Image
+
+
+class MetadataCache:
+    """Bounded in-memory LRU of parsed ImageSet metadata (plus the derived first frame ID)."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._items: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, image_set_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._items.get(image_set_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(image_set_id)
+            self.hits += 1
+            return entry
+
+    def put(self, image_set_id: str, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._items[image_set_id] = entry
+            self._items.move_to_end(image_set_id)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+
+class FrameDiskCache:
+    """
+    Decoded frames on local disk, stored losslessly as PNG in their native mode (e.g. 16-bit grayscale).
+    Total size is capped at `max_bytes`; the least recently read files (by mtime) are evicted first.
+    Frames are patient images (PHI) and are not encrypted here: the directory is created owner-only
+    and files are 0600, but it should live on an encrypted volume. Disabled unless `enabled`.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, enabled: bool = True):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._total_bytes: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, image_set_id: str, frame_id: str) -> str:
+        safe = lambda v: "".join(c if c.isalnum() or c in "-_" else "_" for c in v)
+        return os.path.join(self.directory, f"{safe(image_set_id)}__{safe(frame_id)}.png")
+
+    def _entries(self):
+        if not os.path.isdir(self.directory):
+            return []
+        return [
+            e for e in os.scandir(self.directory)
+            if e.is_file() and e.name.endswith(".png")
+        ]
+
+    def _current_size(self) -> int:
+        if self._total_bytes is None:
+            self._total_bytes = sum(e.stat().st_size for e in self._entries())
+        return self._total_bytes
+
+    def get(self, image_set_id: str, frame_id: str) -> Optional[Image.Image]:
+        if not self.enabled:
+            return None
+        path = self._path(image_set_id, frame_id)
+        try:
+            with Image.open(path) as img:
+                img.load()
+                image = img.copy()
+            os.utime(path)  # mark as recently used
+        except (FileNotFoundError, OSError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return image
+
+    def put(self, image_set_id: str, frame_id: str, image: Image.Image) -> None:
+        if not self.enabled:
+            return
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        path = self._path(image_set_id, frame_id)
+        # Unique temp name (created 0600), so concurrent puts of the same frame don't collide
+        with tempfile.NamedTemporaryFile(dir=self.directory, suffix=".tmp", delete=False) as tmp:
+            tmp_path = tmp.name
+            try:
+                image.save(tmp, format="PNG")
+            except BaseException:
+                tmp.close()
+                os.remove(tmp_path)
+                raise
+        size = os.path.getsize(tmp_path)
+        with self._lock:
+            previous = os.path.getsize(path) if os.path.exists(path) else 0
+            total = self._current_size()
+            os.replace(tmp_path, path)
+            self._total_bytes = total + size - previous
+            self._evict()
+
+    def _evict(self) -> None:
+        if self._total_bytes <= self.max_bytes:
+            return
+        for entry in sorted(self._entries(), key=lambda e: e.stat().st_mtime):
+            if self._total_bytes <= self.max_bytes:
+                break
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+                self._total_bytes -= size
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,106 @@
+# app/services/imageset_services.py
+import json, gzip
+from io import BytesIO
+from typing import Any, Dict, Optional, Tuple
+from PIL import Image
+from ..config import (
+    healthimaging,
+    DATASTORE_ID,
+    IMAGESET_METADATA_CACHE_SIZE,
+    IMAGESET_FRAME_CACHE_ENABLED,
+    IMAGESET_FRAME_CACHE_DIR,
+    IMAGESET_FRAME_CACHE_MAX_BYTES,
+)
+from .imageset_cache import MetadataCache, FrameDiskCache
+
+metadata_cache = MetadataCache(IMAGESET_METADATA_CACHE_SIZE)
+frame_cache = FrameDiskCache(IMAGESET_FRAME_CACHE_DIR, IMAGESET_FRAME_CACHE_MAX_BYTES, enabled=IMAGESET_FRAME_CACHE_ENABLED)
+
+def first_frame_id(metadata_json: Dict[str, Any]) -> Optional[str]:
+    """First available image frame ID in an ImageSet metadata document."""
+    return next(
+        (
+            frame.get("ID")
+            for series in metadata_json.get("Study", {}).get("Series", {}).values()
+            for instance in series.get("Instances", {}).values()
+            for frame in instance.get("ImageFrames", [])
+            if "ID" in frame
+        ),
+        None
+    )
+
+def _first_number(value: Any) -> Optional[float]:
+    """DICOM multi-valued strings ("40\\400") and lists both reduce to their first value."""
+    if isinstance(value, (list, tuple)):
+        value = value[0] if value else None
+    if isinstance(value, str):
+        value = value.split("\\")[0]
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def display_window(metadata_json: Dict[str, Any]) -> Tuple[Optional[float], Optional[float]]:
+    """(WindowCenter, WindowWidth) of the first instance that declares one."""
+    for series in metadata_json.get("Study", {}).get("Series", {}).values():
+        for instance in series.get("Instances", {}).values():
+            dicom = instance.get("DICOM", {})
+            center = _first_number(dicom.get("WindowCenter"))
+            width = _first_number(dicom.get("WindowWidth"))
+            if center is not None and width is not None:
+                return center, width
+    return None, None
+
+def fetch_image_set_metadata(image_set_id: str) -> Dict[str, Any]:
+    """Fetch and decompress image set metadata."""
+    metadata_blob = healthimaging.get_image_set_metadata(
+        datastoreId=DATASTORE_ID,
+        imageSetId=image_set_id
+    )["imageSetMetadataBlob"]
+    return json.loads(gzip.decompress(metadata_blob.read()))
+
+def fetch_frame_bytes(image_set_id: str, frame_id: str) -> bytes:
+    return healthimaging.get_image_frame(
+        datastoreId=DATASTORE_ID,
+        imageSetId=image_set_id,
+        imageFrameInformation={"imageFrameId": frame_id}
+    )["imageFrameBlob"].read()
+
+def get_image_set_info(image_set_id: str) -> Dict[str, Any]:
+    """Parsed metadata + patient ID + first frame ID, from memory when possible."""
+    info = metadata_cache.get(image_set_id)
+    if info is None:
+        metadata_json = fetch_image_set_metadata(image_set_id)
+        info = {
+            "patient_id": metadata_json.get("Patient", {}).get("DICOM", {}).get("PatientID"),
+            "first_frame_id": first_frame_id(metadata_json),
+            "window": display_window(metadata_json),
+            "metadata": metadata_json,
+        }
+        metadata_cache.put(image_set_id, info)
+    return info
+
+def get_frame_image(image_set_id: str, frame_id: str) -> Image.Image:
+    """Decoded frame in its native mode, from the local disk tier when possible."""
+    image = frame_cache.get(image_set_id, frame_id)
+    if image is None:
+        with Image.open(BytesIO(fetch_frame_bytes(image_set_id, frame_id))) as img:
+            img.load()
+            image = img.copy()
+        frame_cache.put(image_set_id, frame_id, image)
+    return image
+
+def get_first_frame(image_set_id: str) -> Tuple[Optional[str], Optional[Image.Image]]:
+    """(patient_id, decoded first frame or None if the set has no frames)."""
+    info = get_image_set_info(image_set_id)
+    if not info["first_frame_id"]:
+        return info["patient_id"], None
+    return info["patient_id"], get_frame_image(image_set_id, info["first_frame_id"])
+
+def cache_stats() -> Dict[str, int]:
+    return {
+        "metadata_hits": metadata_cache.hits,
+        "metadata_misses": metadata_cache.misses,
+        "frame_hits": frame_cache.hits,
+        "frame_misses": frame_cache.misses,
+    }
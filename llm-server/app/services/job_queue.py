@@ -0,0 +1,375 @@
+# app/services/job_queue.py
+import asyncio
+import os
+import socket
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+import redis.asyncio as aioredis
+from pydantic import BaseModel, Field
+from redis.exceptions import ResponseError
+
+from ..config import (
+    REDIS_URL,
+    JOB_QUEUE_BACKEND,
+    JOB_WORKER_CONCURRENCY,
+    JOB_MAX_ATTEMPTS,
+    JOB_RETRY_BASE_SECONDS,
+    JOB_IDEMPOTENCY_TTL_SECONDS,
+)
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+# kind -> coroutine taking the job payload; raising schedules a retry
+JOB_HANDLERS: Dict[str, JobHandler] = {}
+
+def register_job_handler(kind: str, handler: JobHandler) -> None:
+    JOB_HANDLERS[kind] = handler
+
+
+class Job(BaseModel):
+    id: str = Field(default_factory=lambda: uuid.uuid4().hex)
+    kind: str
+    payload: Dict[str, Any] = Field(default_factory=dict)
+    attempts: int = 0
+    enqueued_at: float = Field(default_factory=time.time)
+    idempotency_key: Optional[str] = None
+    # Backend-specific handle of the delivery being processed (e.g. a stream entry ID)
+    receipt: Optional[str] = None
+
+
+class JobBackend(ABC):
+    """Interface: put / get / ack / retry / bury plus idempotency-key claims and their release."""
+
+    @abstractmethod
+    async def put(self, job: Job) -> None:
+        ...
+
+    @abstractmethod
+    async def get(self, timeout: float) -> Optional[Job]:
+        ...
+
+    @abstractmethod
+    async def ack(self, job: Job) -> None:
+        ...
+
+    @abstractmethod
+    async def retry(self, job: Job, delay: float) -> None:
+        ...
+
+    @abstractmethod
+    async def bury(self, job: Job) -> None:
+        """Move a job that ran out of attempts to the dead letters and ack it."""
+
+    @abstractmethod
+    async def claim(self, key: str, ttl_seconds: int) -> bool:
+        """True the first time `key` is seen within the TTL."""
+
+    @abstractmethod
+    async def release(self, key: str) -> None:
+        """Forget a claim, so the next `claim(key)` succeeds again."""
+
+    @abstractmethod
+    async def depth(self) -> int:
+        ...
+
+
+class InMemoryJobBackend(JobBackend):
+    """asyncio.Queue for a single process; pending jobs are lost on restart."""
+
+    def __init__(self):
+        self._queue: "asyncio.Queue[Job]" = asyncio.Queue()
+        self._claims: Dict[str, float] = {}
+        self._delayed = 0
+        self.dead_letters: Deque[Job] = deque(maxlen=1000)
+
+    async def put(self, job: Job) -> None:
+        self._queue.put_nowait(job)
+
+    async def get(self, timeout: float) -> Optional[Job]:
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def ack(self, job: Job) -> None:
+        pass
+
+    async def retry(self, job: Job, delay: float) -> None:
+        self._delayed += 1
+
+        def requeue():
+            self._delayed -= 1
+            self._queue.put_nowait(job)
+
+        asyncio.get_running_loop().call_later(delay, requeue)
+
+    async def bury(self, job: Job) -> None:
+        self.dead_letters.append(job)
+
+    async def claim(self, key: str, ttl_seconds: int) -> bool:
+        now = time.monotonic()
+        if self._claims.get(key, 0) > now:
+            return False
+        self._claims = {k: exp for k, exp in self._claims.items() if exp > now}
+        self._claims[key] = now + ttl_seconds
+        return True
+
+    async def release(self, key: str) -> None:
+        self._claims.pop(key, None)
+
+    async def depth(self) -> int:
+        return self._queue.qsize() + self._delayed
+
+
+class RedisStreamJobBackend(JobBackend):
+    """
+    Durable backend shared by every worker: jobs are entries of a Redis stream read through a
+    consumer group; retries wait in a sorted set scored by due time; deliveries left pending by a
+    crashed worker are reclaimed after `claim_idle_ms` and count as failed attempts. Jobs that run
+    out of attempts are moved to the `<stream>:dead` stream.
+    """
+
+    def __init__(
+        self,
+        redis_url: str = REDIS_URL,
+        stream: str = "jobs",
+        group: str = "llm-server",
+        consumer: Optional[str] = None,
+        claim_idle_ms: int = 5 * 60 * 1000,
+    ):
+        self._redis = aioredis.from_url(redis_url, decode_responses=True)
+        self.stream = stream
+        self.delayed_key = f"{stream}:delayed"
+        self.dead_key = f"{stream}:dead"
+        self.group = group
+        self.consumer = consumer or f"{socket.gethostname()}-{os.getpid()}"
+        self.claim_idle_ms = claim_idle_ms
+        self._group_ready = False
+
+    async def _ensure_group(self) -> None:
+        if self._group_ready:
+            return
+        try:
+            await self._redis.xgroup_create(self.stream, self.group, id="0", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._group_ready = True
+
+    async def put(self, job: Job) -> None:
+        await self._redis.xadd(self.stream, {"job": job.model_copy(update={"receipt": None}).model_dump_json()})
+
+    async def _promote_due(self) -> None:
+        for raw in await self._redis.zrangebyscore(self.delayed_key, 0, time.time(), start=0, num=100):
+            # zrem decides which worker moves the job, so it is re-added exactly once
+            if await self._redis.zrem(self.delayed_key, raw):
+                await self._redis.xadd(self.stream, {"job": raw})
+
+    async def get(self, timeout: float) -> Optional[Job]:
+        await self._ensure_group()
+        await self._promote_due()
+
+        _, claimed, *_ = await self._redis.xautoclaim(
+            self.stream, self.group, self.consumer, min_idle_time=self.claim_idle_ms, start_id="0-0", count=1
+        )
+        entries = claimed
+        if not entries:
+            resp = await self._redis.xreadgroup(
+                self.group, self.consumer, {self.stream: ">"}, count=1, block=int(timeout * 1000)
+            )
+            entries = resp[0][1] if resp else []
+        if not entries:
+            return None
+
+        entry_id, fields = entries[0]
+        job = Job.model_validate_json(fields["job"])
+        job.receipt = entry_id
+        if claimed:
+            # Every earlier delivery of a reclaimed entry ended without an ack, i.e. the worker died
+            pending = await self._redis.xpending_range(self.stream, self.group, entry_id, entry_id, 1)
+            if pending:
+                job.attempts += max(0, int(pending[0]["times_delivered"]) - 1)
+        return job
+
+    async def ack(self, job: Job) -> None:
+        pipe = self._redis.pipeline(transaction=False)
+        pipe.xack(self.stream, self.group, job.receipt)
+        pipe.xdel(self.stream, job.receipt)
+        await pipe.execute()
+
+    async def retry(self, job: Job, delay: float) -> None:
+        raw = job.model_copy(update={"receipt": None}).model_dump_json()
+        await self._redis.zadd(self.delayed_key, {raw: time.time() + delay})
+        await self.ack(job)
+
+    async def bury(self, job: Job) -> None:
+        raw = job.model_copy(update={"receipt": None}).model_dump_json()
+        pipe = self._redis.pipeline(transaction=True)
+        pipe.xadd(self.dead_key, {"job": raw}, maxlen=10000, approximate=True)
+        pipe.xack(self.stream, self.group, job.receipt)
+        pipe.xdel(self.stream, job.receipt)
+        await pipe.execute()
+
+    async def claim(self, key: str, ttl_seconds: int) -> bool:
+        return bool(await self._redis.set(f"{self.stream}:idem:{key}", "1", nx=True, ex=ttl_seconds))
+
+    async def release(self, key: str) -> None:
+        await self._redis.delete(f"{self.stream}:idem:{key}")
+
+    async def depth(self) -> int:
+        # Acked entries are deleted, so the stream length is what is still queued or in flight
+        return int(await self._redis.xlen(self.stream)) + int(await self._redis.zcard(self.delayed_key))
+
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 4)
+
+
+class JobQueue:
+    """
+    Worker pool over a JobBackend. Failed jobs are retried with exponential backoff
+    (`retry_base_delay * 2**(attempt-1)`) up to `max_attempts`, then buried with an error log.
+    """
+
+    def __init__(
+        self,
+        backend: JobBackend,
+        concurrency: int = JOB_WORKER_CONCURRENCY,
+        max_attempts: int = JOB_MAX_ATTEMPTS,
+        retry_base_delay: float = JOB_RETRY_BASE_SECONDS,
+        idempotency_ttl: int = JOB_IDEMPOTENCY_TTL_SECONDS,
+        poll_timeout: float = 1.0,
+    ):
+        self.backend = backend
+        self.concurrency = max(1, concurrency)
+        self.max_attempts = max(1, max_attempts)
+        self.retry_base_delay = retry_base_delay
+        self.idempotency_ttl = idempotency_ttl
+        self.poll_timeout = poll_timeout
+        self._stopping = asyncio.Event()
+        self._workers: List[asyncio.Task] = []
+        self.enqueued = 0
+        self.duplicates = 0
+        self.processed = 0
+        self.retried = 0
+        self.dead = 0
+        self.in_flight = 0
+        self._latencies: Deque[float] = deque(maxlen=1000)
+        self._run_times: Deque[float] = deque(maxlen=1000)
+
+    async def enqueue(self, kind: str, payload: Dict[str, Any], idempotency_key: Optional[str] = None) -> bool:
+        """Queue a job; False (and nothing queued) if `idempotency_key` was already used."""
+        if idempotency_key and not await self.backend.claim(idempotency_key, self.idempotency_ttl):
+            self.duplicates += 1
+            return False
+        try:
+            await self.backend.put(Job(kind=kind, payload=payload, idempotency_key=idempotency_key))
+        except BaseException:
+            # Nothing was queued, so a retry with the same key must be able to enqueue it
+            if idempotency_key:
+                await self.backend.release(idempotency_key)
+            raise
+        self.enqueued += 1
+        return True
+
+    def start(self) -> None:
+        if not self._workers:
+            self._stopping.clear()
+            self._workers = [
+                asyncio.create_task(self._work(), name=f"job-worker-{i}") for i in range(self.concurrency)
+            ]
+
+    async def stop(self) -> None:
+        """Let in-flight jobs finish; queued jobs stay in the backend."""
+        self._stopping.set()
+        if self._workers:
+            await asyncio.gather(*self._workers, return_exceptions=True)
+            self._workers = []
+
+    async def _work(self) -> None:
+        # A backend error anywhere in the cycle (poll, ack, retry) is logged and the worker keeps
+        # going; an unacked job is redelivered later
+        while not self._stopping.is_set():
+            try:
+                job = await self.backend.get(timeout=self.poll_timeout)
+                if job is None:
+                    continue
+                if job.attempts >= self.max_attempts:
+                    # Redelivered after its workers died mid-run too many times
+                    self.dead += 1
+                    print(f"❌ Job {job.kind}/{job.id} gave up after {job.attempts} attempt(s) without finishing")
+                    await self.backend.bury(job)
+                    continue
+                await self.run_job(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️ Job worker error: {e}")
+                await asyncio.sleep(1)
+
+    async def run_job(self, job: Job) -> None:
+        handler = JOB_HANDLERS.get(job.kind)
+        started = time.monotonic()
+        self.in_flight += 1
+        try:
+            if handler is None:
+                raise LookupError(f"No handler registered for job kind '{job.kind}'")
+            await handler(job.payload)
+        except Exception as e:
+            job.attempts += 1
+            if handler is not None and job.attempts < self.max_attempts:
+                delay = self.retry_base_delay * 2 ** (job.attempts - 1)
+                self.retried += 1
+                print(f"⚠️ Job {job.kind}/{job.id} failed (attempt {job.attempts}), retrying in {delay:.0f}s: {e}")
+                await self.backend.retry(job, delay)
+            else:
+                self.dead += 1
+                print(f"❌ Job {job.kind}/{job.id} gave up after {job.attempts} attempt(s): {e}")
+                await self.backend.bury(job)
+            return
+        finally:
+            self.in_flight -= 1
+
+        await self.backend.ack(job)
+        self.processed += 1
+        self._run_times.append(time.monotonic() - started)
+        self._latencies.append(time.time() - job.enqueued_at)
+
+    async def stats(self) -> Dict[str, Any]:
+        latencies, run_times = list(self._latencies), list(self._run_times)
+        return {
+            "depth": await self.backend.depth(),
+            "in_flight": self.in_flight,
+            "enqueued": self.enqueued,
+            "duplicates": self.duplicates,
+            "processed": self.processed,
+            "retried": self.retried,
+            "dead": self.dead,
+            "latency_p50_s": _percentile(latencies, 0.5),
+            "latency_p95_s": _percentile(latencies, 0.95),
+            "run_time_p50_s": _percentile(run_times, 0.5),
+            "run_time_p95_s": _percentile(run_times, 0.95),
+        }
+
+
+_queue: Optional[JobQueue] = None
+
+def get_job_queue() -> JobQueue:
+    """Return the process-wide queue on the backend selected by JOB_QUEUE_BACKEND (memory | redis)."""
+    global _queue
+    if _queue is None:
+        backend = RedisStreamJobBackend() if JOB_QUEUE_BACKEND == "redis" else InMemoryJobBackend()
+        _queue = JobQueue(backend)
+    return _queue
+
+def set_job_queue(queue: Optional[JobQueue]) -> None:
+    """Setter to swap the queue (e.g. in tests)."""
+    global _queue
+    _queue = queue
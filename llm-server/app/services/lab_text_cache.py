@@ -0,0 +1,142 @@
+# app/services/lab_text_cache.py
+import hashlib
+import os
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from ..config import (
+    LAB_TEXT_CACHE_BACKEND,
+    LAB_TEXT_CACHE_DIR,
+    LAB_TEXT_CACHE_MAX_BYTES,
+    LAB_TEXT_CACHE_TTL_SECONDS,
+)
+
+
+def _digest(*parts: str) -> str:
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+
+class LabTextStore(ABC):
+    """
+    Extracted text keyed by (bucket, key, etag), plus the last ETag seen per (bucket, key)
+    so callers can issue a conditional GET.
+    """
+
+    @abstractmethod
+    def get_etag(self, bucket: str, key: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    def get_text(self, bucket: str, key: str, etag: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    def put(self, bucket: str, key: str, etag: str, text: str) -> None:
+        ...
+
+
+class LocalLabTextStore(LabTextStore):
+    """
+    Text files on local disk, capped at `max_bytes` across `.txt` and `.etag` files; least recently
+    read files are evicted first. Report text is PHI and is not encrypted here: the directory is
+    created owner-only and files are 0600, but it should live on an encrypted volume.
+    """
+
+    def __init__(self, directory: str = LAB_TEXT_CACHE_DIR, max_bytes: int = LAB_TEXT_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _read(self, path: str) -> Optional[str]:
+        try:
+            with open(path, encoding="utf-8") as f:
+                value = f.read()
+            os.utime(path)  # mark as recently used
+            return value
+        except FileNotFoundError:
+            return None
+
+    def _write(self, path: str, value: str) -> None:
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        # Unique temp name (created 0600), so concurrent writers of the same key don't collide
+        with tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", dir=self.directory, suffix=".tmp", delete=False
+        ) as tmp:
+            tmp_path = tmp.name
+            try:
+                tmp.write(value)
+            except BaseException:
+                tmp.close()
+                os.remove(tmp_path)
+                raise
+        os.replace(tmp_path, path)
+
+    def get_etag(self, bucket: str, key: str) -> Optional[str]:
+        return self._read(self._path(f"{_digest(bucket, key)}.etag"))
+
+    def get_text(self, bucket: str, key: str, etag: str) -> Optional[str]:
+        return self._read(self._path(f"{_digest(bucket, key, etag)}.txt"))
+
+    def put(self, bucket: str, key: str, etag: str, text: str) -> None:
+        with self._lock:
+            self._write(self._path(f"{_digest(bucket, key, etag)}.txt"), text)
+            self._write(self._path(f"{_digest(bucket, key)}.etag"), etag)
+            self._evict()
+
+    def _evict(self) -> None:
+        files = [
+            e for e in os.scandir(self.directory)
+            if e.is_file() and e.name.endswith((".txt", ".etag"))
+        ]
+        total = sum(e.stat().st_size for e in files)
+        for entry in sorted(files, key=lambda e: e.stat().st_mtime):
+            if total <= self.max_bytes:
+                break
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+                total -= size
+            except FileNotFoundError:
+                pass
+
+
+class RedisLabTextStore(LabTextStore):
+    """`labtext:<digest>` strings with a TTL; Redis' maxmemory policy handles eviction beyond that."""
+
+    def __init__(self, client, ttl_seconds: int = LAB_TEXT_CACHE_TTL_SECONDS):
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+
+    def _get(self, name: str) -> Optional[str]:
+        value = self.client.get(f"labtext:{name}")
+        return value.decode("utf-8") if isinstance(value, bytes) else value
+
+    def get_etag(self, bucket: str, key: str) -> Optional[str]:
+        return self._get(f"etag:{_digest(bucket, key)}")
+
+    def get_text(self, bucket: str, key: str, etag: str) -> Optional[str]:
+        return self._get(_digest(bucket, key, etag))
+
+    def put(self, bucket: str, key: str, etag: str, text: str) -> None:
+        pipe = self.client.pipeline(transaction=False)
+        pipe.set(f"labtext:{_digest(bucket, key, etag)}", text.encode("utf-8"), ex=self.ttl_seconds)
+        pipe.set(f"labtext:etag:{_digest(bucket, key)}", etag.encode("utf-8"), ex=self.ttl_seconds)
+        pipe.execute()
+
+
+def build_lab_text_store() -> Optional[LabTextStore]:
+    """Pick the tier from LAB_TEXT_CACHE_BACKEND (none | local | redis); off unless configured."""
+    if LAB_TEXT_CACHE_BACKEND == "redis":
+        from ..redis_config import r
+        return RedisLabTextStore(r)
+    if LAB_TEXT_CACHE_BACKEND == "local":
+        return LocalLabTextStore()
+    return None
+
+
+lab_text_store: Optional[LabTextStore] = build_lab_text_store()
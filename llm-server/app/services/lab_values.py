@@ -0,0 +1,201 @@
+# app/services/lab_values.py
+import hashlib
+import re
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+from ..config import LAB_PROMPT_VALUES
+
+COLUMNS = ["analyte", "value", "unit", "refLow", "refHigh", "flag"]
+# Flag for a value printed without a reference range or H/L marker: never presented as normal
+NO_RANGE = "NR"
+# Bumped when parsing changes, so rows stored by an older parser are re-extracted
+PARSER_VERSION = "2"
+
+_NUM = r"\d+(?:\.\d+)?"
+# "Hemoglobin  11.2 L  g/dL  13.5 - 17.5", "WBC: 7.2 x10^3/uL (4.0-11.0)", "LDL 162 mg/dL <100 H"
+_ROW = re.compile(
+    rf"""^\s*
+    (?P<analyte>[A-Za-z][A-Za-z0-9 ,/%()\-\.]*?)\s*:?\s+
+    (?P<value>[<>]?\s*{_NUM})\s*
+    (?P<flag1>\b(?:H|L|HIGH|LOW|High|Low)\b)?\s*
+    (?P<unit>(?![<>]?\s*{_NUM})[^\s()]+)?\s*
+    \(?\s*(?:
+        (?P<low>{_NUM})\s*(?:-|–|to)\s*(?P<high>{_NUM})
+      | (?P<cmp><=?|>=?)\s*(?P<bound>{_NUM})
+    )?\s*\)?\s*
+    (?P<flag2>\b(?:H|L|HIGH|LOW|High|Low)\b)?\s*$""",
+    re.VERBOSE,
+)
+_DATE = re.compile(r"\b\d{1,4}([/.-])\d{1,2}\1\d{2,4}\b|\b\d{1,2}:\d{2}\b")
+_HEADER = re.compile(
+    r"^\s*(?:patient|name|age|sex|gender|dob|date|mrn|account|acct|page|printed|collected|received|reported|"
+    r"ordered|specimen|physician|provider|encounter|phone|fax)\b",
+    re.IGNORECASE,
+)
+# Bare words that are measurement units (anything with / % ^ or a digit also counts as a unit)
+_BARE_UNITS = {"g", "mg", "ng", "pg", "fl", "iu", "u", "meq", "mmol", "sec", "s", "ratio", "index", "copies"}
+
+
+def _number(text: Optional[str]) -> Optional[float]:
+    if text is None:
+        return None
+    try:
+        return float(text.lstrip("<>= "))
+    except ValueError:
+        return None
+
+
+def _flag(value: Optional[float], low: Optional[float], high: Optional[float], reported: Optional[str]) -> str:
+    """H/L from the reference range; falls back to the flag printed on the report, then to NO_RANGE."""
+    if value is not None and low is not None and value < low:
+        return "L"
+    if value is not None and high is not None and value > high:
+        return "H"
+    if low is None and high is None:
+        return reported[0].upper() if reported else NO_RANGE
+    return ""
+
+
+def is_abnormal(row: Dict[str, Any]) -> bool:
+    return row.get("flag") in ("H", "L")
+
+
+def _is_unit(unit: str) -> bool:
+    return any(ch in unit for ch in "/%^") or any(ch.isdigit() for ch in unit) or unit.lower() in _BARE_UNITS
+
+
+def parse_lab_rows(text: str) -> List[Dict[str, Any]]:
+    """Analyte/value/unit/reference-range rows found line by line in extracted report text."""
+    rows: List[Dict[str, Any]] = []
+    for line in (text or "").splitlines():
+        if _DATE.search(line) or _HEADER.match(line):
+            continue  # report/patient header, print date, collection time
+        m = _ROW.match(line)
+        has_range = bool(m and (m.group("low") or m.group("bound")))
+        if not m or (not has_range and not _is_unit(m.group("unit") or "")):
+            continue  # a name followed by a bare number or a word ("45 years") is not a lab value
+        low, high = _number(m.group("low")), _number(m.group("high"))
+        if m.group("cmp"):
+            bound = _number(m.group("bound"))
+            low, high = (bound, None) if m.group("cmp").startswith(">") else (None, bound)
+        value = _number(m.group("value"))
+        rows.append({
+            "analyte": " ".join(m.group("analyte").split()),
+            "value": value,
+            "unit": m.group("unit") or "",
+            "refLow": low,
+            "refHigh": high,
+            "flag": _flag(value, low, high, m.group("flag1") or m.group("flag2")),
+        })
+    return rows
+
+
+def to_columns(rows: List[Dict[str, Any]]) -> Dict[str, list]:
+    """Row dicts -> {column: [values...]}; the compact form stored per encounter."""
+    return {c: [r[c] for r in rows] for c in COLUMNS}
+
+
+def to_rows(columns: Dict[str, list]) -> List[Dict[str, Any]]:
+    names = columns.get("analyte", [])
+    return [{c: columns.get(c, [None] * len(names))[i] for c in COLUMNS} for i in range(len(names))]
+
+
+def text_hash(text: str) -> str:
+    return hashlib.md5(f"{PARSER_VERSION}:{text or ''}".encode("utf-8")).hexdigest()
+
+
+def format_lab_table(rows: List[Dict[str, Any]], mode: str = LAB_PROMPT_VALUES) -> str:
+    """
+    Compact pipe table for the summarizer; in "abnormal" mode analytes within range are listed by name only.
+    Values without a reference range (flag NO_RANGE) are always printed in full.
+    """
+    def ref(r):
+        if r["refLow"] is not None and r["refHigh"] is not None:
+            return f"{r['refLow']:g}-{r['refHigh']:g}"
+        if r["refLow"] is not None:
+            return f">{r['refLow']:g}"
+        if r["refHigh"] is not None:
+            return f"<{r['refHigh']:g}"
+        return ""
+
+    shown = [r for r in rows if r["flag"]] if mode == "abnormal" else rows
+    lines = ["analyte | value | unit | ref | flag"]
+    lines += [
+        f"{r['analyte']} | {'' if r['value'] is None else format(r['value'], 'g')} | {r['unit']} | {ref(r)} | {r['flag']}"
+        for r in shown
+    ]
+    if mode == "abnormal":
+        normal = [r["analyte"] for r in rows if not r["flag"]]
+        if not shown:
+            lines = [f"All {len(rows)} extracted values within reference range."]
+        if normal and shown:
+            lines.append(f"Within reference range: {', '.join(normal)}")
+        elif normal:
+            lines.append(f"Analytes: {', '.join(normal)}")
+    return "\n".join(lines)
+
+
+def _to_dynamo(value: Any) -> Any:
+    return Decimal(str(value)) if isinstance(value, float) else value
+
+
+def _from_dynamo(value: Any) -> Any:
+    return float(value) if isinstance(value, Decimal) else value
+
+
+def lab_values_sk(encounter_id: str) -> str:
+    return f"LabValues#{encounter_id}"
+
+
+def lab_values_item(patient_id: str, encounter_id: str, rows: List[Dict[str, Any]], source_key: str, source_text: str) -> Dict[str, Any]:
+    columns = to_columns(rows)
+    return {
+        "patientId": patient_id,
+        "SK": lab_values_sk(encounter_id),
+        "recordType": "LabValues",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "encounterId": encounter_id,
+        "sourceKey": source_key,
+        "textHash": text_hash(source_text),
+        "abnormalCount": sum(1 for r in rows if is_abnormal(r)),
+        **{c: [_to_dynamo(v) for v in vals] for c, vals in columns.items()},
+    }
+
+
+def decode_lab_values(item: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    if not item:
+        return None
+    item = dict(item)
+    for c in COLUMNS:
+        item[c] = [_from_dynamo(v) for v in item.get(c, [])]
+    return item
+
+
+def load_lab_values(repository, patient_id: str, encounter_id: str) -> Optional[Dict[str, Any]]:
+    return decode_lab_values(repository.get(patient_id, lab_values_sk(encounter_id)))
+
+
+def load_or_extract_lab_values(
+    repository,
+    patient_id: str,
+    encounter_id: str,
+    source_key: str,
+    text: str,
+    timeline=None,
+) -> List[Dict[str, Any]]:
+    """
+    Stored rows when they were parsed from this exact text; otherwise parse and store them.
+    With a PatientTimeline the stored item is taken from it instead of a separate GetItem.
+    """
+    if timeline is not None:
+        stored = decode_lab_values(timeline.get(lab_values_sk(encounter_id)))
+    else:
+        stored = load_lab_values(repository, patient_id, encounter_id)
+    if stored and stored.get("textHash") == text_hash(text):
+        return to_rows(stored)
+    rows = parse_lab_rows(text)
+    if rows:
+        repository.put(lab_values_item(patient_id, encounter_id, rows, source_key, text))
+    return rows
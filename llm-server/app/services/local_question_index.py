@@ -0,0 +1,113 @@
+# app/services/local_question_index.py
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+
+class LocalQuestionIndex:
+    """
+    In-process cosine index over the symptom question docs, partitioned by (symptom, section).
+    The corpus is ~100 short strings, so a brute-force matmul per partition beats a network KNN.
+    """
+
+    def __init__(self, docs: List[Document], vectors: List[List[float]], embeddings: Embeddings):
+        self.embeddings = embeddings
+        self._partitions: Dict[Tuple[str, str], Tuple[np.ndarray, List[Document]]] = {}
+
+        grouped: Dict[Tuple[str, str], List[int]] = {}
+        for i, d in enumerate(docs):
+            key = (d.metadata.get("symptom", ""), d.metadata.get("section", ""))
+            grouped.setdefault(key, []).append(i)
+
+        matrix = _normalize(np.asarray(vectors, dtype=np.float32)) if grouped else None
+        for key, rows in grouped.items():
+            self._partitions[key] = (matrix[rows], [docs[i] for i in rows])
+
+    def __len__(self) -> int:
+        return sum(len(p[1]) for p in self._partitions.values())
+
+    def embed_query(self, text: str) -> np.ndarray:
+        # `embeddings` is the shared CachedEmbeddings, so repeated hints don't hit the API
+        return _normalize(np.asarray(self.embeddings.embed_query(text), dtype=np.float32)[None, :])[0]
+
+    async def aembed_query(self, text: str) -> np.ndarray:
+        return _normalize(np.asarray(await self.embeddings.aembed_query(text), dtype=np.float32)[None, :])[0]
+
+    def search(
+        self,
+        query: str,
+        symptom: str,
+        sections: Optional[Sequence[str]] = None,
+        k: int = 8,
+    ) -> List[Document]:
+        """Top-k docs for `symptom`, optionally restricted to `sections`, by cosine similarity."""
+        return self.search_by_vector(self.embed_query(query), symptom, sections, k)
+
+    async def asearch(
+        self,
+        query: str,
+        symptom: str,
+        sections: Optional[Sequence[str]] = None,
+        k: int = 8,
+    ) -> List[Document]:
+        return self.search_by_vector(await self.aembed_query(query), symptom, sections, k)
+
+    async def asearch_by_section(
+        self,
+        query: str,
+        symptom: str,
+        sections: Sequence[str],
+        k: int = 8,
+    ) -> Dict[str, List[Document]]:
+        """One query embedding, top-k per section."""
+        q = await self.aembed_query(query)
+        return {sec: self.search_by_vector(q, symptom, [sec], k) for sec in sections}
+
+    def search_by_vector(
+        self,
+        q: np.ndarray,
+        symptom: str,
+        sections: Optional[Sequence[str]] = None,
+        k: int = 8,
+    ) -> List[Document]:
+        keys = [
+            key for key in self._partitions
+            if key[0] == symptom and (not sections or key[1] in sections)
+        ]
+        if not keys:
+            return []
+
+        matrices, docs = zip(*(self._partitions[key] for key in keys))
+        matrix = matrices[0] if len(matrices) == 1 else np.vstack(matrices)
+        candidates = [d for part in docs for d in part]
+
+        scores = matrix @ q
+        k = min(k, len(candidates))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [candidates[i] for i in top]
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def build_local_question_index(docs: List[Document], embeddings: Embeddings) -> LocalQuestionIndex:
+    """Vectors come through the cached embedding model, so this makes no API calls for a synced corpus."""
+    vectors = embeddings.embed_documents([d.page_content for d in docs]) if docs else []
+    return LocalQuestionIndex(docs, vectors, embeddings)
+
+
+LOCAL_QUESTION_INDEX: Optional[LocalQuestionIndex] = None
+
+def set_local_question_index(idx: Optional[LocalQuestionIndex]) -> None:
+    """Setter to (re)load the module-level index at startup."""
+    global LOCAL_QUESTION_INDEX
+    LOCAL_QUESTION_INDEX = idx
+
+def get_local_question_index() -> Optional[LocalQuestionIndex]:
+    return LOCAL_QUESTION_INDEX
@@ -1,44 +1,42 @@
-import json, urllib.parse
-from google.cloud import vision
-from io import BytesIO
-from ..config import sqs, s3, OCR_UPLOAD_QUEUE_URL
+# app/services/ocr_services.py
+import hashlib
+import urllib.parse
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def s3_objects_from_event(body: Dict[str, Any]) -> List[Tuple[str, str, str]]:
+    """(bucket, key, eTag) for every record of an S3 event notification; empty if the body isn't one."""
+    return [
+        (
+            record["s3"]["bucket"]["name"],
+            urllib.parse.unquote_plus(record["s3"]["object"]["key"]),
+            record["s3"]["object"].get("eTag", ""),
+        )
+        for record in body.get("Records", [])
+        if "s3" in record
+    ]
+
+def patient_id_from_key(key: str) -> Optional[str]:
+    """Uploads follow the `{patientId}/...` layout used for the other patient objects."""
+    head, sep, _ = key.partition("/")
+    return head if sep and head else None
+
+def ocr_note_sk(bucket: str, key: str, etag: str) -> str:
+    """One SK per uploaded object version, so a redelivered message overwrites instead of duplicating."""
+    return "OCRNote#" + hashlib.md5(f"{bucket}/{key}#{etag}".encode("utf-8")).hexdigest()
+
+def ocr_note_item(patient_id: str, bucket: str, key: str, etag: str, text: str, engine: str) -> Dict[str, Any]:
+    timestamp = datetime.now(timezone.utc).isoformat()
+    return {
+        "patientId": patient_id,
+        "SK": ocr_note_sk(bucket, key, etag),
+        "recordType": "OCRNote",
+        "timestamp": timestamp,
+        "sourceBucket": bucket,
+        "sourceKey": key,
+        "sourceETag": etag,
+        "engine": engine,
+        "text": text,
+    }
 
-def poll_sqs_and_process():
-    print("Polling SQS for messages...")
-
-    messages = sqs.receive_message(
-        QueueUrl=OCR_UPLOAD_QUEUE_URL,
-        MaxNumberOfMessages=1,
-        WaitTimeSeconds=3
-    )
-
-    if "Messages" not in messages:
-        return {"message": "No messages in queue"}
-    
-    msg = messages["Messages"][0]
-    receipt_handle = msg["ReceiptHandle"]
-    body = json.loads(msg["Body"])
-
-    if "Records" not in body:
-        return {"message": "Not a valid S3 event"}
-    
-    record = body["Records"][0]
-    bucket = record["s3"]["bucket"]["name"]
-    key = urllib.parse.unquote_plus(record["s3"]["object"]["key"])
-    print(f"🧾 Processing file: {bucket}/{key}")
-
-    image_bytes = s3.get_object(Bucket=bucket, Key=key)["Body"].read()
-
-    client = vision.ImageAnnotatorClient()
-    image = vision.Image(content=image_bytes)
-
-    response = client.document_text_detection(image=image)
-    text = response.full_text_annotation.text
-
-    print(f"📝 Extracted text:\n{text}")
-
-
-    sqs.delete_message(
-        QueueUrl=OCR_UPLOAD_QUEUE_URL,
-        ReceiptHandle=receipt_handle
-    )
\ No newline at end of file
@@ -0,0 +1,159 @@
+# app/services/patient_record_repository.py
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from boto3.dynamodb.conditions import Key
+
+from ..config import DYNAMODB_MAX_WORKERS
+
+Item = Dict[str, Any]
+
+
+def _projection(fields: Optional[Sequence[str]]) -> Dict[str, Any]:
+    """ProjectionExpression with placeholders, since names like `timestamp` are reserved words."""
+    if not fields:
+        return {}
+    names = {f"#p{i}": field for i, field in enumerate(fields)}
+    return {"ProjectionExpression": ", ".join(names), "ExpressionAttributeNames": names}
+
+
+class PatientRecordRepository:
+    """
+    All reads and writes of the patient-record table (partition key `patientId`, sort key `SK`).
+    Sync methods are for worker threads and sync routes; the `a*` variants run the same calls on a
+    dedicated thread pool so async routes never block the event loop.
+    """
+
+    def __init__(self, table=None, max_workers: int = DYNAMODB_MAX_WORKERS):
+        if table is None:
+            from ..config import table
+        self.table = table
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="dynamodb")
+
+    # ---- reads ----
+    def query_page(
+        self,
+        patient_id: str,
+        sk_prefix: Optional[str] = None,
+        sk_between: Optional[Tuple[str, str]] = None,
+        projection: Optional[Sequence[str]] = None,
+        descending: bool = False,
+        page_size: Optional[int] = None,
+        start_key: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[List[Item], Optional[Dict[str, Any]]]:
+        """One Query call; returns (items, LastEvaluatedKey or None)."""
+        condition = Key("patientId").eq(patient_id)
+        if sk_between:
+            condition = condition & Key("SK").between(*sk_between)
+        elif sk_prefix:
+            condition = condition & Key("SK").begins_with(sk_prefix)
+
+        kwargs: Dict[str, Any] = {
+            "KeyConditionExpression": condition,
+            "ScanIndexForward": not descending,
+            **_projection(projection),
+        }
+        if page_size:
+            kwargs["Limit"] = page_size
+        if start_key:
+            kwargs["ExclusiveStartKey"] = start_key
+        resp = self.table.query(**kwargs)
+        return resp.get("Items", []), resp.get("LastEvaluatedKey")
+
+    def query(
+        self,
+        patient_id: str,
+        sk_prefix: Optional[str] = None,
+        sk_between: Optional[Tuple[str, str]] = None,
+        projection: Optional[Sequence[str]] = None,
+        descending: bool = False,
+        limit: Optional[int] = None,
+    ) -> List[Item]:
+        """Follows LastEvaluatedKey until every match (or `limit` items) has been read."""
+        items: List[Item] = []
+        start_key = None
+        while True:
+            remaining = limit - len(items) if limit else None
+            page, start_key = self.query_page(
+                patient_id, sk_prefix, sk_between, projection, descending, remaining, start_key
+            )
+            items.extend(page)
+            if not start_key or (limit and len(items) >= limit):
+                return items
+
+    def get(self, patient_id: str, sk: str, projection: Optional[Sequence[str]] = None) -> Optional[Item]:
+        return self.table.get_item(Key={"patientId": patient_id, "SK": sk}, **_projection(projection)).get("Item")
+
+    # ---- writes ----
+    def put(self, item: Item) -> None:
+        self.table.put_item(Item=item)
+
+    def put_with_pointer(self, item: Item, pointer_sk: str, order_field: str = "timestamp") -> bool:
+        """
+        Write `item` and a copy of it under `pointer_sk` in one transaction. The pointer only moves
+        forward: when it already holds a newer `order_field`, just the item is written.
+        Returns whether the pointer was updated.
+        """
+        from botocore.exceptions import ClientError
+
+        # The resource's client serializes plain Python values, same as Table.put_item
+        try:
+            self.table.meta.client.transact_write_items(TransactItems=[
+                {"Put": {"TableName": self.table.name, "Item": item}},
+                {"Put": {
+                    "TableName": self.table.name,
+                    "Item": {**item, "SK": pointer_sk, "pointsTo": item["SK"]},
+                    "ConditionExpression": "attribute_not_exists(SK) OR #order <= :order",
+                    "ExpressionAttributeNames": {"#order": order_field},
+                    "ExpressionAttributeValues": {":order": item[order_field]},
+                }},
+            ])
+            return True
+        except ClientError as e:
+            reasons = [r.get("Code") for r in e.response.get("CancellationReasons", [])]
+            if "ConditionalCheckFailed" not in reasons:
+                raise
+        # A newer result already owns the pointer (out-of-order delivery): keep the history item
+        self.put(item)
+        return False
+
+    def put_many(self, items: Iterable[Item]) -> None:
+        """BatchWriteItem in chunks of 25; boto3's batch writer resubmits unprocessed items."""
+        with self.table.batch_writer(overwrite_by_pkeys=["patientId", "SK"]) as batch:
+            for item in items:
+                batch.put_item(Item=item)
+
+    # ---- async variants ----
+    async def _run(self, fn, *args, **kwargs):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, partial(fn, *args, **kwargs))
+
+    async def aquery_page(self, *args, **kwargs) -> Tuple[List[Item], Optional[Dict[str, Any]]]:
+        return await self._run(self.query_page, *args, **kwargs)
+
+    async def aquery(self, *args, **kwargs) -> List[Item]:
+        return await self._run(self.query, *args, **kwargs)
+
+    async def aget(self, *args, **kwargs) -> Optional[Item]:
+        return await self._run(self.get, *args, **kwargs)
+
+    async def aput(self, item: Item) -> None:
+        await self._run(self.put, item)
+
+    async def aput_many(self, items: Iterable[Item]) -> None:
+        await self._run(self.put_many, list(items))
+
+
+_repository: Optional[PatientRecordRepository] = None
+
+def get_patient_repository() -> PatientRecordRepository:
+    global _repository
+    if _repository is None:
+        _repository = PatientRecordRepository()
+    return _repository
+
+def set_patient_repository(repository: Optional[PatientRecordRepository]) -> None:
+    """Setter to swap the repository (e.g. a local DynamoDB table in tests)."""
+    global _repository
+    _repository = repository
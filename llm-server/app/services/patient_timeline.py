@@ -0,0 +1,78 @@
+# app/services/patient_timeline.py
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+from .patient_record_repository import get_patient_repository
+
+Item = Dict[str, Any]
+
+
+def record_type(sk: str) -> str:
+    """`ChatHistory#abc` -> `ChatHistory#`; the SK prefix doubles as the record type."""
+    head, sep, _ = str(sk).partition("#")
+    return head + sep
+
+
+class PatientTimeline:
+    """
+    Every record of one patient, read with a single paginated partition query and
+    grouped locally by SK prefix (ChatHistory#, PExamResults#, XRay#, LabValues#, ...).
+    """
+
+    def __init__(self, patient_id: str, items: List[Item]):
+        self.patient_id = patient_id
+        self._by_sk: Dict[str, Item] = {}
+        self._by_type: Dict[str, List[Item]] = {}
+        for it in sorted(items, key=lambda it: it["SK"], reverse=True):
+            self._by_sk[it["SK"]] = it
+            self._by_type.setdefault(record_type(it["SK"]), []).append(it)
+
+    def __len__(self) -> int:
+        return len(self._by_sk)
+
+    def records(self, prefix: str) -> List[Item]:
+        """Records under `prefix`, newest SK first."""
+        return list(self._by_type.get(prefix, []))
+
+    def get(self, sk: str) -> Optional[Item]:
+        return self._by_sk.get(sk)
+
+    def counts(self) -> Dict[str, int]:
+        return {prefix: len(items) for prefix, items in self._by_type.items()}
+
+
+def load_patient_timeline(patient_id: str, repository=None) -> PatientTimeline:
+    repository = repository or get_patient_repository()
+    return PatientTimeline(patient_id, repository.query(patient_id))
+
+
+# patient_id -> in-flight/finished load, shared by every branch of one request
+_request_timelines: ContextVar[Optional[Dict[str, "asyncio.Future[PatientTimeline]"]]] = ContextVar(
+    "patient_timelines", default=None
+)
+
+
+@contextmanager
+def patient_timeline_scope() -> Iterator[None]:
+    """Within this block, concurrent callers for the same patient share one DynamoDB query."""
+    token = _request_timelines.set({})
+    try:
+        yield
+    finally:
+        _request_timelines.reset(token)
+
+
+async def _aload(patient_id: str) -> PatientTimeline:
+    return PatientTimeline(patient_id, await get_patient_repository().aquery(patient_id))
+
+
+async def aget_patient_timeline(patient_id: str) -> PatientTimeline:
+    """Cached per request inside patient_timeline_scope(); a fresh query otherwise."""
+    cache = _request_timelines.get()
+    if cache is None:
+        return await _aload(patient_id)
+    if patient_id not in cache:
+        cache[patient_id] = asyncio.ensure_future(_aload(patient_id))
+    return await asyncio.shield(cache[patient_id])
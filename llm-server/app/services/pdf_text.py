@@ -0,0 +1,43 @@
+# app/services/pdf_text.py
+# Kept free of app.config imports so process-pool workers start without the server's environment.
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from typing import List, Optional
+
+from pdfminer.high_level import extract_text
+from pdfminer.pdfpage import PDFPage
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def page_count(pdf_bytes: bytes) -> int:
+    return sum(1 for _ in PDFPage.get_pages(BytesIO(pdf_bytes)))
+
+
+def extract_pages(pdf_bytes: bytes, page_numbers: List[int]) -> str:
+    """Text of the given (0-based) pages; each page ends with a form feed, exactly as extract_text does."""
+    return extract_text(BytesIO(pdf_bytes), page_numbers=page_numbers) or ""
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn: the server is multi-threaded, so forking it is not safe
+        _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+def extract_pdf_text(pdf_bytes: bytes, workers: int = 2, parallel_min_pages: int = 4) -> str:
+    """
+    Same output as pdfminer's extract_text, but documents with at least `parallel_min_pages`
+    pages are split into `workers` contiguous page ranges parsed in a process pool.
+    """
+    pages = page_count(pdf_bytes)
+    if workers <= 1 or pages < max(2, parallel_min_pages):
+        return extract_text(BytesIO(pdf_bytes)) or ""
+
+    step = -(-pages // workers)
+    ranges = [list(range(start, min(start + step, pages))) for start in range(0, pages, step)]
+    pool = _get_pool(workers)
+    return "".join(pool.map(extract_pages, [pdf_bytes] * len(ranges), ranges))
@@ -1,12 +1,9 @@
 # app/services/rag_chain.py
 from langchain.prompts import PromptTemplate
 from langchain.schema.runnable import RunnablePassthrough
-from langchain_openai import ChatOpenAI
+from app.llm_config import get_chat_model
 
-rag_llm = ChatOpenAI(
-    model="gpt-4o",
-    streaming=True,
-)
+rag_llm = get_chat_model("gpt-4o", streaming=True)
 
 rag_prompt = PromptTemplate(
     input_variables=["symptom", "history"],
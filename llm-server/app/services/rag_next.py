@@ -1,26 +1,31 @@
 # keep this in some module, e.g., services/rag_next.py
 
-from typing import Optional, Set, Tuple, Dict, List
+from typing import Optional, Sequence, Tuple, Dict, List
 from langchain_core.documents import Document
 from redisvl.query.filter import Tag
 from ..vectorstore_config import vectorstore
+from .session_store import IntakeSession
+from .local_question_index import get_local_question_index
 
-asked_ids: dict[str, Set[str]] = {}
-asked_contents: Dict[str, Set[str]] = {}
-
-async def get_next_question(
-    session_id: str,
+async def _retrieve_candidates(
     symptom: str,
-    user_hint: str = "follow-up question",
-    section_filter: Optional[str] = None,
-    k: int = 8,
-) -> Optional[Tuple[str, Dict[str, str]]]:
-    """
-    Retrieve the next best question for a session.
-    - Constrains search by symptom (required) and optionally by section.
-    - De-dupes by both doc id and question text per session.
-    - Returns (question_text, metadata) or None if no unasked candidate found.
-    """
+    query: str,
+    section_filter: Optional[str],
+    k: int,
+) -> List[Document]:
+    """Local in-process index when loaded; Redis KNN otherwise (or if the local search fails)."""
+    local_index = get_local_question_index()
+    if local_index is not None:
+        try:
+            return await local_index.asearch(
+                query,
+                symptom,
+                sections=[section_filter] if section_filter else None,
+                k=k,
+            )
+        except Exception as e:
+            print(f"⚠️ Local question index failed, falling back to Redis: {e}")
+
     # Build filter: must match symptom; optionally match section
     flt = Tag("symptom") == symptom
     if section_filter:
@@ -30,15 +35,44 @@ async def get_next_question(
         search_type="similarity",
         search_kwargs={"k": k, "filter": flt},
     )
+    return await retriever.aget_relevant_documents(query)
 
-    docs: List[Document] = await retriever.aget_relevant_documents(user_hint or symptom)
-    if not docs:
-        return None
+async def _retrieve_candidates_by_section(
+    symptom: str,
+    query: str,
+    sections: Sequence[str],
+    k: int,
+) -> Dict[str, List[Document]]:
+    """
+    Candidates for several sections from a single query embedding.
+    Redis path: one KNN with a section tag-union filter, grouped locally. k scales with the
+    number of sections; each symptom has only a handful of questions per section, so the
+    union query still returns every section's candidates.
+    """
+    local_index = get_local_question_index()
+    if local_index is not None:
+        try:
+            return await local_index.asearch_by_section(query, symptom, sections, k=k)
+        except Exception as e:
+            print(f"⚠️ Local question index failed, falling back to Redis: {e}")
 
-    ids = asked_ids.setdefault(session_id, set())
-    contents = asked_contents.setdefault(session_id, set())
+    flt = (Tag("symptom") == symptom) & (Tag("section") == list(sections))
+    retriever = vectorstore.as_retriever(
+        search_type="similarity",
+        search_kwargs={"k": k * len(sections), "filter": flt},
+    )
+    grouped: Dict[str, List[Document]] = {sec: [] for sec in sections}
+    for d in await retriever.aget_relevant_documents(query):
+        sec = d.metadata.get("section", "")
+        if sec in grouped and len(grouped[sec]) < k:
+            grouped[sec].append(d)
+    return grouped
+
+def _pick_unasked(session: IntakeSession, docs: List[Document]) -> Optional[Tuple[str, Dict[str, str]]]:
+    """First candidate not yet asked in this session (by id or text); marks it as asked."""
+    ids = set(session.asked_ids)
+    contents = set(session.asked_contents)
 
-    # Pick the first unasked candidate
     for d in docs:
         doc_id = (d.metadata.get("id") or d.metadata.get("_id") or "").strip()
         content = (d.page_content or "").strip()
@@ -50,9 +84,7 @@ async def get_next_question(
             continue
 
         # Mark as asked and return
-        if doc_id:
-            ids.add(doc_id)
-        contents.add(content)
+        mark_question_asked(session, content, doc_id)
 
         meta = {
             "id": doc_id,
@@ -61,14 +93,53 @@ async def get_next_question(
         }
         return content, meta
 
-    # All top-k were already asked
     return None
 
-def mark_question_asked(session_id: str, question_text: str, doc_id: str | None = None) -> None:
+async def get_next_question(
+    session: IntakeSession,
+    symptom: str,
+    user_hint: str = "follow-up question",
+    section_filter: Optional[str] = None,
+    k: int = 8,
+) -> Optional[Tuple[str, Dict[str, str]]]:
+    """
+    Retrieve the next best question for a session.
+    - Constrains search by symptom (required) and optionally by section.
+    - De-dupes by both doc id and question text per session.
+    - Returns (question_text, metadata) or None if no unasked candidate found.
+    """
+    docs = await _retrieve_candidates(symptom, user_hint or symptom, section_filter, k)
+    if not docs:
+        return None
+
+    # Pick the first unasked candidate (None if all top-k were already asked)
+    return _pick_unasked(session, docs)
+
+async def get_next_question_in_sections(
+    session: IntakeSession,
+    symptom: str,
+    sections: Sequence[str],
+    user_hint: str = "follow-up question",
+    k: int = 8,
+) -> Optional[Tuple[str, Tuple[str, Dict[str, str]]]]:
+    """
+    Batched variant of get_next_question over several sections: embeds the hint once, runs one
+    retrieval, and returns (section, (question_text, metadata)) for the first section in `sections`
+    order that still has an unasked candidate.
+    """
+    if not sections:
+        return None
+    grouped = await _retrieve_candidates_by_section(symptom, user_hint or symptom, sections, k)
+    for sec in sections:
+        picked = _pick_unasked(session, grouped.get(sec, []))
+        if picked:
+            return sec, picked
+    return None
+
+def mark_question_asked(session: IntakeSession, question_text: str, doc_id: str | None = None) -> None:
     """Record a question as already asked so the retriever won't propose it again."""
-    ids = asked_ids.setdefault(session_id, set())
-    contents = asked_contents.setdefault(session_id, set())
-    if doc_id:
-        ids.add(doc_id)
-    if question_text:
-        contents.add(question_text.strip())
+    if doc_id and doc_id not in session.asked_ids:
+        session.asked_ids.append(doc_id)
+    text = (question_text or "").strip()
+    if text and text not in session.asked_contents:
+        session.asked_contents.append(text)
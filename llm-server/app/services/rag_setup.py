@@ -1,7 +1,10 @@
 # rag_setup.py
-import hashlib
-from typing import List, Dict, Tuple
+from typing import List, Dict, Set, Tuple
 from langchain_core.documents import Document
+from ..config import EMBEDDING_BATCH_SIZE
+from .embedding_cache import content_hash
+from ..redis_config import r
+from ..vectorstore_config import RAG_KEY_PREFIX
 
 def build_question_docs(symptom_questions: List[Dict]) -> Tuple[List[Document], List[str]]:
     """
@@ -28,7 +31,7 @@ def build_question_docs(symptom_questions: List[Dict]) -> Tuple[List[Document],
         symptom = entry["symptom"]
         for section, questions in entry["questions"].items():
             for q in questions:
-                q_hash = hashlib.md5(q.encode("utf-8")).hexdigest()
+                q_hash = content_hash(q)
                 doc_id = f"{symptom}::{section}::{q_hash}"
 
                 ids.append(doc_id)
@@ -45,9 +48,47 @@ def build_question_docs(symptom_questions: List[Dict]) -> Tuple[List[Document],
     return docs, ids
 
 
-def upsert_symptom_questions_to_vectorstore(vectorstore, symptom_questions: List[Dict]) -> None:
+def _existing_question_ids(key_prefix: str) -> Set[str]:
+    """
+    IDs of symptom-question docs already in the index.
+    Question IDs look like `symptom::section::md5`, which keeps them apart from other docs under the same prefix.
+    """
+    prefix = f"{key_prefix}:"
+    existing: Set[str] = set()
+    for key in r.scan_iter(match=f"{prefix}*::*::*", count=1000):
+        key = key.decode("utf-8") if isinstance(key, bytes) else key
+        existing.add(key[len(prefix):])
+    return existing
+
+
+def upsert_symptom_questions_to_vectorstore(
+    vectorstore,
+    symptom_questions: List[Dict],
+    batch_size: int = EMBEDDING_BATCH_SIZE,
+    key_prefix: str = RAG_KEY_PREFIX,
+) -> None:
+    """
+    Incremental sync of the question corpus into the vector store.
+    IDs embed the question's content hash, so an ID already in Redis means the doc is current:
+    only new/changed questions are embedded (cache first, then in bounded batches) and
+    questions that disappeared from the JSON are deleted.
+    """
     docs, ids = build_question_docs(symptom_questions)
-    if not docs:
-        return
-    # idempotent upsert (same ids => no duplicates)
-    vectorstore.add_documents(documents=docs, ids=ids)
+    # Diffing by key prefix doesn't touch the vector store, so an unchanged corpus never builds it
+    existing = _existing_question_ids(key_prefix)
+
+    stale = sorted(existing - set(ids))
+    if stale:
+        vectorstore.delete(ids=stale)
+
+    pending: Dict[str, Document] = {}
+    for doc, doc_id in zip(docs, ids):
+        if doc_id not in existing:
+            pending.setdefault(doc_id, doc)
+
+    pending_ids = list(pending.keys())
+    for i in range(0, len(pending_ids), batch_size):
+        batch_ids = pending_ids[i:i + batch_size]
+        vectorstore.add_documents(documents=[pending[d] for d in batch_ids], ids=batch_ids)
+
+    print(f"✅ Symptom questions synced: {len(pending_ids)} added, {len(stale)} removed, {len(existing) - len(stale)} unchanged")
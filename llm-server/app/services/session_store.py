@@ -0,0 +1,171 @@
+# app/services/session_store.py
+import json
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import redis.asyncio as aioredis
+from pydantic import BaseModel, Field
+
+from ..config import (
+    REDIS_URL,
+    SESSION_STORE_BACKEND,
+    SESSION_TTL_SECONDS,
+    SESSION_MAX_IN_MEMORY,
+)
+
+
+class SessionConflictError(Exception):
+    """Raised when a session was modified by another worker since it was loaded."""
+
+
+class IntakeSession(BaseModel):
+    """All per-session state of the /generate-answer intake flow."""
+    session_id: str
+    symptom: str
+    # Unique per intake: clients may reuse one session_id (e.g. "default-session") for every conversation
+    intake_id: str = Field(default_factory=lambda: uuid.uuid4().hex)
+    current_section: str = "chiefComplaint"
+    # e.g. {"id": "...", "symptom": "...", "section": "HPI", "question_text": "..."}
+    last_doc_meta: Dict[str, str] = Field(default_factory=dict)
+    # {sec: [ {"q": "...", "a": "..."} ]}
+    qas: Dict[str, List[Dict[str, str]]] = Field(default_factory=dict)
+    asked_ids: List[str] = Field(default_factory=list)
+    asked_contents: List[str] = Field(default_factory=list)
+    # Optimistic concurrency token, bumped on every successful save
+    version: int = 0
+
+
+class SessionStore(ABC):
+    """Interface: one load and one save per chat turn."""
+
+    @abstractmethod
+    async def load(self, session_id: str) -> Optional[IntakeSession]:
+        ...
+
+    @abstractmethod
+    async def save(self, session: IntakeSession) -> None:
+        """Persist the session if nobody saved it since it was loaded, else raise SessionConflictError."""
+
+    @abstractmethod
+    async def delete(self, session_id: str) -> None:
+        ...
+
+
+class InMemorySessionStore(SessionStore):
+    """Single-process backend with per-session TTL and an LRU bound on the number of sessions."""
+
+    def __init__(self, ttl_seconds: int = SESSION_TTL_SECONDS, max_sessions: int = SESSION_MAX_IN_MEMORY):
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        # session_id -> (expires_at, serialized session)
+        self._items: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
+    def _purge_expired(self, now: float) -> None:
+        expired = [sid for sid, (exp, _) in self._items.items() if exp <= now]
+        for sid in expired:
+            self._items.pop(sid, None)
+
+    async def load(self, session_id: str) -> Optional[IntakeSession]:
+        now = time.monotonic()
+        entry = self._items.get(session_id)
+        if entry is None:
+            return None
+        expires_at, payload = entry
+        if expires_at <= now:
+            self._items.pop(session_id, None)
+            return None
+        self._items.move_to_end(session_id)
+        return IntakeSession.model_validate_json(payload)
+
+    async def save(self, session: IntakeSession) -> None:
+        now = time.monotonic()
+        entry = self._items.get(session.session_id)
+        current_version = 0
+        if entry is not None and entry[0] > now:
+            current_version = IntakeSession.model_validate_json(entry[1]).version
+        if current_version != session.version:
+            raise SessionConflictError(session.session_id)
+
+        session.version += 1
+        self._items[session.session_id] = (now + self.ttl_seconds, session.model_dump_json())
+        self._items.move_to_end(session.session_id)
+
+        if len(self._items) > self.max_sessions:
+            self._purge_expired(now)
+        while len(self._items) > self.max_sessions:
+            self._items.popitem(last=False)
+
+    async def delete(self, session_id: str) -> None:
+        self._items.pop(session_id, None)
+
+
+# Compare-and-set on the hash's version field; writes state and TTL in the same round-trip.
+_CAS_SAVE_LUA = """
+local current = redis.call('HGET', KEYS[1], 'version')
+if not current then current = '0' end
+if tonumber(current) ~= tonumber(ARGV[1]) then
+  return 0
+end
+redis.call('HSET', KEYS[1], 'version', ARGV[2], 'state', ARGV[3])
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return 1
+"""
+
+
+class RedisSessionStore(SessionStore):
+    """
+    Shared backend for multi-worker / multi-node deployments.
+    Each session is a hash {version, state(JSON)} under `session:<id>` with a sliding TTL.
+    """
+
+    def __init__(self, redis_url: str = REDIS_URL, ttl_seconds: int = SESSION_TTL_SECONDS, key_prefix: str = "session"):
+        self.ttl_seconds = ttl_seconds
+        self.key_prefix = key_prefix
+        self._redis = aioredis.from_url(redis_url, decode_responses=True)
+        self._cas_save = self._redis.register_script(_CAS_SAVE_LUA)
+
+    def _key(self, session_id: str) -> str:
+        return f"{self.key_prefix}:{session_id}"
+
+    async def load(self, session_id: str) -> Optional[IntakeSession]:
+        version, state = await self._redis.hmget(self._key(session_id), ["version", "state"])
+        if not state:
+            return None
+        session = IntakeSession.model_validate_json(state)
+        session.version = int(version or 0)
+        return session
+
+    async def save(self, session: IntakeSession) -> None:
+        new_version = session.version + 1
+        payload = session.model_copy(update={"version": new_version}).model_dump_json()
+        ok = await self._cas_save(
+            keys=[self._key(session.session_id)],
+            args=[session.version, new_version, payload, self.ttl_seconds],
+        )
+        if not ok:
+            raise SessionConflictError(session.session_id)
+        session.version = new_version
+
+    async def delete(self, session_id: str) -> None:
+        await self._redis.delete(self._key(session_id))
+
+
+_store: Optional[SessionStore] = None
+
+def get_session_store() -> SessionStore:
+    """Return the process-wide session store selected by SESSION_STORE_BACKEND (memory | redis)."""
+    global _store
+    if _store is None:
+        if SESSION_STORE_BACKEND == "redis":
+            _store = RedisSessionStore()
+        else:
+            _store = InMemorySessionStore()
+    return _store
+
+def set_session_store(store: SessionStore) -> None:
+    """Setter to swap the backend (e.g. in tests)."""
+    global _store
+    _store = store
@@ -0,0 +1,48 @@
+# app/services/xray_classification_service.py
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+from PIL import Image
+from .patient_record_repository import get_patient_repository
+from .imageset_services import get_first_frame
+
+def fetch_first_frame_image(image_set_id: str) -> Tuple[Optional[str], Optional[Image.Image]]:
+    """Metadata -> first frame -> decode (cached). Returns (patient_id, RGB image or None)."""
+    patient_id, frame = get_first_frame(image_set_id)
+    return patient_id, frame.convert("RGB") if frame is not None else None
+
+XRAY_PREFIX = "XRay#"
+XRAY_LATEST_SK = "XRay#LATEST"
+# Timestamp SKs start with a digit, so this range stops before the LATEST pointer
+XRAY_HISTORY_RANGE = (XRAY_PREFIX, XRAY_PREFIX + ":")
+
+def save_xray_result(patient_id: str, image_set_id: str, label: str, confidence: float) -> None:
+    """History item `XRay#<ts>` plus the `XRay#LATEST` pointer, in one transaction."""
+    timestamp = datetime.utcnow().isoformat()
+    get_patient_repository().put_with_pointer(
+        {
+            "patientId": patient_id,
+            "SK": f"{XRAY_PREFIX}{timestamp}",
+            "recordType": "XRay",
+            "timestamp": timestamp,
+            "imageSetId": image_set_id,
+            "prediction": label,
+            "confidence": Decimal(str(confidence))
+        },
+        XRAY_LATEST_SK,
+    )
+
+def latest_xray_record(patient_id: str, projection: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+    """Pointer GetItem; patients classified before the pointer existed fall back to a Limit=1 descending query."""
+    repository = get_patient_repository()
+    item = repository.get(patient_id, XRAY_LATEST_SK, projection=projection)
+    if item:
+        return item
+    items = repository.query(
+        patient_id, sk_between=XRAY_HISTORY_RANGE, projection=projection, descending=True, limit=1
+    )
+    return items[0] if items else None
+
+def xray_history(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Drops the LATEST pointer from a list of `XRay#` records."""
+    return [it for it in items if it.get("SK") != XRAY_LATEST_SK]
@@ -0,0 +1,113 @@
+# app/services/xray_rendering.py
+import math
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from ..config import XRAY_DERIVATIVE_SIZES, XRAY_RENDER_WORKERS
+
+
+def parse_derivative_sizes(spec: str) -> Dict[str, int]:
+    """"thumbnail:256,preview:1024,full:0" -> {"thumbnail": 256, "preview": 1024, "full": 0}"""
+    sizes: Dict[str, int] = {}
+    for part in spec.split(","):
+        name, _, edge = part.strip().partition(":")
+        if name:
+            sizes[name.strip().lower()] = int(edge or 0)
+    return sizes
+
+
+DERIVATIVE_SIZES = parse_derivative_sizes(XRAY_DERIVATIVE_SIZES)
+render_executor = ThreadPoolExecutor(max_workers=XRAY_RENDER_WORKERS, thread_name_prefix="xray-render")
+
+
+def frame_pixels(frame: Image.Image) -> np.ndarray:
+    """Frame as a 2-D array in its native dtype (uint16 for most radiographs); colour frames go to luminance."""
+    if frame.mode not in {"L", "I;16", "I;16B", "I;16L", "I", "F"}:
+        frame = frame.convert("L")
+    return np.asarray(frame)
+
+
+# Rows window/levelled per step, so the float32 working copy stays small for full-size frames
+_WINDOW_ROWS = 256
+# Pixels sampled to estimate the automatic window
+_WINDOW_SAMPLE = 1 << 20
+
+
+def downscale(pixels: np.ndarray, max_edge: int) -> np.ndarray:
+    """Area-average by an integer factor so the longest edge is <= max_edge (0 = native); edges never drop below 1."""
+    h, w = pixels.shape
+    if not max_edge or max(h, w) <= max_edge:
+        return pixels
+    f = math.ceil(max(h, w) / max_edge)
+    fh, fw = min(f, h), min(f, w)  # a very elongated image can be shorter than the factor
+    h2, w2 = h // fh, w // fw
+    blocks = pixels[:h2 * fh, :w2 * fw].reshape(h2, fh, w2, fw)
+    return blocks.mean(axis=(1, 3), dtype=np.float32)
+
+
+def resolve_window(
+    pixels: np.ndarray,
+    center: Optional[float] = None,
+    width: Optional[float] = None,
+) -> Tuple[float, float]:
+    """(low, high) from the DICOM window, else the 0.5th-99.5th percentile of a strided sample."""
+    if center is None or width is None or width <= 0:
+        step = max(1, math.isqrt(pixels.size // _WINDOW_SAMPLE))
+        lo, hi = np.percentile(pixels[::step, ::step], (0.5, 99.5))
+    else:
+        lo, hi = center - width / 2.0, center + width / 2.0
+    if hi <= lo:
+        hi = lo + 1.0
+    return float(lo), float(hi)
+
+
+def window_level(
+    pixels: np.ndarray,
+    center: Optional[float] = None,
+    width: Optional[float] = None,
+) -> np.ndarray:
+    """
+    Map native intensities to 8-bit display values.
+    Without a DICOM window, the 0.5th-99.5th percentile range is used.
+    """
+    return apply_window(pixels, *resolve_window(pixels, center, width))
+
+
+def apply_window(pixels: np.ndarray, lo: float, hi: float) -> np.ndarray:
+    display = np.empty(pixels.shape, dtype=np.uint8)
+    scale = 255.0 / (hi - lo)
+    for r in range(0, pixels.shape[0], _WINDOW_ROWS):
+        scaled = (pixels[r:r + _WINDOW_ROWS].astype(np.float32) - lo) * scale
+        display[r:r + _WINDOW_ROWS] = np.clip(scaled, 0, 255)
+    return display
+
+
+def encode_jpeg(display: np.ndarray, quality: int = 90) -> bytes:
+    buffer = BytesIO()
+    Image.fromarray(display.astype(np.uint8, copy=False)).save(buffer, format="JPEG", quality=quality)
+    return buffer.getvalue()
+
+
+def render_derivative(pixels: np.ndarray, max_edge: int, window: Tuple[float, float]) -> bytes:
+    """Downscale in native bit depth first, then apply the (low, high) window and encode a grayscale JPEG."""
+    return encode_jpeg(apply_window(downscale(pixels, max_edge), *window))
+
+
+def render_derivatives(
+    frame: Image.Image,
+    sizes: Optional[Dict[str, int]] = None,
+    window: Tuple[Optional[float], Optional[float]] = (None, None),
+) -> Dict[str, bytes]:
+    """
+    Derivatives from one decoded frame, smallest first and one at a time, so only one
+    downscaled copy is alive at once. Every size shares one window, estimated once.
+    """
+    sizes = sizes or DERIVATIVE_SIZES
+    pixels = frame_pixels(frame)
+    lo_hi = resolve_window(pixels, *window)
+    ordered = sorted(sizes.items(), key=lambda kv: kv[1] or math.inf)
+    return {name: render_derivative(pixels, edge, lo_hi) for name, edge in ordered}
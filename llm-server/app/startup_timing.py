@@ -0,0 +1,32 @@
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+
+class StartupTimer:
+    """Records how long each startup phase (router imports, lifespan steps) took."""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.phases: List[Tuple[str, float]] = []
+
+    @contextmanager
+    def phase(self, name: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - t0))
+
+    def report(self) -> Dict[str, object]:
+        return {
+            "total_s": round(time.perf_counter() - self.started_at, 3),
+            "phases": [{"phase": name, "seconds": round(sec, 3)} for name, sec in self.phases],
+        }
+
+    def print_report(self) -> None:
+        report = self.report()
+        print(f"⏱️ Startup breakdown (total {report['total_s']:.3f}s):")
+        for name, sec in sorted(self.phases, key=lambda p: p[1], reverse=True):
+            print(f"   {sec:8.3f}s  {name}")
+
+startup_timer = StartupTimer()
@@ -1,27 +1,104 @@
-from langchain_redis import RedisVectorStore
-from langchain_redis.config import RedisConfig
-from redis import Redis
-from langchain_openai import OpenAIEmbeddings
+from app.config import (
+    LazyResource,
+    REDIS_URL,
+    PATIENT_INDEX_HNSW_M,
+    PATIENT_INDEX_HNSW_EF_CONSTRUCTION,
+    PATIENT_INDEX_HNSW_EF_RUNTIME,
+)
+from app.services.embedding_cache import CachedEmbeddings, build_embedding_store, build_query_embedding_store
 
 RAG_INDEX_NAME = "symptom_question_rag"
-embedding_model = OpenAIEmbeddings(model="text-embedding-3-small")
-
-config = RedisConfig(
-    index_name=RAG_INDEX_NAME,
-    dimensions=1536,
-    distance_metric="COSINE",
-    vector_index_type="FLAT",
-    vector_datatype="FLOAT32",
-    # make metadata filterable
-    metadata_schema=[
-        {"name": "symptom", "type": "tag"},
-        {"name": "section", "type": "tag"},
-    ],
-    key_prefix="doc"
+RAG_KEY_PREFIX = "doc"
+EMBEDDING_MODEL_NAME = "text-embedding-3-small"
+# Patient chat/exam chunks live in their own index so they never share a KNN scan with symptom questions
+PATIENT_INDEX_NAME = "patient_record_rag"
+PATIENT_KEY_PREFIX = "patientdoc"
+
+def _openai_embeddings():
+    from langchain_openai import OpenAIEmbeddings
+    return OpenAIEmbeddings(model=EMBEDDING_MODEL_NAME)
+
+_openai = LazyResource(_openai_embeddings)
+
+# Symptom-question embeddings are cached by content hash, so unchanged questions are never re-embedded;
+# query embeddings (retrieval, validation, H&P search) share one LRU/TTL cache.
+# The OpenAI client is only built on the first cache miss.
+embedding_model = CachedEmbeddings(
+    _openai,
+    store=build_embedding_store(EMBEDDING_MODEL_NAME),
+    query_store=build_query_embedding_store(EMBEDDING_MODEL_NAME),
 )
 
-vectorstore = RedisVectorStore(
-    redis_url="redis://localhost:6379",
-    config=config,
-    embeddings=embedding_model,
-)
\ No newline at end of file
+# Patient chunks are PHI and unbounded, so they never enter the persistent document cache;
+# their searches still share the query cache above
+patient_embedding_model = CachedEmbeddings(
+    _openai,
+    store=None,
+    query_cache=embedding_model.query_cache,
+    query_store=embedding_model.query_store,
+)
+
+def _redis_vectorstore():
+    from langchain_redis import RedisVectorStore
+    from langchain_redis.config import RedisConfig
+
+    config = RedisConfig(
+        index_name=RAG_INDEX_NAME,
+        dimensions=1536,
+        distance_metric="COSINE",
+        vector_index_type="FLAT",
+        vector_datatype="FLOAT32",
+        # make metadata filterable
+        metadata_schema=[
+            {"name": "symptom", "type": "tag"},
+            {"name": "section", "type": "tag"},
+        ],
+        key_prefix=RAG_KEY_PREFIX
+    )
+
+    return RedisVectorStore(
+        redis_url=REDIS_URL,
+        config=config,
+        embeddings=embedding_model,
+    )
+
+# Built (and langchain_redis imported) on first use
+vectorstore = LazyResource(_redis_vectorstore)
+
+def _patient_vectorstore():
+    from langchain_redis import RedisVectorStore
+    from langchain_redis.config import RedisConfig
+    from redisvl.schema import IndexSchema
+
+    # RedisConfig has no knobs for HNSW graph parameters, so the schema is spelled out
+    schema = IndexSchema.from_dict({
+        "index": {"name": PATIENT_INDEX_NAME, "prefix": PATIENT_KEY_PREFIX, "storage_type": "hash"},
+        "fields": [
+            {"name": "text", "type": "text"},
+            {
+                "name": "embedding",
+                "type": "vector",
+                "attrs": {
+                    "dims": 1536,
+                    "distance_metric": "cosine",
+                    "algorithm": "hnsw",
+                    "datatype": "float32",
+                    "m": PATIENT_INDEX_HNSW_M,
+                    "ef_construction": PATIENT_INDEX_HNSW_EF_CONSTRUCTION,
+                    "ef_runtime": PATIENT_INDEX_HNSW_EF_RUNTIME,
+                },
+            },
+            {"name": "patientId", "type": "tag"},
+            {"name": "section", "type": "tag"},
+            {"name": "sk", "type": "tag"},
+            {"name": "timestamp", "type": "numeric"},
+        ],
+    })
+
+    return RedisVectorStore(
+        redis_url=REDIS_URL,
+        config=RedisConfig(schema=schema),
+        embeddings=patient_embedding_model,
+    )
+
+patient_vectorstore = LazyResource(_patient_vectorstore)
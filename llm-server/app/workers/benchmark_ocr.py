@@ -0,0 +1,90 @@
+# app/workers/benchmark_ocr.py
+"""
+Offline OCR worker throughput: in-memory queue/bucket/table, real worker code, pluggable engine.
+
+    python -m app.workers.benchmark_ocr --engine fake --messages 200 --batch-latency 0.3
+    python -m app.workers.benchmark_ocr --engine tesseract --image note.jpg
+"""
+import argparse
+import asyncio
+import json
+import time
+from io import BytesIO
+
+from app.services.ocr_engines import FakeOcrEngine, build_ocr_engine
+from app.services.patient_record_repository import PatientRecordRepository
+from app.workers.ocr_worker import OcrSqsWorker
+
+
+class _Queue:
+    def __init__(self, keys):
+        self.visible = [
+            {"MessageId": str(i), "ReceiptHandle": str(i),
+             "Body": json.dumps({"Records": [{"s3": {"bucket": {"name": "bench"}, "object": {"key": k}}}]})}
+            for i, k in enumerate(keys)
+        ]
+
+    def receive_message(self, QueueUrl, MaxNumberOfMessages, WaitTimeSeconds, VisibilityTimeout):
+        batch, self.visible = self.visible[:MaxNumberOfMessages], self.visible[MaxNumberOfMessages:]
+        return {"Messages": batch}
+
+    def delete_message_batch(self, QueueUrl, Entries):
+        return {"Failed": []}
+
+
+class _Bucket:
+    def __init__(self, content: bytes):
+        self.content = content
+
+    def get_object(self, Bucket, Key):
+        return {"Body": BytesIO(self.content)}
+
+
+class _Table:
+    def batch_writer(self, overwrite_by_pkeys=None):
+        class Writer:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                pass
+
+            def put_item(self, Item):
+                pass
+
+        return Writer()
+
+
+async def run(args) -> None:
+    if args.engine == "fake":
+        engine = FakeOcrEngine(args.batch_latency, args.image_latency)
+    else:
+        engine = build_ocr_engine(args.engine)
+    content = open(args.image, "rb").read() if args.image else b"\0" * 50_000
+
+    sqs = _Queue([f"p{i % 20}/notes/{i}.jpg" for i in range(args.messages)])
+    worker = OcrSqsWorker(sqs, _Bucket(content), PatientRecordRepository(_Table()), engine, queue_url="bench", wait_time_seconds=0)
+
+    start = time.perf_counter()
+    while sqs.visible:
+        await worker.poll_once()
+    elapsed = time.perf_counter() - start
+
+    stats = worker.stats()
+    print(f"engine={engine.name} messages={args.messages} saved={stats['processed']} "
+          f"engine_calls={stats['engine_calls']} elapsed={elapsed:.2f}s "
+          f"throughput={stats['processed'] / elapsed:.1f} notes/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the OCR SQS worker offline")
+    parser.add_argument("--engine", default="fake", choices=["fake", "tesseract", "vision"])
+    parser.add_argument("--messages", type=int, default=100)
+    parser.add_argument("--image", help="image file used for every message (default: 50 KB of zeros)")
+    parser.add_argument("--batch-latency", type=float, default=0.2, help="fake engine: seconds per call")
+    parser.add_argument("--image-latency", type=float, default=0.01, help="fake engine: seconds per image")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
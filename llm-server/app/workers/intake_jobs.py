@@ -0,0 +1,19 @@
+# app/workers/intake_jobs.py
+from typing import Any, Dict
+
+from ..services.job_queue import register_job_handler
+
+FINALIZE_INTAKE = "intake.finalize"
+
+
+async def finalize_intake(payload: Dict[str, Any]) -> None:
+    """Structured extraction of the intake Q&A (LLM) followed by the ChatHistory write."""
+    from ..prompts.symptom_qs_prompt import run_langchain_extraction
+    from ..services.dynamodb_services import asave_chat_history_to_dynamodb
+
+    extracted = await run_langchain_extraction(payload["qas"])
+    await asave_chat_history_to_dynamodb(payload["patient_id"], payload["session_id"], extracted)
+    print(f"✅ Saved intake history for session {payload['session_id']}")
+
+
+register_job_handler(FINALIZE_INTAKE, finalize_intake)
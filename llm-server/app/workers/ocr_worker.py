@@ -0,0 +1,190 @@
+# app/workers/ocr_worker.py
+import asyncio
+import json
+from typing import Any, Dict, List, Optional, Set
+
+from ..config import OCR_UPLOAD_QUEUE_URL
+from ..services.ocr_engines import OcrEngine
+from ..services.ocr_services import (
+    s3_objects_from_event,
+    patient_id_from_key,
+    ocr_note_item,
+)
+
+SQS_MAX_BATCH = 10
+
+
+class OcrSqsWorker:
+    """
+    Long-running consumer for the handwritten-note upload queue.
+    Each poll receives up to 10 messages, downloads their images in parallel, sends them to
+    the engine in batches of `engine.max_batch_size`, writes every note with one BatchWriteItem pass,
+    and deletes the messages whose images were all processed.
+    """
+
+    def __init__(
+        self,
+        sqs_client,
+        s3_client,
+        repository,
+        engine: OcrEngine,
+        queue_url: str = OCR_UPLOAD_QUEUE_URL,
+        visibility_timeout: int = 120,
+        wait_time_seconds: int = 20,
+    ):
+        self.sqs = sqs_client
+        self.s3 = s3_client
+        self.repository = repository
+        self.engine = engine
+        self.queue_url = queue_url
+        self.visibility_timeout = visibility_timeout
+        self.wait_time_seconds = wait_time_seconds
+        self._stopping = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.processed = 0
+        self.failed = 0
+        self.skipped = 0
+        self.unmatched = 0
+        self.engine_calls = 0
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._stopping.clear()
+            self._task = asyncio.create_task(self.run(), name="ocr-sqs-worker")
+
+    async def stop(self) -> None:
+        self._stopping.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+
+    async def run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                await self.poll_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️ OCR worker poll failed: {e}")
+                await asyncio.sleep(1)
+
+    async def poll_once(self, wait_time_seconds: Optional[int] = None) -> int:
+        """Receive and fully process one batch. Returns the number of notes saved."""
+        resp = await asyncio.to_thread(
+            self.sqs.receive_message,
+            QueueUrl=self.queue_url,
+            MaxNumberOfMessages=SQS_MAX_BATCH,
+            WaitTimeSeconds=self.wait_time_seconds if wait_time_seconds is None else wait_time_seconds,
+            VisibilityTimeout=self.visibility_timeout,
+        )
+        messages = resp.get("Messages", [])
+        if not messages:
+            return 0
+
+        # (message index, bucket, key, eTag, patient_id) for every image in the batch
+        jobs = []
+        failed: Set[int] = set()
+        for i, msg in enumerate(messages):
+            try:
+                objects = s3_objects_from_event(json.loads(msg["Body"]))
+            except (ValueError, KeyError, TypeError):
+                objects = []
+            if not objects:
+                self.skipped += 1
+                print(f"❌ Message {msg.get('MessageId')} is not a valid S3 event. Skipping...")
+            for bucket, key, etag in objects:
+                patient_id = patient_id_from_key(key)
+                if patient_id is None:
+                    # Not deleted: after maxReceiveCount the queue's redrive policy moves it to the DLQ
+                    self.unmatched += 1
+                    failed.add(i)
+                    print(f"❌ Cannot tell the patient for {bucket}/{key}; leaving it for the dead-letter queue")
+                    continue
+                jobs.append((i, bucket, key, etag, patient_id))
+
+        contents = await asyncio.gather(
+            *(asyncio.to_thread(self._download, bucket, key) for _, bucket, key, _, _ in jobs),
+            return_exceptions=True,
+        )
+        ready = []
+        for job, content in zip(jobs, contents):
+            if isinstance(content, Exception):
+                print(f"⚠️ Could not download {job[1]}/{job[2]}: {content}")
+                failed.add(job[0])
+            else:
+                ready.append((job, content))
+
+        texts = await self._annotate([content for _, content in ready])
+        items: List[Dict[str, Any]] = []
+        for (job, _), text in zip(ready, texts):
+            if text is None:
+                failed.add(job[0])
+                continue
+            i, bucket, key, etag, patient_id = job
+            items.append(ocr_note_item(patient_id, bucket, key, etag, text, self.engine.name))
+
+        if items:
+            try:
+                await self.repository.aput_many(items)
+            except Exception as e:
+                print(f"⚠️ Could not save OCR notes, leaving the batch for redelivery: {e}")
+                self.failed += len(jobs)
+                return 0
+
+        self.processed += len(items)
+        self.failed += len(jobs) - len(items)
+        if items:
+            print(f"📝 Saved {len(items)} OCR note(s) from {len(messages)} message(s)")
+
+        done = [m for i, m in enumerate(messages) if i not in failed]
+        if done:
+            await self._delete_batch(done)
+        return len(items)
+
+    def _download(self, bucket: str, key: str) -> bytes:
+        return self.s3.get_object(Bucket=bucket, Key=key)["Body"].read()
+
+    async def _annotate(self, images: List[bytes]) -> List[Optional[str]]:
+        """Engine calls for every chunk run concurrently; a failed call fails only its own chunk."""
+        size = max(1, self.engine.max_batch_size)
+        chunks = [images[i:i + size] for i in range(0, len(images), size)]
+        results = await asyncio.gather(
+            *(asyncio.to_thread(self.engine.annotate, chunk) for chunk in chunks),
+            return_exceptions=True,
+        )
+        self.engine_calls += len(chunks)
+        texts: List[Optional[str]] = []
+        for chunk, result in zip(chunks, results):
+            if isinstance(result, Exception):
+                print(f"⚠️ OCR engine call failed: {result}")
+                result = [None] * len(chunk)
+            texts.extend(result)
+        return texts
+
+    async def _delete_batch(self, messages: List[Dict[str, Any]]) -> None:
+        entries = [{"Id": str(n), "ReceiptHandle": m["ReceiptHandle"]} for n, m in enumerate(messages)]
+        resp = await asyncio.to_thread(self.sqs.delete_message_batch, QueueUrl=self.queue_url, Entries=entries)
+        for failure in resp.get("Failed", []):
+            print(f"⚠️ Failed to delete message {failure.get('Id')}: {failure.get('Message')}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "engine": self.engine.name,
+            "processed": self.processed,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "unmatched": self.unmatched,
+            "engine_calls": self.engine_calls,
+        }
+
+
+_worker: Optional[OcrSqsWorker] = None
+
+def get_ocr_worker() -> OcrSqsWorker:
+    global _worker
+    if _worker is None:
+        from ..config import sqs, s3
+        from ..services.ocr_engines import build_ocr_engine
+        from ..services.patient_record_repository import get_patient_repository
+        _worker = OcrSqsWorker(sqs, s3, get_patient_repository(), build_ocr_engine())
+    return _worker
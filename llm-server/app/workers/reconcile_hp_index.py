@@ -0,0 +1,32 @@
+# app/workers/reconcile_hp_index.py
+"""
+Remove orphaned and duplicate patient-record chunks from the Redis vector index.
+
+    python -m app.workers.reconcile_hp_index [--dry-run] [--purge-shared-index]
+"""
+import argparse
+import json
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Reconcile H&P chunks in the Redis vector index")
+    parser.add_argument("--dry-run", action="store_true", help="report what would change without deleting")
+    parser.add_argument(
+        "--purge-shared-index", action="store_true",
+        help="also delete patient chunks left in the symptom-question index from before the patient index existed",
+    )
+    args = parser.parse_args()
+
+    from app.redis_config import r
+    from app.vectorstore_config import RAG_KEY_PREFIX, PATIENT_KEY_PREFIX
+    from app.services.patient_record_repository import get_patient_repository
+    from app.services.hp_index_maintenance import live_record_sks, reconcile_patient_chunks, purge_patient_chunks
+
+    report = reconcile_patient_chunks(r, PATIENT_KEY_PREFIX, lambda p: live_record_sks(get_patient_repository(), p), dry_run=args.dry_run)
+    if args.purge_shared_index:
+        report["purged_from_shared_index"] = purge_patient_chunks(r, RAG_KEY_PREFIX, dry_run=args.dry_run)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+# app/workers/xray_sqs_worker.py
+import asyncio
+import json
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from ..config import (
+    DICOM_IMPORT_QUEUE_URL,
+    XRAY_WORKER_CONCURRENCY,
+    XRAY_SQS_VISIBILITY_TIMEOUT,
+)
+
+# Called with the decoded message body; returns a result dict. Raising leaves the message on the queue.
+MessageHandler = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+SQS_MAX_BATCH = 10
+
+
+class SkipMessage(Exception):
+    """Raised by a handler for messages that can never succeed; the message is deleted, not retried."""
+
+
+async def classify_image_set_message(body: Dict[str, Any]) -> Dict[str, Any]:
+    """Default handler: metadata + frame fetch/decode in a thread, shared micro-batched inference, DynamoDB write."""
+    from ..services.xray_classification_service import fetch_first_frame_image, save_xray_result
+    from ..models.xray_inference import get_inference_engine
+
+    image_set_id = body.get("imageSetId")
+    if not image_set_id:
+        raise SkipMessage("Message missing imageSetId")
+
+    patient_id, image = await asyncio.to_thread(fetch_first_frame_image, image_set_id)
+    if image is None:
+        raise SkipMessage(f"No frame ID found in metadata for {image_set_id}")
+
+    label, confidence = await get_inference_engine().apredict(image)
+    await asyncio.to_thread(save_xray_result, patient_id, image_set_id, label, confidence)
+    return {"patientId": patient_id, "imageSetId": image_set_id, "prediction": label, "confidence": confidence}
+
+
+class XRaySqsWorker:
+    """
+    Long-running consumer for the DICOM import queue.
+    Long-polls up to 10 messages at a time, processes up to `concurrency` messages at once,
+    extends the visibility timeout of every message until it is deleted or has failed, and
+    deletes each received batch's successes with one delete_message_batch call.
+    """
+
+    def __init__(
+        self,
+        sqs_client,
+        queue_url: str = DICOM_IMPORT_QUEUE_URL,
+        handler: MessageHandler = classify_image_set_message,
+        concurrency: int = XRAY_WORKER_CONCURRENCY,
+        visibility_timeout: int = XRAY_SQS_VISIBILITY_TIMEOUT,
+        wait_time_seconds: int = 20,
+    ):
+        self.sqs = sqs_client
+        self.queue_url = queue_url
+        self.handler = handler
+        self.concurrency = max(1, concurrency)
+        self.visibility_timeout = visibility_timeout
+        self.wait_time_seconds = wait_time_seconds
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self._stopping = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._batches: set[asyncio.Task] = set()
+        self.processed = 0
+        self.failed = 0
+        self.skipped = 0
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._stopping.clear()
+            self._task = asyncio.create_task(self.run(), name="xray-sqs-worker")
+
+    async def stop(self) -> None:
+        self._stopping.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+
+    async def run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                await self.poll_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️ X-ray worker poll failed: {e}")
+                await asyncio.sleep(1)
+        if self._batches:
+            await asyncio.gather(*self._batches, return_exceptions=True)
+
+    async def poll_once(self) -> int:
+        """Receive one batch (sized to free capacity) and start processing it. Returns messages received."""
+        # Wait for at least one free slot, then take every slot that is free right now
+        await self._slots.acquire()
+        reserved = 1
+        while reserved < SQS_MAX_BATCH and not self._slots.locked():
+            await self._slots.acquire()
+            reserved += 1
+
+        try:
+            resp = await asyncio.to_thread(
+                self.sqs.receive_message,
+                QueueUrl=self.queue_url,
+                MaxNumberOfMessages=reserved,
+                WaitTimeSeconds=self.wait_time_seconds,
+                VisibilityTimeout=self.visibility_timeout,
+            )
+        except BaseException:
+            for _ in range(reserved):
+                self._slots.release()
+            raise
+
+        messages = resp.get("Messages", [])
+        for _ in range(reserved - len(messages)):
+            self._slots.release()
+        if messages:
+            task = asyncio.create_task(self._handle_batch(messages))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+        return len(messages)
+
+    async def drain(self) -> None:
+        """Wait for every batch started so far (used by tests and shutdown)."""
+        while self._batches:
+            await asyncio.gather(*list(self._batches), return_exceptions=True)
+
+    async def _handle_batch(self, messages: List[Dict[str, Any]]) -> None:
+        # Heartbeats outlive the handler: a finished message waits for the batch delete, and must
+        # not become visible (and be classified again) while a slower sibling is still running
+        heartbeats = [asyncio.create_task(self._keep_invisible(m["ReceiptHandle"])) for m in messages]
+        try:
+            outcomes = await asyncio.gather(*(self._handle_message(m, hb) for m, hb in zip(messages, heartbeats)))
+            done = [m for m, ok in zip(messages, outcomes) if ok]
+            if done:
+                await self._delete_batch(done)
+        finally:
+            for hb in heartbeats:
+                hb.cancel()
+
+    async def _handle_message(self, msg: Dict[str, Any], heartbeat: asyncio.Task) -> bool:
+        """Returns True if the message should be deleted."""
+        try:
+            result = await self.handler(json.loads(msg["Body"]))
+            self.processed += 1
+            print(f"✅ Classified {result.get('imageSetId')}: {result.get('prediction')} ({result.get('confidence')})")
+            return True
+        except SkipMessage as e:
+            self.skipped += 1
+            print(f"❌ {e}. Skipping...")
+            return True
+        except Exception as e:
+            self.failed += 1
+            print(f"⚠️ X-ray message {msg.get('MessageId')} failed, leaving it for redelivery: {e}")
+            heartbeat.cancel()  # let it become visible again on schedule
+            return False
+        finally:
+            self._slots.release()
+
+    async def _keep_invisible(self, receipt_handle: str) -> None:
+        """Push the visibility timeout out while a slow item is still being processed."""
+        interval = max(1.0, self.visibility_timeout / 2)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(
+                    self.sqs.change_message_visibility,
+                    QueueUrl=self.queue_url,
+                    ReceiptHandle=receipt_handle,
+                    VisibilityTimeout=self.visibility_timeout,
+                )
+            except Exception as e:
+                print(f"⚠️ Could not extend message visibility: {e}")
+                return
+
+    async def _delete_batch(self, messages: List[Dict[str, Any]]) -> None:
+        for i in range(0, len(messages), SQS_MAX_BATCH):
+            entries = [
+                {"Id": str(n), "ReceiptHandle": m["ReceiptHandle"]}
+                for n, m in enumerate(messages[i:i + SQS_MAX_BATCH])
+            ]
+            resp = await asyncio.to_thread(self.sqs.delete_message_batch, QueueUrl=self.queue_url, Entries=entries)
+            for failure in resp.get("Failed", []):
+                print(f"⚠️ Failed to delete message {failure.get('Id')}: {failure.get('Message')}")
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "processed": self.processed,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "in_flight_batches": len(self._batches),
+        }
+
+
+_worker: Optional[XRaySqsWorker] = None
+
+def get_xray_worker() -> XRaySqsWorker:
+    global _worker
+    if _worker is None:
+        from ..config import sqs
+        _worker = XRaySqsWorker(sqs)
+    return _worker
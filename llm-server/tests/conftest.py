@@ -0,0 +1,40 @@
+import json
+import threading
+
+
+class FakeSqs:
+    """In-memory stand-in for the boto3 SQS client calls the worker uses."""
+
+    def __init__(self, bodies):
+        self._lock = threading.Lock()
+        self.visible = [
+            {"MessageId": str(i), "ReceiptHandle": f"rh-{i}", "Body": json.dumps(b)}
+            for i, b in enumerate(bodies)
+        ]
+        self.in_flight = {}
+        self.deleted = []
+        self.receive_sizes = []
+        self.delete_batch_sizes = []
+        self.visibility_extensions = 0
+        self.extended = []
+
+    def receive_message(self, QueueUrl, MaxNumberOfMessages, WaitTimeSeconds, VisibilityTimeout):
+        assert MaxNumberOfMessages <= 10
+        with self._lock:
+            self.receive_sizes.append(MaxNumberOfMessages)
+            batch, self.visible = self.visible[:MaxNumberOfMessages], self.visible[MaxNumberOfMessages:]
+            for m in batch:
+                self.in_flight[m["ReceiptHandle"]] = m
+        return {"Messages": batch} if batch else {}
+
+    def delete_message_batch(self, QueueUrl, Entries):
+        assert len(Entries) <= 10
+        with self._lock:
+            self.delete_batch_sizes.append(len(Entries))
+            for e in Entries:
+                self.deleted.append(self.in_flight.pop(e["ReceiptHandle"]))
+        return {"Successful": [{"Id": e["Id"]} for e in Entries], "Failed": []}
+
+    def change_message_visibility(self, QueueUrl, ReceiptHandle, VisibilityTimeout):
+        self.visibility_extensions += 1
+        self.extended.append(ReceiptHandle)
@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+import app.routes.analyze_lab_reports as route
+
+
+async def xray_items(patient_id):
+    return [{"SK": "XRay#2025-01-01", "prediction": "Normal", "confidence": 0.9}]
+
+
+async def lab_report(patient_id, encounter_id):
+    return "lab.pdf", "Hemoglobin 11.2 g/dL 13.5 - 17.5", []
+
+
+async def hp_summary(patient_id):
+    return "Cough for 3 days."
+
+
+async def failing(*args):
+    raise RuntimeError("source unavailable")
+
+
+async def hanging(*args):
+    await asyncio.sleep(5)
+
+
+@pytest.fixture
+def branches(monkeypatch):
+    seen = {}
+
+    async def summarize(patient_id, encounter_id, hp, xray_text, lab_context):
+        seen.update(hp=hp, xray_text=xray_text, lab_context=lab_context)
+        return "summary"
+
+    monkeypatch.setattr(route, "_query_xray_items", xray_items)
+    monkeypatch.setattr(route, "_fetch_lab_report", lab_report)
+    monkeypatch.setattr(route, "abuild_hp_summary_for_patient", hp_summary)
+    monkeypatch.setattr(route, "_format_xray_items", lambda items: "X-ray: Normal")
+    monkeypatch.setattr(route, "_asummarize_doctor_style", summarize)
+    return seen
+
+
+@pytest.mark.asyncio
+async def test_one_failing_branch_is_reported_and_left_out(branches, monkeypatch):
+    monkeypatch.setattr(route, "_query_xray_items", failing)
+
+    result = await route.analyze_lab_reports("p1")
+
+    assert result["partial_errors"] == {"xray": "source unavailable"}
+    assert result["xray_items_count"] == 0 and result["hp_summary_included"]
+    assert branches["xray_text"] == "X-ray results unavailable."
+    assert branches["hp"] == "Cough for 3 days." and "Hemoglobin" in branches["lab_context"]
+
+
+@pytest.mark.asyncio
+async def test_slow_branch_times_out_without_holding_the_rest(branches, monkeypatch):
+    monkeypatch.setattr(route, "abuild_hp_summary_for_patient", hanging)
+    monkeypatch.setitem(route.BRANCH_TIMEOUTS, "hp_summary", 0.05)
+
+    result = await asyncio.wait_for(route.analyze_lab_reports("p1"), timeout=1)
+
+    assert result["partial_errors"]["hp_summary"].startswith("timed out")
+    assert not result["hp_summary_included"]
+    assert branches["hp"] == "H&P summary unavailable."
+    assert result["xray_items_count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_all_branches_failing_is_a_502(branches, monkeypatch):
+    monkeypatch.setattr(route, "_query_xray_items", failing)
+    monkeypatch.setattr(route, "_fetch_lab_report", failing)
+    monkeypatch.setattr(route, "abuild_hp_summary_for_patient", hanging)
+    monkeypatch.setitem(route.BRANCH_TIMEOUTS, "hp_summary", 0.05)
+
+    with pytest.raises(route.HTTPException) as exc:
+        await route.analyze_lab_reports("p1")
+    assert exc.value.status_code == 502
+    assert branches == {}
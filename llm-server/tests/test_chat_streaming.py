@@ -0,0 +1,149 @@
+import sys
+import types
+
+import pytest
+
+import app.routes.chat_routes as chat
+from app.services.session_store import InMemorySessionStore, IntakeSession, set_session_store
+
+
+class FakeChunk:
+    def __init__(self, content):
+        self.content = content
+
+
+class FakeChain:
+    async def astream(self, payload):
+        for token in ["Do you", " have a", " fever?"]:
+            yield FakeChunk(token)
+
+
+async def body_of(response):
+    return "".join([chunk async for chunk in response.body_iterator])
+
+
+@pytest.fixture
+def store(monkeypatch):
+    monkeypatch.setitem(sys.modules, "app.services.rag_chain", types.SimpleNamespace(rag_chain=FakeChain()))
+    s = InMemorySessionStore()
+    set_session_store(s)
+    yield s
+    set_session_store(None)
+
+
+def test_sse_event_splits_lines():
+    assert chat._sse_event("a\nb") == "data: a\ndata: b\n\n"
+
+
+@pytest.mark.asyncio
+async def test_generated_question_streams_tokens_and_is_recorded(store):
+    session = IntakeSession(session_id="s1", symptom="cough", qas={sec: [] for sec in chat.SECTION_ORDER})
+    await store.save(session)
+    session = await store.load("s1")
+
+    session.qas["HPI"].append({"q": "How long?", "a": "3 days"})
+    response = await chat.stream_generated_question(session, "PMH")
+    pending = await store.load("s1")
+    assert pending.qas["HPI"] == [{"q": "How long?", "a": "3 days"}]  # answer saved before streaming
+    assert pending.last_doc_meta["question_text"] == ""
+
+    body = await body_of(response)
+
+    assert body == "data: Do you\n\ndata:  have a\n\ndata:  fever?\n\n"
+    saved = await store.load("s1")
+    assert saved.last_doc_meta["question_text"] == "Do you have a fever?"
+    assert saved.current_section == "PMH"
+
+
+@pytest.mark.asyncio
+async def test_finish_queues_finalization_once(store):
+    from app.services.job_queue import InMemoryJobBackend, JobQueue, set_job_queue
+    queue = JobQueue(InMemoryJobBackend())
+    set_job_queue(queue)
+    try:
+        session = IntakeSession(session_id="s2", symptom="cough")
+        await store.save(session)
+
+        response = await chat._finish(await store.load("s2"), "p1")
+        await chat._finish(session, "p1")  # a retried final turn
+
+        assert await body_of(response) == f"data: {chat.COMPLETION_MESSAGE}\n\n"
+        assert await store.load("s2") is None
+        assert queue.enqueued == 1 and queue.duplicates == 1
+        job = await queue.backend.get(timeout=0.1)
+        assert job.kind == "intake.finalize" and job.payload["patient_id"] == "p1"
+    finally:
+        set_job_queue(None)
+
+
+@pytest.mark.asyncio
+async def test_reused_session_id_still_queues_each_intake(store):
+    from app.services.job_queue import InMemoryJobBackend, JobQueue, set_job_queue
+    queue = JobQueue(InMemoryJobBackend())
+    set_job_queue(queue)
+    try:
+        for patient in ("p1", "p2"):
+            await chat._finish(IntakeSession(session_id="default-session", symptom="cough"), patient)
+        assert queue.enqueued == 2 and queue.duplicates == 0
+    finally:
+        set_job_queue(None)
+
+
+@pytest.mark.asyncio
+async def test_failed_enqueue_keeps_the_session(store):
+    from app.services.job_queue import set_job_queue
+
+    class BrokenQueue:
+        async def enqueue(self, *args, **kwargs):
+            raise ConnectionError("redis down")
+
+    set_job_queue(BrokenQueue())
+    try:
+        session = IntakeSession(session_id="s3", symptom="cough")
+        await store.save(session)
+        with pytest.raises(chat.HTTPException) as exc:
+            await chat._finish(session, "p1")
+        assert exc.value.status_code == 503
+        assert await store.load("s3") is not None
+    finally:
+        set_job_queue(None)
+
+
+@pytest.mark.asyncio
+async def test_resend_after_failed_put_queues_the_intake(store):
+    from app.services.job_queue import InMemoryJobBackend, JobQueue, set_job_queue
+
+    class FlakyBackend(InMemoryJobBackend):
+        failed = False
+
+        async def put(self, job):
+            if not self.failed:
+                self.failed = True
+                raise ConnectionError("XADD failed")
+            await super().put(job)
+
+    queue = JobQueue(FlakyBackend())
+    set_job_queue(queue)
+    try:
+        session = IntakeSession(session_id="s5", symptom="cough")
+        await store.save(session)
+        with pytest.raises(chat.HTTPException):
+            await chat._finish(await store.load("s5"), "p1")
+
+        await chat._finish(await store.load("s5"), "p1")  # the user resends
+        assert queue.enqueued == 1 and await queue.backend.depth() == 1
+        assert await store.load("s5") is None
+    finally:
+        set_job_queue(None)
+
+
+@pytest.mark.asyncio
+async def test_generated_question_rejects_stale_turn_before_streaming(store):
+    session = IntakeSession(session_id="s4", symptom="cough", qas={sec: [] for sec in chat.SECTION_ORDER})
+    await store.save(session)
+    stale = await store.load("s4")
+    await store.save(await store.load("s4"))  # a concurrent turn won
+
+    with pytest.raises(chat.HTTPException) as exc:
+        await chat.stream_generated_question(stale, "PMH")
+    assert exc.value.status_code == 409
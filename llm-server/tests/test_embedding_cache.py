@@ -0,0 +1,65 @@
+from typing import List
+from langchain_core.embeddings import Embeddings
+from app.services.embedding_cache import CachedEmbeddings, LocalEmbeddingStore, QueryEmbeddingCache
+
+class CountingEmbeddings(Embeddings):
+    def __init__(self):
+        self.calls: List[List[str]] = []
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.calls.append(list(texts))
+        return [[float(len(t)), 1.0] for t in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return [float(len(text)), 1.0]
+
+def test_cached_embeddings_only_embeds_misses_in_batches(tmp_path):
+    path = str(tmp_path / "emb.npz")
+    underlying = CountingEmbeddings()
+    cached = CachedEmbeddings(underlying, LocalEmbeddingStore(path), batch_size=2)
+
+    vectors = cached.embed_documents(["a", "bb", "ccc"])
+    assert vectors == [[1.0, 1.0], [2.0, 1.0], [3.0, 1.0]]
+    assert underlying.calls == [["a", "bb"], ["ccc"]]
+
+    # A fresh process with the same cache file makes no embedding calls for known texts
+    underlying = CountingEmbeddings()
+    cached = CachedEmbeddings(underlying, LocalEmbeddingStore(path), batch_size=2)
+    assert cached.embed_documents(["ccc", "a", "dddd"])[2] == [4.0, 1.0]
+    assert underlying.calls == [["dddd"]]
+
+def test_query_embeddings_are_cached_by_normalized_text():
+    underlying = CountingEmbeddings()
+    cached = CachedEmbeddings(underlying, store=None, query_cache=QueryEmbeddingCache(max_size=2, ttl_seconds=60))
+
+    assert cached.embed_query("No") == cached.embed_query("  no ") == [2.0, 1.0]
+    assert cached.stats()["query_embedding_calls"] == 1
+    assert cached.stats()["query_hits"] == 1
+
+    cached.embed_query("yes")
+    cached.embed_query("2 days")
+    cached.embed_query("no")  # evicted by the LRU bound
+    assert cached.stats()["query_embedding_calls"] == 4
+
+def test_query_cache_entries_expire():
+    cache = QueryEmbeddingCache(max_size=10, ttl_seconds=0)
+    cache.put("no", [1.0])
+    assert cache.get("no") is None
+
+
+def test_patient_chunks_bypass_the_document_cache():
+    from app.vectorstore_config import embedding_model, patient_embedding_model
+    assert patient_embedding_model.store is None
+    assert patient_embedding_model.query_cache is embedding_model.query_cache
+
+def test_concurrent_local_writers_leave_one_complete_file(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+    path = str(tmp_path / "emb.npz")
+    # Separate instances, like uvicorn workers running the startup sync together
+    stores = [LocalEmbeddingStore(path) for _ in range(8)]
+
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda i: stores[i].set_many({f"k{i}": [float(i)] * 64}), range(8)))
+
+    assert [p.name for p in tmp_path.iterdir()] == ["emb.npz"]
+    assert len(LocalEmbeddingStore(path).get_many([f"k{i}" for i in range(8)])) >= 1
@@ -0,0 +1,95 @@
+import fnmatch
+
+from app.services.embedding_cache import content_hash
+from app.services.hp_index_maintenance import index_size_by_patient, reconcile_patient_chunks
+from app.services.hp_summary_service import _chunks_with_ids
+
+
+class FakeRedis:
+    """Just the hash/scan/pipeline calls the maintenance job uses."""
+
+    def __init__(self, hashes):
+        self.hashes = hashes
+
+    def scan_iter(self, match, count):
+        return [k.encode() for k in list(self.hashes) if fnmatch.fnmatchcase(k, match)]
+
+    def pipeline(self, transaction=False):
+        redis, ops = self, []
+
+        class Pipe:
+            def hget(self, key, field):
+                ops.append(lambda: redis.hashes.get(key, {}).get(field))
+
+            def delete(self, key):
+                ops.append(lambda: redis.hashes.pop(key, None))
+
+            def rename(self, old, new):
+                ops.append(lambda: redis.hashes.__setitem__(new, redis.hashes.pop(old)))
+
+            def execute(self):
+                return [op() for op in ops]
+
+        return Pipe()
+
+
+def test_chunk_ids_are_content_digests():
+    items = [{"SK": "ChatHistory#1", "role": "user", "message": "cough"}]
+    _, ids = _chunks_with_ids("p1", items, [])
+    _, again = _chunks_with_ids("p1", items, [])
+    assert ids == again
+    assert ids[0].startswith("p1:chat:ChatHistory#1:") and len(ids[0].rsplit(":", 1)[1]) == 32
+
+
+def test_reconcile_removes_orphans_and_duplicates():
+    text = "[Chat | t | user]\ncough"
+    canonical = f"doc:p1:chat:ChatHistory#1:{content_hash(text)}"
+    redis = FakeRedis({
+        canonical: {"text": text.encode()},
+        "doc:p1:chat:ChatHistory#1:123456789": {"text": text.encode()},   # legacy hash() duplicate
+        "doc:p1:pexam:PExamResults#9:987654321": {"text": b"old exam"},  # record since deleted
+        "doc:p2:chat:ChatHistory#5:555": {"text": b"hello"},             # lone legacy ID
+        "doc:fever::HPI::abc": {"text": b"question"},                    # symptom question, untouched
+    })
+    live = {"p1": {"ChatHistory#1"}, "p2": {"ChatHistory#5"}}
+
+    report = reconcile_patient_chunks(redis, "doc", lambda p: live[p])
+
+    assert report["orphans"] == 1 and report["duplicates"] == 1 and report["renamed"] == 1
+    assert sorted(redis.hashes) == sorted([
+        canonical,
+        f"doc:p2:chat:ChatHistory#5:{content_hash('hello')}",
+        "doc:fever::HPI::abc",
+    ])
+    assert index_size_by_patient(redis, "doc") == {"p1": 1, "p2": 1}
+
+
+def test_dry_run_changes_nothing():
+    redis = FakeRedis({"doc:p1:chat:ChatHistory#1:1": {"text": b"x"}})
+    report = reconcile_patient_chunks(redis, "doc", lambda p: set(), dry_run=True)
+    assert report["orphans"] == 1
+    assert list(redis.hashes) == ["doc:p1:chat:ChatHistory#1:1"]
+
+
+def test_purge_only_touches_patient_chunks():
+    from app.services.hp_index_maintenance import purge_patient_chunks
+    redis = FakeRedis({
+        "doc:p1:chat:ChatHistory#1:1": {"text": b"x"},
+        "doc:fever::HPI::abc": {"text": b"question"},
+    })
+    assert purge_patient_chunks(redis, "doc") == 1
+    assert list(redis.hashes) == ["doc:fever::HPI::abc"]
+
+
+def test_chunk_deleted_after_the_scan_is_skipped():
+    class RacingRedis(FakeRedis):
+        def scan_iter(self, match, count):
+            keys = super().scan_iter(match, count)
+            self.hashes.pop("doc:p1:chat:ChatHistory#1:123", None)  # deleted by a concurrent write
+            return keys
+
+    redis = RacingRedis({"doc:p1:chat:ChatHistory#1:123": {"text": b"x"}})
+    report = reconcile_patient_chunks(redis, "doc", lambda p: {"ChatHistory#1"})
+
+    assert report["vanished"] == 1 and report["renamed"] == 0
+    assert redis.hashes == {}
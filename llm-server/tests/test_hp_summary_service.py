@@ -0,0 +1,136 @@
+import pytest
+
+import app.services.hp_summary_service as hp
+from app.services.patient_record_repository import PatientRecordRepository, set_patient_repository
+from app.services.hp_summary_store import InMemoryHpSummaryStore, set_hp_summary_store
+
+
+class FakeTable:
+    """Answers the single partition query the patient timeline makes."""
+
+    def __init__(self, items):
+        self.items = items
+        self.queries = 0
+
+    def query(self, KeyConditionExpression, ScanIndexForward, **kwargs):
+        self.queries += 1
+        return {"Items": list(self.items)}
+
+
+class FakeVectorstore:
+    def __init__(self):
+        self.docs = {}
+        self.added = 0
+
+    async def aadd_documents(self, documents, ids):
+        self.added += len(documents)
+        self.docs.update(zip(ids, documents))
+
+    async def adelete(self, ids):
+        for i in ids:
+            self.docs.pop(i, None)
+
+    async def asimilarity_search(self, query, k, filter):
+        return list(self.docs.values())[:k]
+
+
+@pytest.fixture
+def env(monkeypatch):
+    table = FakeTable([
+        {"SK": "ChatHistory#f3c9a1", "timestamp": "2025-01-01T10:00:00", "role": "user", "message": "cough for 3 days"},
+        {"SK": "PExamResults#f3c9a1", "timestamp": "2025-01-01T10:30:00", "vitals": "T 38.1"},
+    ])
+    vs = FakeVectorstore()
+    calls = []
+
+    async def fake_summarize(context):
+        calls.append(context)
+        return f"summary {len(calls)}"
+
+    set_patient_repository(PatientRecordRepository(table=table, max_workers=1))
+    monkeypatch.setattr(hp, "vectorstore", vs)
+    monkeypatch.setattr(hp, "_asummarize", fake_summarize)
+    set_hp_summary_store(InMemoryHpSummaryStore())
+    yield table, vs, calls
+    set_hp_summary_store(None)
+    set_patient_repository(None)
+
+
+@pytest.mark.asyncio
+async def test_unchanged_records_return_cached_summary(env):
+    table, vs, calls = env
+
+    assert await hp.abuild_hp_summary_for_patient("p1") == "summary 1"
+    added = vs.added
+    assert await hp.abuild_hp_summary_for_patient("p1") == "summary 1"
+
+    assert len(calls) == 1
+    assert vs.added == added
+
+
+@pytest.mark.asyncio
+async def test_new_records_are_embedded_incrementally(env):
+    table, vs, calls = env
+    await hp.abuild_hp_summary_for_patient("p1")
+    added = vs.added
+
+    # Session ids are random, so a newer intake can sort below the ones already indexed
+    table.items.append({"SK": "ChatHistory#0a17e2", "timestamp": "2025-01-02T09:00:00", "message": "now short of breath"})
+    table.items.append({"SK": "XRay#2025-01-02T09:05:00", "prediction": "Normal"})
+    assert await hp.abuild_hp_summary_for_patient("p1") == "summary 2"
+
+    assert vs.added == added + 1
+    assert "short of breath" in calls[-1]
+    assert table.queries == 2  # one partition query per build, never one per record type
+
+
+@pytest.mark.asyncio
+async def test_resaved_session_replaces_its_chunks(env):
+    table, vs, calls = env
+    await hp.abuild_hp_summary_for_patient("p1")
+
+    table.items[0] = {**table.items[0], "timestamp": "2025-01-03T08:00:00", "message": "cough is gone"}
+    assert await hp.abuild_hp_summary_for_patient("p1") == "summary 2"
+
+    texts = [d.page_content for d in vs.docs.values()]
+    assert any("cough is gone" in t for t in texts)
+    assert not any("cough for 3 days" in t for t in texts)
+
+
+@pytest.mark.asyncio
+async def test_deleted_record_drops_cached_summary(env):
+    table, vs, calls = env
+    await hp.abuild_hp_summary_for_patient("p1")
+
+    table.items.pop(1)
+    assert await hp.abuild_hp_summary_for_patient("p1") == "summary 2"
+    assert not any("T 38.1" in d.page_content for d in vs.docs.values())
+
+
+@pytest.mark.asyncio
+async def test_removing_every_record_deletes_its_vectors(env):
+    table, vs, calls = env
+    await hp.abuild_hp_summary_for_patient("p1")
+    assert vs.docs
+
+    table.items.clear()
+    assert await hp.abuild_hp_summary_for_patient("p1") == "No H&P data found."
+    assert vs.docs == {}
+    assert await hp.abuild_hp_summary_for_patient("p1") == "No H&P data found."
+    assert len(calls) == 1
+
+@pytest.mark.asyncio
+async def test_no_records(env, monkeypatch):
+    table, vs, calls = env
+    table.items.clear()
+    assert await hp.abuild_hp_summary_for_patient("p1") == "No H&P data found."
+    assert calls == []
+
+
+def test_documents_carry_patient_tags_and_numeric_timestamp():
+    from app.services.analyze_history_pexam_services import _to_documents
+    [doc] = _to_documents("p1", [{"SK": "ChatHistory#2025-01-01T10:00:00", "message": "hi"}], [])
+    assert doc.metadata["patientId"] == "p1" and doc.metadata["section"] == "chat"
+    assert doc.metadata["sk"] == "ChatHistory#2025-01-01T10:00:00"
+    assert doc.metadata["timestamp"] > 0
+    assert "symptom" not in doc.metadata
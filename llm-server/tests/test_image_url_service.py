@@ -0,0 +1,131 @@
+from concurrent.futures import Future
+
+from PIL import Image
+from botocore.exceptions import ClientError
+
+import app.services.image_url_service as svc
+
+
+class FakeS3:
+    def __init__(self):
+        self.objects = {}
+        self.heads = 0
+        self.signed = 0
+
+    def head_object(self, Bucket, Key):
+        self.heads += 1
+        if Key not in self.objects:
+            raise ClientError({"Error": {"Code": "404"}}, "HeadObject")
+        return {}
+
+    def put_object(self, Bucket, Key, Body, ContentType):
+        self.objects[Key] = Body
+
+    def generate_presigned_url(self, op, Params, ExpiresIn):
+        self.signed += 1
+        return f"https://signed/{Params['Key']}?n={self.signed}"
+
+
+class InlineExecutor:
+    """Runs uploads inline; background follow-up renders are held until run_background()."""
+
+    def __init__(self):
+        self.background = []
+
+    def submit(self, fn, *args, **kwargs):
+        if fn is svc._render_remaining:
+            self.background.append((fn, args))
+            return None
+        future = Future()
+        future.set_result(fn(*args, **kwargs))
+        return future
+
+    def run_background(self):
+        while self.background:
+            fn, args = self.background.pop(0)
+            fn(*args)
+
+
+def _setup(monkeypatch, expires_in=3600, margin=300):
+    fake = FakeS3()
+    frames = []
+    executor = InlineExecutor()
+    fake.executor = executor
+    monkeypatch.setattr(svc, "render_executor", executor)
+    monkeypatch.setattr(svc, "s3", fake)
+    monkeypatch.setattr(svc, "url_cache", svc.PresignedUrlCache(expires_in, margin))
+    monkeypatch.setattr(svc, "get_first_frame", lambda i: frames.append(i) or ("p", Image.new("I;16", (4, 4))))
+    monkeypatch.setattr(svc, "get_image_set_info", lambda i: {"window": (None, None)})
+    monkeypatch.setattr(svc, "DERIVATIVE_SIZES", {"thumbnail": 2, "full": 0})
+    return fake, frames
+
+
+def test_repeat_views_reuse_rendered_object_and_url(monkeypatch):
+    fake, frames = _setup(monkeypatch)
+
+    first = svc.get_xray_image_url("p1", "set1")
+    second = svc.get_xray_image_url("p1", "set1")
+
+    assert first == second
+    assert frames == ["set1"]
+    assert sorted(fake.objects) == ["p1/xrays/set1.jpeg"]  # only the requested size on the request path
+    assert fake.signed == 1
+
+    fake.executor.run_background()
+    assert sorted(fake.objects) == ["p1/xrays/set1.jpeg", "p1/xrays/set1_thumbnail.jpeg"]
+
+
+def test_existing_object_is_signed_without_rendering(monkeypatch):
+    fake, frames = _setup(monkeypatch)
+    fake.objects["p1/xrays/set1.jpeg"] = b"jpeg"
+
+    assert svc.get_xray_image_url("p1", "set1")
+    assert frames == []
+    assert fake.heads == 1
+
+
+def test_url_is_resigned_near_expiry_without_head_or_render(monkeypatch):
+    fake, frames = _setup(monkeypatch, expires_in=100, margin=100)
+
+    first = svc.get_xray_image_url("p1", "set1")
+    second = svc.get_xray_image_url("p1", "set1")
+
+    assert first != second
+    assert frames == ["set1"]
+    assert fake.heads == 1
+
+
+def test_other_sizes_are_served_from_the_same_render(monkeypatch):
+    fake, frames = _setup(monkeypatch)
+
+    svc.get_xray_image_url("p1", "set1", "full")
+    fake.executor.run_background()
+    thumb = svc.get_xray_image_url("p1", "set1", "thumbnail")
+
+    assert thumb.startswith("https://signed/p1/xrays/set1_thumbnail.jpeg")
+    assert frames == ["set1", "set1"]  # the frame itself comes from the frame cache
+    assert fake.heads == 1
+
+
+def test_concurrent_misses_do_not_deadlock_the_render_pool(monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+    fake, frames = _setup(monkeypatch)
+    pool = ThreadPoolExecutor(max_workers=2)
+    monkeypatch.setattr(svc, "render_executor", pool)
+    try:
+        with ThreadPoolExecutor(max_workers=4) as requests:
+            urls = list(requests.map(lambda n: svc.get_xray_image_url("p1", f"set{n}"), range(4)))
+        later = ThreadPoolExecutor(max_workers=1).submit(svc.get_xray_image_url, "p1", "set9")
+        assert later.result(timeout=5)
+        assert all(urls)
+    finally:
+        pool.shutdown(wait=True)
+    assert len(fake.objects) == 10  # 5 image sets x 2 sizes, background renders included
+
+def test_cache_is_bounded():
+    cache = svc.PresignedUrlCache(3600, 300, max_entries=2)
+    for key in ("a", "b", "c"):
+        cache.put_url(key, f"https://signed/{key}")
+    assert cache.get_url("a") is None and cache.get_url("c")
+    assert not cache.known_to_exist("a") and cache.known_to_exist("b")
+    assert cache.stats()["cached_urls"] == 2
@@ -0,0 +1,72 @@
+import os
+import time
+
+import numpy as np
+
+from PIL import Image
+
+from app.services.imageset_cache import MetadataCache, FrameDiskCache
+
+
+def test_metadata_cache_evicts_least_recently_used():
+    cache = MetadataCache(max_entries=2)
+    cache.put("a", {"first_frame_id": "1"})
+    cache.put("b", {"first_frame_id": "2"})
+    assert cache.get("a") is not None  # "a" is now most recent
+    cache.put("c", {"first_frame_id": "3"})
+
+    assert cache.get("b") is None
+    assert cache.get("a")["first_frame_id"] == "1"
+    assert cache.hits == 2 and cache.misses == 1
+
+
+def test_frame_cache_round_trips_16_bit_frames(tmp_path):
+    cache = FrameDiskCache(str(tmp_path), max_bytes=10 * 1024**2)
+    frame = Image.new("I;16", (8, 8))
+    frame.putpixel((0, 0), 4000)
+
+    assert cache.get("set", "frame") is None
+    cache.put("set", "frame", frame)
+    loaded = cache.get("set", "frame")
+
+    assert loaded.size == (8, 8)
+    assert loaded.getpixel((0, 0)) == 4000
+
+
+def test_frame_cache_evicts_oldest_files_over_budget(tmp_path):
+    frame = Image.effect_noise((64, 64), 50).convert("L")
+    probe = FrameDiskCache(str(tmp_path / "probe"), max_bytes=10**9)
+    probe.put("s", "f", frame)
+    size = os.path.getsize(probe._path("s", "f"))
+
+    cache = FrameDiskCache(str(tmp_path / "frames"), max_bytes=int(size * 2.5))
+    cache.put("s", "1", frame)
+    time.sleep(0.01)
+    cache.put("s", "2", frame)
+    time.sleep(0.01)
+    cache.get("s", "1")  # refresh "1" so "2" is the oldest
+    time.sleep(0.01)
+    cache.put("s", "3", frame)
+
+    assert cache.get("s", "2") is None
+    assert cache.get("s", "1") is not None
+    assert cache.get("s", "3") is not None
+
+
+def test_concurrent_puts_of_one_frame_do_not_collide(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+    frame = Image.fromarray(np.random.randint(0, 4096, (64, 64), dtype=np.uint16))
+    cache = FrameDiskCache(str(tmp_path), max_bytes=10**9)
+
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda _: cache.put("s", "f", frame), range(16)))
+
+    assert [e.name for e in os.scandir(tmp_path)] == ["s__f.png"]
+    assert cache.get("s", "f") is not None
+
+
+def test_disabled_cache_writes_nothing(tmp_path):
+    cache = FrameDiskCache(str(tmp_path / "frames"), max_bytes=10**9, enabled=False)
+    cache.put("s", "f", Image.new("L", (4, 4)))
+    assert cache.get("s", "f") is None
+    assert not (tmp_path / "frames").exists()
@@ -0,0 +1,193 @@
+import asyncio
+
+import pytest
+
+from app.services.job_queue import InMemoryJobBackend, JobQueue, register_job_handler
+
+
+async def _wait_for(predicate, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_jobs_run_on_worker_pool():
+    seen = []
+
+    async def handler(payload):
+        await asyncio.sleep(0.01)
+        seen.append(payload["n"])
+
+    register_job_handler("test.ok", handler)
+    queue = JobQueue(InMemoryJobBackend(), concurrency=3, poll_timeout=0.05)
+    queue.start()
+    for n in range(10):
+        await queue.enqueue("test.ok", {"n": n})
+    await _wait_for(lambda: queue.processed == 10)
+    await queue.stop()
+
+    stats = await queue.stats()
+    assert sorted(seen) == list(range(10))
+    assert stats["depth"] == 0 and stats["latency_p95_s"] is not None
+
+
+@pytest.mark.asyncio
+async def test_failed_jobs_are_retried_then_succeed():
+    attempts = []
+
+    async def flaky(payload):
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise RuntimeError("transient")
+
+    register_job_handler("test.flaky", flaky)
+    queue = JobQueue(InMemoryJobBackend(), concurrency=1, retry_base_delay=0.01, poll_timeout=0.05)
+    queue.start()
+    await queue.enqueue("test.flaky", {})
+    await _wait_for(lambda: queue.processed == 1)
+    await queue.stop()
+
+    assert len(attempts) == 3 and queue.retried == 2 and queue.dead == 0
+
+
+@pytest.mark.asyncio
+async def test_jobs_give_up_after_max_attempts():
+    async def broken(payload):
+        raise RuntimeError("permanent")
+
+    register_job_handler("test.broken", broken)
+    queue = JobQueue(InMemoryJobBackend(), concurrency=1, max_attempts=2, retry_base_delay=0.01, poll_timeout=0.05)
+    queue.start()
+    await queue.enqueue("test.broken", {})
+    await _wait_for(lambda: queue.dead == 1)
+    await queue.stop()
+
+    assert queue.retried == 1 and queue.processed == 0
+
+
+@pytest.mark.asyncio
+async def test_idempotency_key_drops_duplicates():
+    queue = JobQueue(InMemoryJobBackend())
+    assert await queue.enqueue("test.ok", {}, idempotency_key="session-1")
+    assert not await queue.enqueue("test.ok", {}, idempotency_key="session-1")
+    assert await queue.backend.depth() == 1
+
+
+class FailingOnceBackend(InMemoryJobBackend):
+    def __init__(self):
+        super().__init__()
+        self.put_calls = 0
+
+    async def put(self, job):
+        self.put_calls += 1
+        if self.put_calls == 1:
+            raise ConnectionError("XADD failed")
+        await super().put(job)
+
+
+@pytest.mark.asyncio
+async def test_failed_put_releases_idempotency_key():
+    queue = JobQueue(FailingOnceBackend())
+    with pytest.raises(ConnectionError):
+        await queue.enqueue("test.ok", {}, idempotency_key="intake-1")
+
+    assert await queue.enqueue("test.ok", {}, idempotency_key="intake-1")
+    assert not await queue.enqueue("test.ok", {}, idempotency_key="intake-1")
+    assert await queue.backend.depth() == 1
+
+
+@pytest.mark.asyncio
+async def test_worker_survives_backend_errors_after_running_a_job():
+    seen = []
+
+    class AckFailingBackend(InMemoryJobBackend):
+        acks = 0
+
+        async def ack(self, job):
+            self.acks += 1
+            if self.acks == 1:
+                raise ConnectionError("connection reset")
+
+    async def handler(payload):
+        seen.append(payload["n"])
+
+    register_job_handler("test.ackfail", handler)
+    queue = JobQueue(AckFailingBackend(), concurrency=1, poll_timeout=0.05)
+    queue.start()
+    await queue.enqueue("test.ackfail", {"n": 1})
+    await queue.enqueue("test.ackfail", {"n": 2})
+    await _wait_for(lambda: seen == [1, 2], timeout=5)
+    worker = queue._workers[0]
+    await queue.stop()
+
+    assert worker.exception() is None
+
+
+class FakeStreamRedis:
+    """Just enough of redis.asyncio for one pending entry that keeps being reclaimed."""
+
+    def __init__(self, job, times_delivered):
+        self.entry = ("1-0", {"job": job.model_dump_json()})
+        self.times_delivered = times_delivered
+        self.dead = []
+
+    async def xgroup_create(self, *args, **kwargs):
+        pass
+
+    async def zrangebyscore(self, *args, **kwargs):
+        return []
+
+    async def xautoclaim(self, *args, **kwargs):
+        if self.entry is None:
+            return ["0-0", [], []]
+        self.times_delivered += 1
+        return ["0-0", [self.entry], []]
+
+    async def xreadgroup(self, *args, **kwargs):
+        await asyncio.sleep(0.01)
+        return []
+
+    async def xpending_range(self, stream, group, lo, hi, count):
+        return [{"message_id": lo, "times_delivered": self.times_delivered}]
+
+    def pipeline(self, transaction=True):
+        redis, ops = self, []
+
+        class Pipe:
+            def xadd(self, key, fields, **kwargs):
+                ops.append(lambda: redis.dead.append((key, fields)))
+
+            def xack(self, *args):
+                pass
+
+            def xdel(self, *args):
+                ops.append(lambda: setattr(redis, "entry", None))
+
+            async def execute(self):
+                for op in ops:
+                    op()
+
+        return Pipe()
+
+
+@pytest.mark.asyncio
+async def test_reclaimed_deliveries_count_towards_max_attempts():
+    from app.services.job_queue import Job, RedisStreamJobBackend
+    ran = []
+
+    async def handler(payload):
+        ran.append(payload)
+
+    register_job_handler("test.crashy", handler)
+    backend = RedisStreamJobBackend(redis_url="redis://unused")
+    # Three earlier deliveries, each ending with the worker dying before the ack
+    backend._redis = fake = FakeStreamRedis(Job(kind="test.crashy"), times_delivered=3)
+    queue = JobQueue(backend, concurrency=1, max_attempts=3, poll_timeout=0.05)
+    queue.start()
+    await _wait_for(lambda: queue.dead == 1)
+    await queue.stop()
+
+    assert ran == []
+    assert [key for key, _ in fake.dead] == ["jobs:dead"]
@@ -0,0 +1,111 @@
+from io import BytesIO
+
+from botocore.exceptions import ClientError
+from pdfminer.high_level import extract_text
+
+import app.services.fetch_bloodtest_text as fbt
+from app.services.lab_text_cache import LocalLabTextStore
+from app.services.pdf_text import extract_pdf_text, page_count
+
+
+def make_pdf(pages):
+    """Minimal text PDF, one line of Helvetica per page."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in pages:
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>"
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for n, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{n} 0 obj\n{body}\nendobj\n".encode()
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{o:010d} 00000 n \n" for o in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return out
+
+
+def test_parallel_extraction_matches_pdfminer():
+    pdf = make_pdf([f"Hemoglobin page {i}" for i in range(6)])
+    assert page_count(pdf) == 6
+    assert extract_pdf_text(pdf, workers=2, parallel_min_pages=4) == extract_text(BytesIO(pdf))
+
+
+class FakeS3:
+    def __init__(self, body, etag):
+        self.body, self.etag = body, etag
+        self.calls = []
+
+    def get_object(self, Bucket, Key, IfNoneMatch=None):
+        self.calls.append(IfNoneMatch)
+        if IfNoneMatch == self.etag:
+            raise ClientError({"Error": {"Code": "304", "Message": "Not Modified"}}, "GetObject")
+        return {"Body": BytesIO(self.body), "ETag": self.etag}
+
+
+def test_unchanged_report_is_served_from_cache_with_conditional_get(tmp_path, monkeypatch):
+    fake = FakeS3(make_pdf(["WBC 7.2"]), '"v1"')
+    monkeypatch.setattr(fbt, "s3", fake)
+    parsed = []
+    monkeypatch.setattr(fbt, "extract_pdf_text", lambda b, *a: parsed.append(1) or extract_text(BytesIO(b)))
+    store = LocalLabTextStore(str(tmp_path), max_bytes=10**6)
+
+    first = fbt._cached_pdf_text("bucket", "p1/report.pdf", store)
+    second = fbt._cached_pdf_text("bucket", "p1/report.pdf", store)
+
+    assert "WBC 7.2" in first and second == first
+    assert fake.calls == [None, '"v1"']
+    assert parsed == [1]
+
+    fake.body, fake.etag = make_pdf(["WBC 9.9"]), '"v2"'
+    assert "WBC 9.9" in fbt._cached_pdf_text("bucket", "p1/report.pdf", store)
+    assert parsed == [1, 1]
+
+
+def test_local_store_evicts_least_recently_used_text(tmp_path):
+    store = LocalLabTextStore(str(tmp_path), max_bytes=250)
+    store.put("b", "a.pdf", "e1", "a" * 100)
+    store.put("b", "b.pdf", "e1", "b" * 100)
+    store.put("b", "c.pdf", "e1", "c" * 100)
+
+    assert store.get_text("b", "a.pdf", "e1") is None
+    assert store.get_text("b", "c.pdf", "e1") == "c" * 100
+    assert store.get_etag("b", "a.pdf") == "e1"
+
+
+def test_local_store_is_owner_only(tmp_path):
+    store = LocalLabTextStore(str(tmp_path / "lab-text"), max_bytes=10**6)
+    store.put("b", "a.pdf", "e1", "WBC 7.2")
+
+    assert (tmp_path / "lab-text").stat().st_mode & 0o777 == 0o700
+    assert {p.stat().st_mode & 0o777 for p in (tmp_path / "lab-text").iterdir()} == {0o600}
+
+
+def test_etag_files_count_towards_the_budget(tmp_path):
+    store = LocalLabTextStore(str(tmp_path), max_bytes=200)
+    for n in range(50):
+        store.put("b", f"{n}.pdf", "e" * 20, "")
+
+    assert sum(p.stat().st_size for p in tmp_path.iterdir()) <= 200
+    assert store.get_etag("b", "49.pdf") == "e" * 20
+
+
+def test_concurrent_writers_of_one_key_do_not_collide(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+    # Separate instances, like separate workers sharing the directory
+    stores = [LocalLabTextStore(str(tmp_path), max_bytes=10**6) for _ in range(8)]
+
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda i: stores[i % 8].put("b", "a.pdf", "e1", "x" * 10_000), range(32)))
+
+    assert sorted(p.suffix for p in tmp_path.iterdir()) == [".etag", ".txt"]
+    assert stores[0].get_text("b", "a.pdf", "e1") == "x" * 10_000
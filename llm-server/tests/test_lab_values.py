@@ -0,0 +1,98 @@
+from app.services.lab_values import (
+    NO_RANGE,
+    format_lab_table,
+    lab_values_item,
+    load_or_extract_lab_values,
+    parse_lab_rows,
+)
+from app.services.patient_record_repository import PatientRecordRepository
+from app.services.patient_timeline import PatientTimeline
+
+REPORT = """Complete Blood Count
+Hemoglobin 11.2 g/dL 13.5 - 17.5
+WBC: 7.2 x10^3/uL (4.0-11.0)
+Platelets 450 K/uL 150-400 H
+LDL Cholesterol 162 mg/dL <100
+HDL 55 mg/dL >40
+Page 1 of 2
+"""
+
+
+def test_parse_rows_and_flags():
+    rows = {r["analyte"]: r for r in parse_lab_rows(REPORT)}
+
+    assert set(rows) == {"Hemoglobin", "WBC", "Platelets", "LDL Cholesterol", "HDL"}
+    assert rows["Hemoglobin"]["flag"] == "L"
+    assert rows["Platelets"]["flag"] == "H"
+    assert rows["LDL Cholesterol"]["refHigh"] == 100 and rows["LDL Cholesterol"]["flag"] == "H"
+    assert rows["HDL"]["refLow"] == 40 and rows["HDL"]["flag"] == ""
+    assert rows["WBC"]["unit"] == "x10^3/uL"
+
+
+def test_abnormal_table_is_compact():
+    table = format_lab_table(parse_lab_rows(REPORT), mode="abnormal")
+
+    assert "Hemoglobin | 11.2 | g/dL | 13.5-17.5 | L" in table
+    assert "WBC |" not in table
+    assert table.endswith("Within reference range: WBC, HDL")
+    assert len(table) < len(REPORT) * 2
+
+
+def test_values_without_range_are_never_reported_as_normal():
+    rows = parse_lab_rows("CRP 45 mg/L\nSodium 150 mmol/L\nHDL 55 mg/dL >40\n")
+    assert [r["flag"] for r in rows] == [NO_RANGE, NO_RANGE, ""]
+
+    table = format_lab_table(rows, mode="abnormal")
+    assert "CRP | 45 | mg/L |  | NR" in table
+    assert "Sodium | 150 | mmol/L |  | NR" in table
+    assert table.endswith("Within reference range: HDL")
+
+
+def test_header_lines_are_not_analytes():
+    text = "Patient Age: 45 years\nPrinted on 08/19/2025\nCollected 2025-08-19 07:30\nAge 45\n" + REPORT
+    assert {r["analyte"] for r in parse_lab_rows(text)} == {"Hemoglobin", "WBC", "Platelets", "LDL Cholesterol", "HDL"}
+
+
+class FakeTable:
+    def __init__(self):
+        self.items = {}
+        self.puts = 0
+
+    def get_item(self, Key):
+        item = self.items.get((Key["patientId"], Key["SK"]))
+        return {"Item": dict(item)} if item else {}
+
+    def put_item(self, Item):
+        self.puts += 1
+        self.items[(Item["patientId"], Item["SK"])] = Item
+
+
+def test_rows_are_stored_once_per_text_version():
+    table = FakeTable()
+    repository = PatientRecordRepository(table)
+
+    first = load_or_extract_lab_values(repository, "p1", "enc1", "k", REPORT)
+    again = load_or_extract_lab_values(repository, "p1", "enc1", "k", REPORT)
+    assert table.puts == 1
+    assert again == first
+
+    load_or_extract_lab_values(repository, "p1", "enc1", "k", REPORT + "Glucose 130 mg/dL 70-99\n")
+    assert table.puts == 2
+    assert table.items[("p1", "LabValues#enc1")]["abnormalCount"] == 4
+
+
+def test_stored_rows_can_come_from_the_patient_timeline():
+    table = FakeTable()
+    repository = PatientRecordRepository(table)
+    first = load_or_extract_lab_values(repository, "p1", "enc1", "k", REPORT)
+    table.get_item = None  # any GetItem would fail
+
+    timeline = PatientTimeline("p1", [dict(table.items[("p1", "LabValues#enc1")])])
+    assert load_or_extract_lab_values(repository, "p1", "enc1", "k", REPORT, timeline) == first
+    assert table.puts == 1
+
+
+def test_item_is_columnar():
+    item = lab_values_item("p1", "enc1", parse_lab_rows(REPORT), "k", REPORT)
+    assert item["analyte"][0] == "Hemoglobin"
+    assert len(item["value"]) == len(item["flag"]) == 5
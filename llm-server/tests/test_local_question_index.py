@@ -0,0 +1,55 @@
+import pytest
+from typing import List
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from app.services.local_question_index import build_local_question_index
+
+VOCAB = ["start", "phlegm", "smoke", "family"]
+
+class BagOfWordsEmbeddings(Embeddings):
+    def __init__(self):
+        self.query_calls = 0
+
+    def _vec(self, text: str) -> List[float]:
+        return [float(w in text.lower()) for w in VOCAB] + [0.01]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._vec(t) for t in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        self.query_calls += 1
+        return self._vec(text)
+
+def _doc(text: str, symptom: str, section: str) -> Document:
+    return Document(page_content=text, metadata={"symptom": symptom, "section": section, "id": text})
+
+DOCS = [
+    _doc("When did the cough start?", "cough", "HPI"),
+    _doc("Are you bringing up phlegm?", "cough", "HPI"),
+    _doc("Do you smoke?", "cough", "SH"),
+    _doc("Any lung disease in your family?", "cough", "FH"),
+    _doc("When did the fever start?", "fever", "HPI"),
+]
+
+@pytest.mark.asyncio
+async def test_search_is_partitioned_and_ranked():
+    emb = BagOfWordsEmbeddings()
+    idx = build_local_question_index(DOCS, emb)
+    assert len(idx) == 5
+
+    hits = await idx.asearch("lots of phlegm", "cough", sections=["HPI"], k=2)
+    assert [d.page_content for d in hits] == ["Are you bringing up phlegm?", "When did the cough start?"]
+
+    hits = await idx.asearch("I smoke", "cough", k=1)
+    assert [d.page_content for d in hits] == ["Do you smoke?"]
+    assert idx.search("I smoke", "fever", sections=["SH"]) == []
+
+@pytest.mark.asyncio
+async def test_search_by_section_embeds_once_and_groups():
+    emb = BagOfWordsEmbeddings()
+    idx = build_local_question_index(DOCS, emb)
+    grouped = await idx.asearch_by_section("phlegm", "cough", ["HPI", "PMH", "SH"], k=1)
+    assert emb.query_calls == 1
+    assert [d.page_content for d in grouped["HPI"]] == ["Are you bringing up phlegm?"]
+    assert grouped["PMH"] == []
+    assert [d.page_content for d in grouped["SH"]] == ["Do you smoke?"]
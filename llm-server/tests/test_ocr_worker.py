@@ -0,0 +1,95 @@
+import pytest
+from io import BytesIO
+
+from app.services.ocr_engines import FakeOcrEngine
+from app.services.patient_record_repository import PatientRecordRepository
+from app.workers.ocr_worker import OcrSqsWorker
+from tests.conftest import FakeSqs
+
+
+def s3_event(*keys, bucket="notes", etag="e1"):
+    return {"Records": [{"s3": {"bucket": {"name": bucket}, "object": {"key": k, "eTag": etag}}} for k in keys]}
+
+
+class FakeS3:
+    def __init__(self, missing=()):
+        self.missing = set(missing)
+
+    def get_object(self, Bucket, Key):
+        if Key in self.missing:
+            raise RuntimeError("NoSuchKey")
+        return {"Body": BytesIO(f"image:{Key}".encode())}
+
+
+class FakeTable:
+    def __init__(self):
+        self.items = []
+        self.flushes = 0
+
+    def batch_writer(self, overwrite_by_pkeys=None):
+        table = self
+
+        class Writer:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                table.flushes += 1
+
+            def put_item(self, Item):
+                table.items.append(Item)
+
+        return Writer()
+
+
+@pytest.mark.asyncio
+async def test_poll_batches_engine_calls_and_saves_notes():
+    sqs = FakeSqs([s3_event(f"p{i}/notes/page{i}.jpg") for i in range(10)])
+    engine = FakeOcrEngine()
+    engine.max_batch_size = 4
+    table = FakeTable()
+    worker = OcrSqsWorker(sqs, FakeS3(), PatientRecordRepository(table), engine, queue_url="q", wait_time_seconds=0)
+
+    saved = await worker.poll_once()
+
+    assert saved == 10
+    assert engine.calls == 3  # 4 + 4 + 2
+    assert table.flushes == 1
+    assert {item["patientId"] for item in table.items} == {f"p{i}" for i in range(10)}
+    assert all(item["SK"].startswith("OCRNote#") for item in table.items)
+    assert len(sqs.deleted) == 10 and sqs.delete_batch_sizes == [10]
+
+
+@pytest.mark.asyncio
+async def test_failed_downloads_and_unmatched_keys_stay_queued():
+    sqs = FakeSqs([
+        s3_event("p1/notes/ok.jpg"),
+        s3_event("p2/notes/missing.jpg"),
+        {"not": "an s3 event"},
+        s3_event("no-patient.jpg"),
+    ])
+    table = FakeTable()
+    worker = OcrSqsWorker(sqs, FakeS3(missing={"p2/notes/missing.jpg"}), PatientRecordRepository(table), FakeOcrEngine(), queue_url="q", wait_time_seconds=0)
+
+    await worker.poll_once()
+
+    assert [item["sourceKey"] for item in table.items] == ["p1/notes/ok.jpg"]
+    assert sorted(m["ReceiptHandle"] for m in sqs.deleted) == ["rh-0", "rh-2"]
+    assert sorted(sqs.in_flight) == ["rh-1", "rh-3"]  # rh-3 goes to the DLQ after maxReceiveCount
+    assert worker.stats()["skipped"] == 1 and worker.stats()["unmatched"] == 1
+
+
+@pytest.mark.asyncio
+async def test_redelivered_message_overwrites_its_notes():
+    sqs = FakeSqs([s3_event("p1/notes/a.jpg", "p2/notes/missing.jpg")])
+    table = FakeTable()
+    s3 = FakeS3(missing={"p2/notes/missing.jpg"})
+    worker = OcrSqsWorker(sqs, s3, PatientRecordRepository(table), FakeOcrEngine(), queue_url="q", wait_time_seconds=0)
+
+    await worker.poll_once()
+    sqs.visible.extend(sqs.in_flight.values())  # visibility timeout expires
+    s3.missing.clear()
+    await worker.poll_once()
+
+    sks = [item["SK"] for item in table.items]
+    assert len(sks) == 3 and len(set(sks)) == 2
@@ -0,0 +1,99 @@
+import pytest
+
+moto = pytest.importorskip("moto")
+boto3 = pytest.importorskip("boto3")
+
+from app.services.patient_record_repository import PatientRecordRepository
+
+
+@pytest.fixture
+def repository():
+    with moto.mock_aws():
+        dynamodb = boto3.resource("dynamodb", region_name="us-east-1")
+        table = dynamodb.create_table(
+            TableName="patients",
+            KeySchema=[
+                {"AttributeName": "patientId", "KeyType": "HASH"},
+                {"AttributeName": "SK", "KeyType": "RANGE"},
+            ],
+            AttributeDefinitions=[
+                {"AttributeName": "patientId", "AttributeType": "S"},
+                {"AttributeName": "SK", "AttributeType": "S"},
+            ],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        yield PatientRecordRepository(table, max_workers=2)
+
+
+def chat(patient_id, i):
+    return {"patientId": patient_id, "SK": f"ChatHistory#{i:03d}", "timestamp": f"2025-01-{i % 28 + 1:02d}", "extracted": "x" * 20}
+
+
+def test_put_many_and_paginated_query(repository):
+    repository.put_many([chat("p1", i) for i in range(60)] + [chat("p2", 0)])
+    repository.put({"patientId": "p1", "SK": "XRay#2025-01-01", "imageSetId": "s1"})
+
+    items = repository.query("p1", sk_prefix="ChatHistory#")
+    assert len(items) == 60
+
+    page, start_key = repository.query_page("p1", sk_prefix="ChatHistory#", page_size=25)
+    assert len(page) == 25 and start_key is not None
+    page2, _ = repository.query_page("p1", sk_prefix="ChatHistory#", page_size=25, start_key=start_key)
+    assert page2[0]["SK"] == "ChatHistory#025"
+
+    newest = repository.query("p1", sk_prefix="ChatHistory#", descending=True, limit=3)
+    assert [it["SK"] for it in newest] == ["ChatHistory#059", "ChatHistory#058", "ChatHistory#057"]
+
+    between = repository.query("p1", sk_between=("ChatHistory#010", "ChatHistory#012"))
+    assert [it["SK"] for it in between] == ["ChatHistory#010", "ChatHistory#011", "ChatHistory#012"]
+
+
+def test_projection_handles_reserved_words(repository):
+    repository.put(chat("p1", 1))
+    [item] = repository.query("p1", projection=["SK", "timestamp"])
+    assert set(item) == {"SK", "timestamp"}
+    assert repository.get("p1", "ChatHistory#001", projection=["extracted"]) == {"extracted": "x" * 20}
+
+
+@pytest.mark.asyncio
+async def test_async_variants(repository):
+    await repository.aput_many(chat("p1", i) for i in range(3))
+    await repository.aput({"patientId": "p1", "SK": "PExamResults#s1", "extracted_vitals": "T 37"})
+
+    assert len(await repository.aquery("p1", sk_prefix="ChatHistory#")) == 3
+    assert (await repository.aget("p1", "PExamResults#s1"))["extracted_vitals"] == "T 37"
+    assert await repository.aget("p1", "missing") is None
+
+
+def xray(ts, image_set_id):
+    return {"patientId": "p1", "SK": f"XRay#{ts}", "timestamp": ts, "imageSetId": image_set_id}
+
+
+def test_pointer_only_moves_forward(repository):
+    assert repository.put_with_pointer(xray("2025-01-02T00:00:00", "new"), "XRay#LATEST")
+    # A late, older result keeps its history item but leaves the pointer alone
+    assert not repository.put_with_pointer(xray("2025-01-01T00:00:00", "old"), "XRay#LATEST")
+
+    pointer = repository.get("p1", "XRay#LATEST")
+    assert pointer["imageSetId"] == "new" and pointer["pointsTo"] == "XRay#2025-01-02T00:00:00"
+    assert len(repository.query("p1", sk_prefix="XRay#")) == 3
+
+
+def test_latest_xray_record(repository):
+    from app.services import xray_classification_service as xr
+    from app.services.patient_record_repository import set_patient_repository
+
+    set_patient_repository(repository)
+    try:
+        # Records written before the pointer existed: descending Limit=1 range query
+        repository.put_many([xray(f"2025-01-{d:02d}T00:00:00", f"s{d}") for d in range(1, 20)])
+        assert xr.latest_xray_record("p1", projection=["imageSetId"]) == {"imageSetId": "s19"}
+
+        xr.save_xray_result("p1", "s-new", "Normal", 0.9)
+        assert xr.latest_xray_record("p1")["imageSetId"] == "s-new"
+        assert xr.latest_xray_record("p2") is None
+
+        history = xr.xray_history(repository.query("p1", sk_prefix=xr.XRAY_PREFIX))
+        assert len(history) == 20 and all(it["SK"] != xr.XRAY_LATEST_SK for it in history)
+    finally:
+        set_patient_repository(None)
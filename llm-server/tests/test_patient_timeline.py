@@ -0,0 +1,59 @@
+import asyncio
+import time
+
+import pytest
+
+from app.services.patient_record_repository import PatientRecordRepository, set_patient_repository
+from app.services.patient_timeline import PatientTimeline, aget_patient_timeline, patient_timeline_scope
+
+
+class SlowTable:
+    """Partition query with two pages and a little latency, counting round-trips."""
+
+    def __init__(self, items):
+        self.items = items
+        self.calls = 0
+
+    def query(self, KeyConditionExpression, ScanIndexForward, ExclusiveStartKey=None, **kwargs):
+        self.calls += 1
+        time.sleep(0.02)
+        start = ExclusiveStartKey["i"] if ExclusiveStartKey else 0
+        page = self.items[start:start + 2]
+        resp = {"Items": page}
+        if start + 2 < len(self.items):
+            resp["LastEvaluatedKey"] = {"i": start + 2}
+        return resp
+
+
+ITEMS = [
+    {"SK": "ChatHistory#s1"},
+    {"SK": "PExamResults#s1"},
+    {"SK": "XRay#2025-01-01T00:00:00"},
+    {"SK": "XRay#2025-02-01T00:00:00"},
+    {"SK": "LabValues#enc1", "textHash": "h"},
+]
+
+
+def test_timeline_partitions_by_record_type():
+    timeline = PatientTimeline("p1", ITEMS)
+    assert timeline.counts() == {"ChatHistory#": 1, "PExamResults#": 1, "XRay#": 2, "LabValues#": 1}
+    assert [it["SK"] for it in timeline.records("XRay#")] == ["XRay#2025-02-01T00:00:00", "XRay#2025-01-01T00:00:00"]
+    assert timeline.get("LabValues#enc1")["textHash"] == "h"
+    assert timeline.records("OCRNote#") == []
+
+
+@pytest.mark.asyncio
+async def test_scope_shares_one_paginated_query():
+    table = SlowTable(ITEMS)
+    set_patient_repository(PatientRecordRepository(table, max_workers=2))
+    try:
+        with patient_timeline_scope():
+            first, second, third = await asyncio.gather(*(aget_patient_timeline("p1") for _ in range(3)))
+        assert first is second is third
+        assert len(first) == 5
+        assert table.calls == 3  # pages of 2, 2 and 1 for a single logical query
+
+        await aget_patient_timeline("p1")  # outside the scope: not cached
+        assert table.calls == 6
+    finally:
+        set_patient_repository(None)
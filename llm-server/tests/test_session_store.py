@@ -0,0 +1,54 @@
+import pytest
+from app.services.session_store import (
+    InMemorySessionStore,
+    IntakeSession,
+    SessionConflictError,
+    SessionStore,
+)
+
+@pytest.mark.asyncio
+async def test_in_memory_store_roundtrip_and_version_bump():
+    store = InMemorySessionStore(ttl_seconds=60, max_sessions=10)
+    session = IntakeSession(session_id="s1", symptom="cough", qas={"HPI": []})
+    await store.save(session)
+    assert session.version == 1
+
+    loaded = await store.load("s1")
+    assert loaded is not None
+    loaded.qas["HPI"].append({"q": "How long?", "a": "2 days"})
+    await store.save(loaded)
+
+    reloaded = await store.load("s1")
+    assert reloaded.version == 2
+    assert reloaded.qas["HPI"] == [{"q": "How long?", "a": "2 days"}]
+
+@pytest.mark.asyncio
+async def test_in_memory_store_rejects_stale_write():
+    store = InMemorySessionStore(ttl_seconds=60, max_sessions=10)
+    await store.save(IntakeSession(session_id="s1", symptom="cough"))
+
+    first = await store.load("s1")
+    second = await store.load("s1")
+    await store.save(first)
+    with pytest.raises(SessionConflictError):
+        await store.save(second)
+
+@pytest.mark.asyncio
+async def test_in_memory_store_expires_and_bounds_sessions():
+    store = InMemorySessionStore(ttl_seconds=0, max_sessions=10)
+    await store.save(IntakeSession(session_id="expired", symptom="cough"))
+    assert await store.load("expired") is None
+
+    store = InMemorySessionStore(ttl_seconds=60, max_sessions=2)
+    for sid in ["a", "b", "c"]:
+        await store.save(IntakeSession(session_id=sid, symptom="fever"))
+    assert await store.load("a") is None
+    assert await store.load("c") is not None
+
+def test_store_missing_an_override_fails_on_creation():
+    class LoadOnlyStore(SessionStore):
+        async def load(self, session_id):
+            return None
+
+    with pytest.raises(TypeError):
+        LoadOnlyStore()
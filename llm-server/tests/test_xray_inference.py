@@ -0,0 +1,58 @@
+import threading
+import pytest
+torch = pytest.importorskip("torch")
+from PIL import Image
+from app.models.xray_inference import XRayInferenceEngine
+
+def _fake_preprocess(image: Image.Image) -> torch.Tensor:
+    return torch.full((1,), float(image.getpixel((0, 0))))
+
+class RecordingModel:
+    def __init__(self):
+        self.batch_sizes = []
+        self.release = threading.Event()
+
+    def __call__(self, batch: torch.Tensor):
+        self.release.wait(timeout=5)
+        self.batch_sizes.append(batch.shape[0])
+        return [("Pneumonia" if v > 127 else "Normal", float(v) / 255) for v in batch[:, 0].tolist()]
+
+def _img(value: int) -> Image.Image:
+    return Image.new("L", (4, 4), color=value)
+
+def test_engine_micro_batches_and_routes_results():
+    model = RecordingModel()
+    engine = XRayInferenceEngine(model, _fake_preprocess, max_batch_size=4, max_wait_ms=50)
+    try:
+        # First call occupies the inference thread; the next ones pile up into one batch
+        first = engine.submit(_img(0))
+        rest = [engine.submit(_img(v)) for v in (255, 10, 200)]
+        model.release.set()
+
+        assert first.result(timeout=5)[0] == "Normal"
+        assert [f.result(timeout=5)[0] for f in rest] == ["Pneumonia", "Normal", "Pneumonia"]
+        assert sum(model.batch_sizes) == 4
+        assert max(model.batch_sizes) > 1
+    finally:
+        engine.stop()
+
+def test_engine_propagates_model_errors():
+    def broken(batch):
+        raise RuntimeError("boom")
+
+    engine = XRayInferenceEngine(broken, _fake_preprocess, max_batch_size=2, max_wait_ms=1)
+    try:
+        with pytest.raises(RuntimeError):
+            engine.predict(_img(1), timeout=5)
+    finally:
+        engine.stop()
+
+@pytest.mark.asyncio
+async def test_engine_apredict():
+    model = RecordingModel()
+    model.release.set()
+    engine = XRayInferenceEngine(model, _fake_preprocess, max_batch_size=2, max_wait_ms=1)
+    try:
+        assert (await engine.apredict(_img(255)))[0] == "Pneumonia"
+    finally:
+        engine.stop()
@@ -0,0 +1,60 @@
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+from app.services.xray_rendering import (
+    downscale,
+    parse_derivative_sizes,
+    render_derivatives,
+    resolve_window,
+    window_level,
+)
+
+
+def test_parse_derivative_sizes():
+    assert parse_derivative_sizes("thumbnail:256, Preview:1024,full:0") == {
+        "thumbnail": 256, "preview": 1024, "full": 0,
+    }
+
+
+def test_downscale_keeps_native_resolution_for_zero_edge():
+    pixels = np.arange(12, dtype=np.uint16).reshape(3, 4)
+    assert downscale(pixels, 0) is pixels
+
+
+def test_downscale_area_averages_to_max_edge():
+    pixels = np.full((1000, 800), 4000, dtype=np.uint16)
+    small = downscale(pixels, 256)
+    assert max(small.shape) <= 256
+    assert np.allclose(small, 4000)
+
+
+def test_window_level_uses_dicom_window():
+    pixels = np.array([[0, 1500, 2000, 3000]], dtype=np.uint16)
+    display = window_level(pixels, center=1500, width=1000)
+    assert display.dtype == np.uint8
+    assert display.tolist() == [[0, 127, 255, 255]]
+
+
+def test_render_derivatives_produces_grayscale_jpegs():
+    frame = Image.fromarray(np.random.randint(0, 4096, (600, 500), dtype=np.uint16))
+    rendered = render_derivatives(frame, {"thumbnail": 128, "full": 0})
+
+    with Image.open(BytesIO(rendered["thumbnail"])) as thumb:
+        assert thumb.mode == "L" and max(thumb.size) <= 128
+    with Image.open(BytesIO(rendered["full"])) as full:
+        assert full.size == (500, 600)
+
+
+def test_downscale_keeps_at_least_one_pixel_per_edge():
+    pixels = np.ones((3, 5000), dtype=np.uint16)
+    small = downscale(pixels, 256)
+    assert small.shape[0] >= 1 and 1 <= small.shape[1] <= 256
+
+
+def test_auto_window_matches_between_sizes():
+    pixels = np.tile(np.arange(0, 4000, 4, dtype=np.uint16), (400, 1))
+    lo, hi = resolve_window(pixels)
+    assert 0 <= lo < 100 and 3900 < hi <= 4000
+    assert window_level(pixels).dtype == np.uint8
@@ -0,0 +1,76 @@
+import asyncio
+import json
+import pytest
+from app.workers.xray_sqs_worker import XRaySqsWorker, SkipMessage
+from tests.conftest import FakeSqs
+
+
+async def _run_until_empty(worker, sqs):
+    while sqs.visible:
+        await worker.poll_once()
+    await worker.drain()
+
+@pytest.mark.asyncio
+async def test_worker_processes_in_batches_and_batch_deletes():
+    sqs = FakeSqs([{"imageSetId": f"set-{i}"} for i in range(25)])
+    seen = []
+
+    async def handler(body):
+        await asyncio.sleep(0.01)
+        seen.append(body["imageSetId"])
+        return {"imageSetId": body["imageSetId"], "prediction": "Normal", "confidence": 0.9}
+
+    worker = XRaySqsWorker(sqs, queue_url="q", handler=handler, concurrency=10, wait_time_seconds=0)
+    await _run_until_empty(worker, sqs)
+
+    assert sorted(seen) == sorted(f"set-{i}" for i in range(25))
+    assert len(sqs.deleted) == 25
+    assert max(sqs.receive_sizes) == 10
+    assert max(sqs.delete_batch_sizes) > 1
+    assert worker.stats()["processed"] == 25
+
+@pytest.mark.asyncio
+async def test_worker_keeps_failures_and_deletes_poison_messages():
+    sqs = FakeSqs([{"imageSetId": "ok"}, {"imageSetId": "boom"}, {}])
+
+    async def handler(body):
+        if not body.get("imageSetId"):
+            raise SkipMessage("Message missing imageSetId")
+        if body["imageSetId"] == "boom":
+            raise RuntimeError("healthimaging unavailable")
+        return {"imageSetId": body["imageSetId"]}
+
+    worker = XRaySqsWorker(sqs, queue_url="q", handler=handler, concurrency=4, wait_time_seconds=0)
+    await _run_until_empty(worker, sqs)
+
+    assert sorted(json.loads(m["Body"]).get("imageSetId", "") for m in sqs.deleted) == ["", "ok"]
+    assert list(sqs.in_flight) == ["rh-1"]
+    assert worker.stats() == {"processed": 1, "failed": 1, "skipped": 1, "in_flight_batches": 0}
+
+@pytest.mark.asyncio
+async def test_worker_extends_visibility_for_slow_items():
+    sqs = FakeSqs([{"imageSetId": "slow"}])
+
+    async def handler(body):
+        await asyncio.sleep(2.5)
+        return {"imageSetId": body["imageSetId"]}
+
+    worker = XRaySqsWorker(sqs, queue_url="q", handler=handler, concurrency=1, visibility_timeout=2, wait_time_seconds=0)
+    await _run_until_empty(worker, sqs)
+
+    assert sqs.visibility_extensions >= 2
+    assert len(sqs.deleted) == 1
+
+@pytest.mark.asyncio
+async def test_finished_message_stays_invisible_until_batch_delete():
+    sqs = FakeSqs([{"imageSetId": "fast"}, {"imageSetId": "slow"}])
+
+    async def handler(body):
+        await asyncio.sleep(2.5 if body["imageSetId"] == "slow" else 0)
+        return {"imageSetId": body["imageSetId"]}
+
+    worker = XRaySqsWorker(sqs, queue_url="q", handler=handler, concurrency=2, visibility_timeout=2, wait_time_seconds=0)
+    await _run_until_empty(worker, sqs)
+
+    assert "rh-0" in sqs.extended  # the fast message was extended while waiting for its sibling
+    assert len(sqs.deleted) == 2
@@ -30,15 +30,35 @@ export class ChatService {
     }).then(response => {
       const reader = response.body?.getReader();
       const decoder = new TextDecoder("utf-8");
+      let buffer = '';
+
+      // The reply is an SSE stream: one event per token, payload in "data:" lines
+      const emitEvents = () => {
+        let end;
+        while ((end = buffer.indexOf('\n\n')) !== -1) {
+          const event = buffer.slice(0, end);
+          buffer = buffer.slice(end + 2);
+          const data = event
+            .split('\n')
+            .filter(line => line.startsWith('data:'))
+            .map(line => line.slice(5).replace(/^ /, ''))
+            .join('\n');
+          if (data) {
+            observer.next(data);
+          }
+        }
+      };
 
       const read = () => {
         reader?.read().then(({ done, value }) => {
           if (done) {
+            buffer += decoder.decode();
+            emitEvents();
             observer.complete();
             return;
           }
-          const chunk = decoder.decode(value, { stream: true });
-          observer.next(chunk);
+          buffer += decoder.decode(value, { stream: true });
+          emitEvents();
           read();
         });
       };